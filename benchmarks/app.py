@@ -0,0 +1,39 @@
+"""The API with a local stand-in for Firebase auth, for load testing.
+
+Bearer tokens of the form ``bench:<uid>`` are accepted without calling
+Firebase, so benchmarks measure our code rather than Google's latency.
+
+    uv run uvicorn benchmarks.app:app --workers 4
+"""
+
+from types import SimpleNamespace
+
+from fastapi import HTTPException, Request
+
+from benchmarks.scenarios import TOKEN_PREFIX
+from src.database.config import get_current_user
+from src.main import app
+from src.ratelimit import rate_limiter
+from src.settings import settings
+
+
+async def bench_current_user(request: Request) -> dict:
+    auth_header = request.headers.get("Authorization", "")
+    token = auth_header.removeprefix("Bearer ")
+    if not token.startswith(TOKEN_PREFIX):
+        raise HTTPException(
+            status_code=401,
+            detail="You are not authorized to access this resource.",
+        )
+    uid = token.removeprefix(TOKEN_PREFIX)
+    return {
+        "firebase_user": SimpleNamespace(uid=uid),
+        "decoded_token": {"uid": uid},
+    }
+
+
+app.dependency_overrides[get_current_user] = bench_current_user
+# Tokens never reach Firebase, so skip initializing it
+settings.FIREBASE_WARM_UP = False
+# Every simulated client comes from the load generator's address
+rate_limiter.backend = None
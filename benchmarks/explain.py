@@ -0,0 +1,124 @@
+"""Check that every sorted product listing is read in order from an index.
+
+Runs ``EXPLAIN`` on the ``GET /products`` query for each sort combined with
+the common filters, prints the index each plan reads, and fails when a plan
+sorts rows itself or scans the whole table. Plans depend on table
+statistics, so run it against a seeded database:
+
+    uv run python -m benchmarks.explain
+"""
+
+import argparse
+import sys
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql
+from sqlmodel import and_, select
+
+from src.constants.product_sort import ProductSort
+from src.database.config import engine
+from src.models.product.product import Product
+from src.routers.product.products import _SORT_ORDERS, _product_conditions
+
+# Plan nodes a sorted listing must not need
+SORT_NODES = {"Sort", "Incremental Sort"}
+
+
+def plan_nodes(plan: dict) -> Iterator[dict]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def most_common(connection, column) -> str:
+    return connection.execute(
+        select(column).group_by(column).order_by(func.count().desc()).limit(1)
+    ).scalar_one()
+
+
+def listing_sql(
+    sort: ProductSort,
+    category_id: Optional[str],
+    brand_id: Optional[str],
+    in_stock: Optional[bool],
+    skip: int,
+    limit: int,
+) -> str:
+    conditions = [
+        condition
+        for facet_conditions in _product_conditions(
+            None, category_id, brand_id, None, None, in_stock
+        ).values()
+        for condition in facet_conditions
+    ]
+    query = select(Product)
+    if conditions:
+        query = query.where(and_(*conditions))
+    query = query.order_by(*_SORT_ORDERS[sort]).offset(skip).limit(limit)
+    return str(
+        query.compile(
+            dialect=postgresql.dialect(),
+            compile_kwargs={"literal_binds": True},
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--skip", type=int, default=0)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    failures: List[str] = []
+    with engine.connect() as connection:
+        category_id = most_common(connection, Product.category_id)
+        brand_id = most_common(connection, Product.brand_id)
+        filters: List[Tuple[str, dict]] = [
+            ("none", {}),
+            ("category", {"category_id": category_id}),
+            ("brand", {"brand_id": brand_id}),
+            ("in stock", {"in_stock": True}),
+            (
+                "category, in stock",
+                {"category_id": category_id, "in_stock": True},
+            ),
+            ("brand, in stock", {"brand_id": brand_id, "in_stock": True}),
+        ]
+
+        print(f"{'sort':<12} {'filters':<20} {'cost':>9}  plan")
+        for sort in ProductSort:
+            for label, params in filters:
+                sql = listing_sql(
+                    sort,
+                    params.get("category_id"),
+                    params.get("brand_id"),
+                    params.get("in_stock"),
+                    args.skip,
+                    args.limit,
+                )
+                plan = connection.exec_driver_sql(
+                    f"EXPLAIN (FORMAT JSON) {sql}"
+                ).scalar_one()[0]["Plan"]
+                nodes = list(plan_nodes(plan))
+                scans = [
+                    node.get("Index Name") or node["Node Type"]
+                    for node in nodes
+                    if "Scan" in node["Node Type"]
+                ]
+                print(
+                    f"{sort.value:<12} {label:<20} {plan['Total Cost']:>9.1f}"
+                    f"  {', '.join(scans)}"
+                )
+                if any(node["Node Type"] in SORT_NODES for node in nodes):
+                    failures.append(f"{sort.value} / {label}: sorts rows")
+                elif any(node["Node Type"] == "Seq Scan" for node in nodes):
+                    failures.append(f"{sort.value} / {label}: full table scan")
+
+    if failures:
+        print("\nFAILED:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
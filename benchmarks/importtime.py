@@ -0,0 +1,147 @@
+"""Check the API's import time and time to first request against a budget.
+
+Imports ``src.main`` in fresh interpreters with ``-X importtime``, reports
+the slowest top-level packages, and fails when the median import exceeds
+the budget or when a module that should load lazily shows up at boot:
+
+    uv run python -m benchmarks.importtime --budget-ms 1500
+
+With ``--serve`` it also starts uvicorn and measures how long the first
+request takes to succeed, which needs the database to be reachable.
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+import httpx
+
+# Deferred to first use, see src.database.config, src.database.migrations,
+# src.images.processing and src.recommendations
+LAZY_MODULES = [
+    "firebase_admin", "google.auth", "alembic", "PIL", "numpy", "scipy",
+]
+
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[int, int]]:
+    """Map module name to (self us, cumulative us)."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def import_once(module: str) -> Dict[str, Tuple[int, int]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def top_packages(
+    modules: Dict[str, Tuple[int, int]], count: int
+) -> List[Tuple[str, int]]:
+    """Import time of each top-level package's own modules, slowest first."""
+    totals: Dict[str, int] = defaultdict(int)
+    for name, (self_us, _) in modules.items():
+        totals[name.split(".")[0]] += self_us
+    return sorted(totals.items(), key=lambda item: -item[1])[:count]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_request(app: str, path: str, timeout: float) -> float:
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        env={**os.environ, "PYTHONUNBUFFERED": "1"},
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if server.poll() is not None:
+                raise SystemExit(
+                    "Server exited during startup:\n"
+                    + server.stderr.read().decode()
+                )
+            try:
+                response = httpx.get(f"http://127.0.0.1:{port}{path}")
+                if response.status_code < 500:
+                    return time.perf_counter() - start
+            except httpx.TransportError:
+                pass
+            time.sleep(0.01)
+        raise SystemExit(f"No response within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="src.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    parser.add_argument("--top", type=int, default=12)
+    parser.add_argument("--serve", action="store_true")
+    parser.add_argument("--app", default="src.main:app")
+    parser.add_argument("--path", default="/metrics")
+    parser.add_argument("--serve-budget-ms", type=float, default=4000.0)
+    args = parser.parse_args()
+
+    # The first run may write bytecode caches, keep it out of the stats
+    import_once(args.module)
+    runs = [import_once(args.module) for _ in range(args.runs)]
+    totals = [run[args.module][1] / 1000 for run in runs]
+    median_ms = statistics.median(totals)
+
+    print(
+        f"import {args.module}: median {median_ms:.0f}ms "
+        f"(min {min(totals):.0f}ms, max {max(totals):.0f}ms)\n"
+    )
+    for package, self_us in top_packages(runs[0], args.top):
+        print(f"  {package:<28} {self_us / 1000:8.1f}ms")
+
+    failures = []
+    if median_ms > args.budget_ms:
+        failures.append(
+            f"import took {median_ms:.0f}ms, budget is {args.budget_ms:.0f}ms"
+        )
+    eager = [name for name in LAZY_MODULES if name in runs[0]]
+    if eager:
+        failures.append(f"imported at startup: {', '.join(eager)}")
+
+    if args.serve:
+        elapsed_ms = time_to_first_request(args.app, args.path, 60.0) * 1000
+        print(f"\ntime to first request: {elapsed_ms:.0f}ms")
+        if elapsed_ms > args.serve_budget_ms:
+            failures.append(
+                f"first request took {elapsed_ms:.0f}ms, "
+                f"budget is {args.serve_budget_ms:.0f}ms"
+            )
+
+    if failures:
+        print("\nFAILED:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
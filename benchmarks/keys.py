@@ -0,0 +1,168 @@
+"""Compare primary key types by insert throughput and index size.
+
+Inserts the same rows into a scratch table once per key scheme: varchar
+UUIDv4 keys as before revision 0011, native uuid with v4 keys, and native
+uuid with v7 keys as the models now generate. Each row refers to a row
+inserted shortly before it, like an order item to its order, and that
+column is indexed too. Prints rows per second and table and index sizes:
+
+    uv run python -m benchmarks.keys --rows 1000000
+
+With ``--indexes`` it instead lists the sizes of the id indexes of the
+application's tables, to compare a database before and after migrating.
+"""
+
+import argparse
+import time
+import uuid
+from collections import deque
+from typing import Callable, Dict, Tuple
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from src.models.ids import new_id
+from src.settings import settings
+
+TABLE = "bench_keys"
+
+SCHEMES: Dict[str, Tuple[str, Callable[[], str]]] = {
+    "varchar v4": ("varchar", lambda: str(uuid.uuid4())),
+    "uuid v4": ("uuid", lambda: str(uuid.uuid4())),
+    "uuid v7": ("uuid", new_id),
+}
+
+
+def _size(cursor, relation: str) -> int:
+    cursor.execute("SELECT pg_relation_size(%s)", (relation,))
+    return cursor.fetchone()[0]
+
+
+def run_scheme(
+    connection, key_type: str, make_id: Callable[[], str], args
+) -> Dict[str, float]:
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        cursor.execute(
+            f"CREATE TABLE {TABLE} ("
+            f" id {key_type} PRIMARY KEY,"
+            f" parent_id {key_type} NOT NULL,"
+            " quantity integer NOT NULL,"
+            " created_at timestamptz NOT NULL DEFAULT now())"
+        )
+        cursor.execute(
+            f"CREATE INDEX {TABLE}_parent_id ON {TABLE} (parent_id)"
+        )
+    connection.commit()
+
+    recent = deque(maxlen=args.parent_lag)
+    start = time.perf_counter()
+    for offset in range(0, args.rows, args.batch):
+        rows = []
+        for _ in range(min(args.batch, args.rows - offset)):
+            id = make_id()
+            parent_id = recent[0] if recent else id
+            recent.append(id)
+            rows.append((id, parent_id, 1))
+        with connection.cursor() as cursor:
+            execute_values(
+                cursor,
+                f"INSERT INTO {TABLE} (id, parent_id, quantity) VALUES %s",
+                rows,
+                page_size=args.batch,
+            )
+        connection.commit()
+    elapsed = time.perf_counter() - start
+
+    with connection.cursor() as cursor:
+        result = {
+            "rows/s": args.rows / elapsed,
+            "table MB": _size(cursor, TABLE) / 2**20,
+            "pkey MB": _size(cursor, f"{TABLE}_pkey") / 2**20,
+            "parent MB": _size(cursor, f"{TABLE}_parent_id") / 2**20,
+        }
+        cursor.execute(f"DROP TABLE {TABLE}")
+    connection.commit()
+    return result
+
+
+def compare(args: argparse.Namespace) -> None:
+    connection = psycopg2.connect(settings.DATABASE_URL)
+    try:
+        results = {
+            name: run_scheme(connection, key_type, make_id, args)
+            for name, (key_type, make_id) in SCHEMES.items()
+        }
+    finally:
+        connection.close()
+
+    columns = list(next(iter(results.values())))
+    print(f"{args.rows} rows in batches of {args.batch}")
+    print(f"{'scheme':<12}" + "".join(f"{c:>12}" for c in columns))
+    for name, result in results.items():
+        print(
+            f"{name:<12}"
+            + "".join(f"{result[c]:>12.1f}" for c in columns)
+        )
+
+
+def list_indexes() -> None:
+    connection = psycopg2.connect(settings.DATABASE_URL)
+    try:
+        with connection.cursor() as cursor:
+            # Indexes whose leading column is a key or a reference to one
+            cursor.execute(
+                """
+                SELECT
+                    index.relname,
+                    format_type(attribute.atttypid, attribute.atttypmod),
+                    pg_relation_size(index.oid)
+                FROM pg_index
+                JOIN pg_class index ON index.oid = pg_index.indexrelid
+                JOIN pg_class tbl ON tbl.oid = pg_index.indrelid
+                JOIN pg_namespace ON pg_namespace.oid = tbl.relnamespace
+                JOIN pg_attribute attribute
+                    ON attribute.attrelid = tbl.oid
+                    AND attribute.attnum = pg_index.indkey[0]
+                WHERE pg_namespace.nspname = 'public'
+                    AND (attribute.attname = 'id'
+                         OR attribute.attname LIKE '%\\_id')
+                ORDER BY 3 DESC
+                """
+            )
+            rows = cursor.fetchall()
+    finally:
+        connection.close()
+
+    for name, key_type, size in rows:
+        print(f"{name:<48} {key_type:<18} {size / 2**20:>10.1f} MB")
+    total = sum(size for _, _, size in rows)
+    print(f"{'total':<48} {'':<18} {total / 2**20:>10.1f} MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument(
+        "--batch", type=int, default=100, help="Rows per transaction"
+    )
+    parser.add_argument(
+        "--parent-lag",
+        type=int,
+        default=50,
+        help="How many rows back each row's parent was inserted",
+    )
+    parser.add_argument(
+        "--indexes",
+        action="store_true",
+        help="List the id indexes of the configured database instead",
+    )
+    args = parser.parse_args()
+    if args.indexes:
+        list_indexes()
+    else:
+        compare(args)
+
+
+if __name__ == "__main__":
+    main()
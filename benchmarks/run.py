@@ -0,0 +1,191 @@
+"""Replay the benchmark scenarios against a running server.
+
+Start the API with the Firebase stand-in, seed the database, then run:
+
+    uv run uvicorn benchmarks.app:app --workers 4
+    uv run python -m benchmarks.run --duration 60 --concurrency 64
+
+Results can be saved with ``--save`` and compared to a previous run with
+``--baseline``; the run fails when any endpoint's p95 regresses by more
+than ``--max-regression``.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.scenarios import (
+    SCENARIOS,
+    Context,
+    Dataset,
+    Recorder,
+    checkout,
+)
+from src.settings import settings
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[index]
+
+
+def summarize(recorder: Recorder, elapsed: float) -> Dict[str, dict]:
+    summary = {}
+    for label, samples in sorted(recorder.latencies.items()):
+        summary[label] = {
+            "count": len(samples),
+            "errors": recorder.errors.get(label, 0),
+            "rps": len(samples) / elapsed,
+            "p50_ms": percentile(samples, 50) * 1000,
+            "p95_ms": percentile(samples, 95) * 1000,
+            "p99_ms": percentile(samples, 99) * 1000,
+        }
+    return summary
+
+
+def print_summary(summary: Dict[str, dict], elapsed: float) -> None:
+    header = (
+        f"{'endpoint':<28} {'count':>8} {'errors':>7} {'rps':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+    for label, row in summary.items():
+        print(
+            f"{label:<28} {row['count']:>8} {row['errors']:>7} "
+            f"{row['rps']:>8.1f} {row['p50_ms']:>8.1f} "
+            f"{row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}"
+        )
+    total = sum(row["count"] for row in summary.values())
+    print(f"\n{total} requests in {elapsed:.1f}s, {total / elapsed:.1f} rps")
+
+
+def compare(
+    summary: Dict[str, dict], baseline: Dict[str, dict], tolerance: float
+) -> List[str]:
+    regressions = []
+    for label, row in summary.items():
+        before = baseline.get(label)
+        if not before or not before["p95_ms"]:
+            continue
+        change = row["p95_ms"] / before["p95_ms"] - 1
+        if change > tolerance:
+            regressions.append(
+                f"{label}: p95 {before['p95_ms']:.1f}ms -> "
+                f"{row['p95_ms']:.1f}ms (+{change:.0%})"
+            )
+    return regressions
+
+
+async def user_loop(
+    ctx: Context, scenarios: List[str], deadline: float
+) -> None:
+    functions = [SCENARIOS[name][0] for name in scenarios]
+    weights = [SCENARIOS[name][1] for name in scenarios]
+    while time.perf_counter() < deadline:
+        scenario = ctx.rng.choices(functions, weights)[0]
+        try:
+            await scenario(ctx)
+        except httpx.HTTPError:
+            pass
+
+
+async def checkout_bursts(
+    ctx: Context, size: int, interval: float, deadline: float
+) -> None:
+    """Fire ``size`` simultaneous checkouts every ``interval`` seconds."""
+    while time.perf_counter() + interval < deadline:
+        await asyncio.sleep(interval)
+        await asyncio.gather(
+            *(checkout(ctx) for _ in range(size)), return_exceptions=True
+        )
+
+
+async def run(args: argparse.Namespace) -> Dict[str, dict]:
+    dataset = Dataset.load(settings.DATABASE_URL)
+    recorder = Recorder(enabled=args.warmup <= 0)
+    limits = httpx.Limits(max_connections=args.concurrency + args.burst_size)
+
+    async with httpx.AsyncClient(
+        base_url=args.base_url, timeout=30.0, limits=limits
+    ) as client:
+
+        def context(seed: int) -> Context:
+            return Context(client, recorder, dataset, random.Random(seed))
+
+        if args.warmup > 0:
+            warmup_deadline = time.perf_counter() + args.warmup
+            await asyncio.gather(
+                *(
+                    user_loop(context(i), args.scenarios, warmup_deadline)
+                    for i in range(args.concurrency)
+                )
+            )
+            recorder.enabled = True
+
+        start = time.perf_counter()
+        deadline = start + args.duration
+        tasks = [
+            user_loop(context(args.seed + i), args.scenarios, deadline)
+            for i in range(args.concurrency)
+        ]
+        if "checkout" in args.scenarios and args.burst_size:
+            tasks.append(
+                checkout_bursts(
+                    context(args.seed - 1),
+                    args.burst_size,
+                    args.burst_interval,
+                    deadline,
+                )
+            )
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    summary = summarize(recorder, elapsed)
+    print_summary(summary, elapsed)
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        choices=sorted(SCENARIOS),
+        default=sorted(SCENARIOS),
+    )
+    parser.add_argument("--burst-size", type=int, default=50)
+    parser.add_argument("--burst-interval", type=float, default=10.0)
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against a saved run")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+
+    summary = asyncio.run(run(args))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(summary, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(summary, json.load(f), args.max_regression)
+        if regressions:
+            print("\nRegressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""Scripted user journeys replayed by the load generator.
+
+Each scenario performs one step of a realistic session and records every
+request under the route template it hits, so results line up with the
+``route`` label of the server-side metrics.
+"""
+
+import random
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+import psycopg2
+
+from benchmarks.seed import NOUNS, WORDS
+
+# Accepted by benchmarks.app in place of a Firebase ID token
+TOKEN_PREFIX = "bench:"
+
+
+@dataclass
+class Dataset:
+    """Ids sampled from the seeded database to build requests with."""
+
+    product_ids: List[str]
+    category_ids: List[str]
+    brand_ids: List[str]
+    user_ids: List[str]
+    address_ids: List[str]
+    payment_method_ids: List[str]
+
+    @classmethod
+    def load(cls, dsn: str, sample: int = 5000) -> "Dataset":
+        def ids(cursor, table: str) -> List[str]:
+            cursor.execute(
+                f"SELECT id FROM {table} ORDER BY random() LIMIT %s",
+                (sample,),
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+        with psycopg2.connect(dsn) as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT setseed(0.42)")
+                dataset = cls(
+                    product_ids=ids(cursor, "products"),
+                    category_ids=ids(cursor, "categories"),
+                    brand_ids=ids(cursor, "brands"),
+                    user_ids=ids(cursor, "users"),
+                    address_ids=ids(cursor, "addresses"),
+                    payment_method_ids=ids(cursor, "payment_methods"),
+                )
+        if not dataset.product_ids:
+            raise SystemExit("No products found, run benchmarks.seed first")
+        return dataset
+
+
+@dataclass
+class Recorder:
+    """Latencies in seconds and error counts per endpoint label."""
+
+    latencies: Dict[str, List[float]] = field(
+        default_factory=lambda: defaultdict(list)
+    )
+    errors: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    enabled: bool = True
+
+    async def request(
+        self,
+        client: httpx.AsyncClient,
+        label: str,
+        method: str,
+        url: str,
+        **kwargs,
+    ) -> httpx.Response:
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            if self.enabled:
+                self.errors[label] += 1
+            raise
+        elapsed = time.perf_counter() - start
+        if self.enabled:
+            self.latencies[label].append(elapsed)
+            if response.status_code >= 400:
+                self.errors[label] += 1
+        return response
+
+
+@dataclass
+class Context:
+    client: httpx.AsyncClient
+    recorder: Recorder
+    dataset: Dataset
+    rng: random.Random
+
+    def auth_headers(self, user_id: str) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {TOKEN_PREFIX}{user_id}"}
+
+    async def get(self, label: str, url: str, **kwargs) -> httpx.Response:
+        return await self.recorder.request(
+            self.client, label, "GET", url, **kwargs
+        )
+
+    async def send(
+        self, method: str, label: str, url: str, **kwargs
+    ) -> httpx.Response:
+        return await self.recorder.request(
+            self.client, label, method, url, **kwargs
+        )
+
+
+async def browse_catalog(ctx: Context) -> None:
+    rng = ctx.rng
+    params = {"skip": rng.choice([0, 0, 0, 20, 40, 100]), "limit": 20}
+    roll = rng.random()
+    if roll < 0.4:
+        params["category_id"] = rng.choice(ctx.dataset.category_ids)
+    elif roll < 0.6:
+        params["brand_id"] = rng.choice(ctx.dataset.brand_ids)
+    if rng.random() < 0.3:
+        params["in_stock"] = True
+    if rng.random() < 0.5:
+        params["sort"] = rng.choice(["price", "-price", "-rating", "name"])
+    await ctx.get("GET /products/", "/products/", params=params)
+
+    product_id = rng.choice(ctx.dataset.product_ids)
+    await ctx.get("GET /products/{id}", f"/products/{product_id}")
+    await ctx.get(
+        "GET /images/", "/images/", params={"product_id": product_id}
+    )
+    if rng.random() < 0.2:
+        await ctx.get("GET /categories/", "/categories/")
+        await ctx.get("GET /brands/", "/brands/")
+
+
+async def search(ctx: Context) -> None:
+    term = ctx.rng.choice(WORDS + NOUNS)
+    await ctx.get(
+        "GET /products/ (search)",
+        "/products/",
+        params={"name": term, "limit": 20},
+    )
+
+
+async def mutate_cart(ctx: Context) -> None:
+    rng = ctx.rng
+    response = await ctx.send(
+        "POST",
+        "POST /cart/items",
+        "/cart/items",
+        json={
+            "product_id": rng.choice(ctx.dataset.product_ids),
+            "quantity": 1,
+        },
+    )
+    if response.status_code >= 400:
+        return
+    item_id = response.json()["detail"]["cart_item"]["id"]
+    await ctx.send(
+        "PUT",
+        "PUT /cart/items/{id}",
+        f"/cart/items/{item_id}",
+        json={"quantity": rng.randint(1, 3)},
+    )
+    await ctx.get("GET /cart/", "/cart/")
+    await ctx.send(
+        "DELETE", "DELETE /cart/items/{id}", f"/cart/items/{item_id}"
+    )
+
+
+async def checkout(ctx: Context) -> None:
+    rng = ctx.rng
+    dataset = ctx.dataset
+    items = [
+        {"product_id": product_id, "quantity": 1}
+        for product_id in rng.sample(dataset.product_ids, rng.randint(1, 4))
+    ]
+    await ctx.send(
+        "POST",
+        "POST /order/",
+        "/order/",
+        json={
+            "user_id": rng.choice(dataset.user_ids),
+            "address_id": rng.choice(dataset.address_ids),
+            "payment_method_id": rng.choice(dataset.payment_method_ids),
+            "total_amount": 0,
+            "items": items,
+        },
+    )
+
+
+async def order_history(ctx: Context) -> None:
+    user_id = ctx.rng.choice(ctx.dataset.user_ids)
+    await ctx.get(
+        "GET /order/user/{id}",
+        f"/order/user/{user_id}",
+        headers=ctx.auth_headers(user_id),
+    )
+
+
+Scenario = Callable[[Context], Awaitable[None]]
+
+# Relative weight of each journey in the steady-state mix. Checkout is
+# additionally fired in synchronized bursts by the runner.
+SCENARIOS: Dict[str, tuple[Scenario, int]] = {
+    "browse": (browse_catalog, 60),
+    "search": (search, 15),
+    "cart": (mutate_cart, 10),
+    "checkout": (checkout, 5),
+    "history": (order_history, 10),
+}
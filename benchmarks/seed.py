@@ -0,0 +1,320 @@
+"""Load a reproducible benchmark dataset into the configured database.
+
+Rows are generated from a seeded RNG and streamed into Postgres with
+``COPY``, so millions of rows load in minutes without building them in
+memory first. Existing rows in the benchmark tables are truncated.
+
+    uv run python -m benchmarks.seed --products 1000000 --orders 2000000
+"""
+
+import argparse
+import csv
+import io
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Iterator, List, Sequence
+
+import psycopg2
+
+from src.constants.order_status import OrderStatus
+from src.constants.payment import PaymentMethodType
+from src.constants.province import Province
+from src.database.migrations import upgrade_database
+from src.settings import settings
+
+# Product names are built from these so that search scenarios have
+# predictable selectivity.
+WORDS = [
+    "organic", "classic", "premium", "light", "extra", "family", "mini",
+    "natural", "fresh", "crunchy", "sweet", "spicy", "smoked", "golden",
+    "vegan", "artisan", "double", "wild", "roasted", "creamy",
+]
+NOUNS = [
+    "coffee", "tea", "cookies", "pasta", "rice", "cheese", "honey", "jam",
+    "bread", "olive oil", "yerba", "chocolate", "granola", "nuts", "wine",
+]
+
+TABLES = [
+    "sales_rollup_queue",
+    "sales_daily_by_product",
+    "sales_daily_by_category",
+    "sales_daily_by_brand",
+    "sales_daily_by_province",
+    "sales_daily_by_payment_method",
+    "cart_items",
+    "carts",
+    "order_items",
+    "orders",
+    "product_tags",
+    "images",
+    "products",
+    "tags",
+    "categories",
+    "brands",
+    "addresses",
+    "payment_methods",
+    "users",
+]
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+ORDER_NAMESPACE = uuid.UUID("6f1c1a8e-9a57-4c1e-9d0e-2b3f5c7d9e10")
+
+
+def order_id(index: int) -> str:
+    return str(uuid.uuid5(ORDER_NAMESPACE, str(index)))
+
+
+class _RowStream(io.RawIOBase):
+    """File-like view over generated rows, consumed lazily by COPY."""
+
+    def __init__(self, rows: Iterable[Sequence]) -> None:
+        self._rows = iter(rows)
+        self._buffer = b""
+        self._text = io.StringIO()
+        self._writer = csv.writer(self._text, lineterminator="\n")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, target) -> int:
+        while len(self._buffer) < len(target):
+            chunk = self._next_chunk()
+            if not chunk:
+                break
+            self._buffer += chunk
+        size = min(len(target), len(self._buffer))
+        target[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+    def _next_chunk(self, rows: int = 1000) -> bytes:
+        self._text.seek(0)
+        self._text.truncate()
+        for _ in range(rows):
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._writer.writerow(row)
+        return self._text.getvalue().encode()
+
+
+class Generator:
+    def __init__(self, seed: int) -> None:
+        self.rng = random.Random(seed)
+
+    def uuid(self) -> str:
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def timestamp(self, days: int = 365) -> datetime:
+        return EPOCH + timedelta(seconds=self.rng.randrange(days * 86400))
+
+    def ids(self, count: int) -> List[str]:
+        return [self.uuid() for _ in range(count)]
+
+
+def copy_rows(
+    cursor, table: str, columns: List[str], rows: Iterable[Sequence]
+) -> None:
+    start = time.perf_counter()
+    stream = _RowStream(rows)
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+        io.BufferedReader(stream, buffer_size=1 << 20),
+    )
+    print(f"  {table:<16} {time.perf_counter() - start:8.1f}s")
+
+
+def seed(args: argparse.Namespace) -> None:
+    gen = Generator(args.seed)
+    rng = gen.rng
+    now = datetime.now(timezone.utc)
+
+    brand_ids = gen.ids(args.brands)
+    category_ids = gen.ids(args.categories)
+    tag_ids = gen.ids(args.tags)
+    user_ids = [f"bench-user-{i}" for i in range(args.users)]
+    payment_ids = gen.ids(len(PaymentMethodType) * 4)
+    address_ids = gen.ids(args.users)
+    product_ids = gen.ids(args.products)
+    cart_ids = gen.ids(args.users)
+
+    def products() -> Iterator[Sequence]:
+        for i, id in enumerate(product_ids):
+            name = (
+                f"{rng.choice(WORDS)} {rng.choice(NOUNS)} "
+                f"{rng.choice(WORDS)} #{i}"
+            )
+            created = gen.timestamp()
+            yield (
+                id, name, f"Summary of {name}", f"Description of {name}",
+                round(rng.uniform(100, 50000), 2), None,
+                round(rng.uniform(1, 5), 1),
+                rng.choice(category_ids), rng.choice(brand_ids),
+                rng.choice([0] + [rng.randrange(1, 500)] * 9),
+                created, created,
+            )
+
+    def orders() -> Iterator[Sequence]:
+        statuses = [s.name for s in OrderStatus]
+        for i in range(args.orders):
+            created = gen.timestamp()
+            yield (
+                order_id(i), rng.choice(user_ids), rng.choice(address_ids),
+                rng.choice(payment_ids), 0, rng.choice(statuses),
+                created, created,
+            )
+
+    def order_items() -> Iterator[Sequence]:
+        # Order ids are re-derived from their index instead of being kept
+        # in memory, so millions of orders cost nothing extra here.
+        for i in range(args.orders):
+            for _ in range(rng.randint(1, args.items_per_order * 2 - 1)):
+                created = gen.timestamp()
+                yield (
+                    gen.uuid(), order_id(i), rng.choice(product_ids),
+                    rng.randint(1, 5), created, created,
+                )
+
+    def cart_items() -> Iterator[Sequence]:
+        for cart_id in cart_ids:
+            for _ in range(rng.randint(0, args.items_per_cart * 2)):
+                yield (
+                    gen.uuid(), cart_id, rng.choice(product_ids),
+                    rng.randint(1, 5), now, now,
+                )
+
+    connection = psycopg2.connect(settings.DATABASE_URL)
+    try:
+        with connection, connection.cursor() as cursor:
+            # Skip FK checks and NOTIFY triggers while bulk loading
+            cursor.execute("SET session_replication_role = replica")
+            cursor.execute(f"TRUNCATE {', '.join(TABLES)} CASCADE")
+
+            print("Loading benchmark data")
+            copy_rows(
+                cursor, "brands",
+                ["id", "name", "description", "created_at", "updated_at"],
+                ((id, f"Brand {i}", f"Brand {i}", now, now)
+                 for i, id in enumerate(brand_ids)),
+            )
+            copy_rows(
+                cursor, "categories",
+                ["id", "name", "description", "created_at", "updated_at"],
+                ((id, f"Category {i}", f"Category {i}", now, now)
+                 for i, id in enumerate(category_ids)),
+            )
+            copy_rows(
+                cursor, "tags", ["id", "name", "created_at", "updated_at"],
+                ((id, f"tag-{i}", now, now) for i, id in enumerate(tag_ids)),
+            )
+            copy_rows(
+                cursor, "users",
+                ["id", "email", "name", "last_name", "username",
+                 "is_admin", "is_active", "created_at", "updated_at"],
+                ((id, f"{id}@bench.local", "Bench", str(i), id,
+                  i == 0, True, now, now)
+                 for i, id in enumerate(user_ids)),
+            )
+            copy_rows(
+                cursor, "payment_methods",
+                ["id", "type", "details", "created_at", "updated_at"],
+                ((id, list(PaymentMethodType)[i % len(PaymentMethodType)].name,
+                  None, now, now)
+                 for i, id in enumerate(payment_ids)),
+            )
+            provinces = [p.name for p in Province]
+            copy_rows(
+                cursor, "addresses",
+                ["id", "province", "city", "street", "number", "postal_code"],
+                ((id, rng.choice(provinces), "City", "Street",
+                  rng.randrange(1, 9999), "1000")
+                 for id in address_ids),
+            )
+            copy_rows(
+                cursor, "products",
+                ["id", "name", "summary", "description", "current_price",
+                 "old_price", "rating", "category_id", "brand_id", "stock",
+                 "created_at", "updated_at"],
+                products(),
+            )
+            copy_rows(
+                cursor, "product_tags", ["product_id", "tag_id"],
+                ((product_id, tag_id)
+                 for product_id in product_ids
+                 for tag_id in rng.sample(tag_ids, min(3, len(tag_ids)))),
+            )
+            copy_rows(
+                cursor, "orders",
+                ["id", "user_id", "address_id", "payment_method_id",
+                 "total_amount", "status", "created_at", "updated_at"],
+                orders(),
+            )
+            copy_rows(
+                cursor, "order_items",
+                ["id", "order_id", "product_id", "quantity",
+                 "created_at", "updated_at"],
+                order_items(),
+            )
+            copy_rows(
+                cursor, "carts", ["id", "user_id", "created_at", "updated_at"],
+                ((cart_id, user_id, now, now)
+                 for cart_id, user_id in zip(cart_ids, user_ids, strict=True)),
+            )
+            copy_rows(
+                cursor, "cart_items",
+                ["id", "cart_id", "product_id", "quantity",
+                 "created_at", "updated_at"],
+                cart_items(),
+            )
+            cursor.execute(
+                "UPDATE orders o SET total_amount = t.total FROM ("
+                " SELECT oi.order_id, sum(oi.quantity * p.current_price)"
+                " AS total FROM order_items oi"
+                " JOIN products p ON p.id = oi.product_id"
+                " GROUP BY oi.order_id) t WHERE t.order_id = o.id"
+            )
+            # Triggers don't fire in replica mode, so queue every item for
+            # the rollups as migration 0008 does, and the cancellations
+            cursor.execute(
+                "INSERT INTO sales_rollup_queue"
+                " (order_id, order_item_id, sign)"
+                " SELECT order_id, id, 1 FROM order_items"
+                " ORDER BY created_at"
+            )
+            cursor.execute(
+                "INSERT INTO sales_rollup_queue"
+                " (order_id, order_item_id, sign)"
+                " SELECT oi.order_id, oi.id, -1 FROM order_items oi"
+                " JOIN orders o ON o.id = oi.order_id"
+                " WHERE o.status = 'CANCELLED'"
+            )
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute("VACUUM ANALYZE")
+    finally:
+        connection.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--orders", type=int, default=200_000)
+    parser.add_argument("--items-per-order", type=int, default=3)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--items-per-cart", type=int, default=2)
+    parser.add_argument("--brands", type=int, default=200)
+    parser.add_argument("--categories", type=int, default=100)
+    parser.add_argument("--tags", type=int, default=50)
+    args = parser.parse_args()
+
+    upgrade_database()
+    start = time.perf_counter()
+    seed(args)
+    print(f"Done in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Measure throughput and latency as the number of workers grows.
+
+Starts the production launcher with the Firebase stand-in for each worker
+count in turn, replays the benchmark scenarios against it and prints
+throughput, p95 and scaling efficiency relative to a single worker:
+
+    uv run python -m benchmarks.worker_scaling --workers 1 2 4 8
+
+Seed the database with ``benchmarks.seed`` first.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.importtime import free_port
+from benchmarks.scenarios import SCENARIOS
+from src.server import available_cpus
+
+
+def wait_until_ready(url: str, server: subprocess.Popen, timeout: float):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if server.poll() is not None:
+            raise SystemExit("Server exited during startup")
+        try:
+            if httpx.get(url).status_code < 500:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+    raise SystemExit(f"Server not ready after {timeout}s")
+
+
+def run_with_workers(workers: int, args: argparse.Namespace) -> Dict:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "src.server",
+            "--app", "benchmarks.app:app",
+            "--workers", str(workers),
+            "--port", str(port),
+        ],
+        env={**os.environ, "ACCESS_LOG": "false"},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_until_ready(f"{base_url}/metrics", server, 60.0)
+        with tempfile.NamedTemporaryFile(suffix=".json") as results:
+            subprocess.run(
+                [
+                    sys.executable, "-m", "benchmarks.run",
+                    "--base-url", base_url,
+                    "--duration", str(args.duration),
+                    "--warmup", str(args.warmup),
+                    "--concurrency", str(args.concurrency),
+                    "--burst-size", "0",
+                    "--scenarios", *args.scenarios,
+                    "--save", results.name,
+                ],
+                check=True,
+                stdout=subprocess.DEVNULL,
+            )
+            return json.load(results)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    cpus = available_cpus()
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=sorted({1, *(2**i for i in range(8) if 2**i <= cpus), cpus}),
+    )
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        choices=sorted(SCENARIOS),
+        default=["browse", "search", "history"],
+    )
+    args = parser.parse_args()
+
+    rows: List[tuple] = []
+    for workers in args.workers:
+        print(f"Running with {workers} worker(s)...", flush=True)
+        summary = run_with_workers(workers, args)
+        rps = sum(row["rps"] for row in summary.values())
+        worst_p95 = max(row["p95_ms"] for row in summary.values())
+        errors = sum(row["errors"] for row in summary.values())
+        rows.append((workers, rps, worst_p95, errors))
+
+    base_rps = rows[0][1] / rows[0][0]
+    print(
+        f"\n{'workers':>7} {'rps':>9} {'speedup':>8} {'efficiency':>10} "
+        f"{'worst p95 ms':>12} {'errors':>7}"
+    )
+    for workers, rps, worst_p95, errors in rows:
+        speedup = rps / rows[0][1]
+        efficiency = rps / (base_rps * workers)
+        print(
+            f"{workers:>7} {rps:>9.1f} {speedup:>7.2f}x {efficiency:>10.0%} "
+            f"{worst_p95:>12.1f} {errors:>7}"
+        )
+    print(f"\n{cpus} CPU(s) available to this process")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+#!/bin/sh
+# Lets the db-replica service stream WAL from the primary
+set -e
+echo "host replication ${POSTGRES_USER} all scram-sha-256" >> "$PGDATA/pg_hba.conf"
@@ -0,0 +1,417 @@
+"""Initial schema
+
+The tables as SQLModel.metadata.create_all() used to create them.
+Databases created that way should be stamped with this revision
+instead of upgraded: ``uv run alembic stamp 0001``.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 13:31:02.667684
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "addresses",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column(
+            "province",
+            sa.Enum(
+                "BUENOS_AIRES",
+                "CABA",
+                "CATAMARCA",
+                "CHACO",
+                "CHUBUT",
+                "CORDOBA",
+                "CORRIENTES",
+                "ENTRE_RIOS",
+                "FORMOSA",
+                "JUJUY",
+                "LA_PAMPA",
+                "LA_RIOJA",
+                "MENDOZA",
+                "MISIONES",
+                "NEUQUEN",
+                "RIO_NEGRO",
+                "SALTA",
+                "SAN_JUAN",
+                "SAN_LUIS",
+                "SANTA_CRUZ",
+                "SANTA_FE",
+                "SANTIAGO_DEL_ESTERO",
+                "TIERRA_DEL_FUEGO",
+                "TUCUMAN",
+                name="province",
+            ),
+            nullable=False,
+        ),
+        sa.Column("city", sa.String(), nullable=False),
+        sa.Column("street", sa.String(), nullable=False),
+        sa.Column("number", sa.Integer(), nullable=False),
+        sa.Column("extra", sa.String(), nullable=True),
+        sa.Column("postal_code", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "brands",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("description", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_brands_name"), "brands", ["name"], unique=False)
+    op.create_table(
+        "categories",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("description", sa.String(), nullable=False),
+        sa.Column("parent_id", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["parent_id"],
+            ["categories.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_categories_name"), "categories", ["name"], unique=False
+    )
+    op.create_index(
+        op.f("ix_categories_parent_id"),
+        "categories",
+        ["parent_id"],
+        unique=False,
+    )
+    op.create_table(
+        "config",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column(
+            "data", postgresql.JSONB(astext_type=sa.Text()), nullable=True
+        ),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "payment_methods",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column(
+            "type",
+            sa.Enum(
+                "TRANSFER", "MERCADOPAGO", "CASH", name="paymentmethodtype"
+            ),
+            nullable=False,
+        ),
+        sa.Column("details", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "promotions",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("discount_percentage", sa.Float(), nullable=False),
+        sa.Column("minimun_number_of_products", sa.Integer(), nullable=False),
+        sa.Column("start_date", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("end_date", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "tags",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_tags_name"), "tags", ["name"], unique=False)
+    op.create_table(
+        "users",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("last_name", sa.String(), nullable=False),
+        sa.Column("username", sa.String(), nullable=False),
+        sa.Column("is_admin", sa.Boolean(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("id"),
+    )
+    op.create_index(op.f("ix_users_email"), "users", ["email"], unique=True)
+    op.create_index(
+        op.f("ix_users_last_name"), "users", ["last_name"], unique=False
+    )
+    op.create_index(op.f("ix_users_name"), "users", ["name"], unique=False)
+    op.create_index(
+        op.f("ix_users_username"), "users", ["username"], unique=True
+    )
+    op.create_table(
+        "carts",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["users.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_carts_user_id"), "carts", ["user_id"], unique=False
+    )
+    op.create_table(
+        "orders",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("address_id", sa.String(), nullable=False),
+        sa.Column("payment_method_id", sa.String(), nullable=False),
+        sa.Column("total_amount", sa.Float(), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum(
+                "PENDING",
+                "DELIVERED",
+                "CANCELLED",
+                "COMPLETED",
+                name="orderstatus",
+            ),
+            nullable=False,
+        ),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["address_id"],
+            ["addresses.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["payment_method_id"],
+            ["payment_methods.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["users.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_orders_address_id"), "orders", ["address_id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_orders_payment_method_id"),
+        "orders",
+        ["payment_method_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_orders_user_id"), "orders", ["user_id"], unique=False
+    )
+    op.create_table(
+        "products",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("summary", sa.String(), nullable=False),
+        sa.Column("description", sa.String(), nullable=False),
+        sa.Column("current_price", sa.Float(), nullable=False),
+        sa.Column("old_price", sa.Float(), nullable=True),
+        sa.Column("rating", sa.Float(), nullable=True),
+        sa.Column("color", sa.String(), nullable=True),
+        sa.Column("condition", sa.String(), nullable=True),
+        sa.Column("badge_label", sa.String(), nullable=True),
+        sa.Column("badge_color", sa.String(), nullable=True),
+        sa.Column("category_id", sa.String(), nullable=False),
+        sa.Column("brand_id", sa.String(), nullable=False),
+        sa.Column("stock", sa.Integer(), nullable=False),
+        sa.Column(
+            "manufactured_at", sa.DateTime(timezone=True), nullable=True
+        ),
+        sa.Column("life_span_days", sa.Integer(), nullable=True),
+        sa.Column(
+            "expiration_date", sa.DateTime(timezone=True), nullable=True
+        ),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["brand_id"],
+            ["brands.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["category_id"],
+            ["categories.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_products_brand_id"), "products", ["brand_id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_products_category_id"),
+        "products",
+        ["category_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_products_name"), "products", ["name"], unique=True
+    )
+    op.create_table(
+        "cart_items",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("cart_id", sa.String(), nullable=False),
+        sa.Column("product_id", sa.String(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["cart_id"],
+            ["carts.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["product_id"],
+            ["products.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_cart_items_cart_id"), "cart_items", ["cart_id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_cart_items_product_id"),
+        "cart_items",
+        ["product_id"],
+        unique=False,
+    )
+    op.create_table(
+        "images",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("url", sa.String(), nullable=False),
+        sa.Column("alt_text", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("product_id", sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["product_id"],
+            ["products.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "order_items",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("order_id", sa.String(), nullable=False),
+        sa.Column("product_id", sa.String(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["order_id"],
+            ["orders.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["product_id"],
+            ["products.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_order_items_order_id"),
+        "order_items",
+        ["order_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_order_items_product_id"),
+        "order_items",
+        ["product_id"],
+        unique=False,
+    )
+    op.create_table(
+        "product_promotions",
+        sa.Column("product_id", sa.String(), nullable=False),
+        sa.Column("promotion_id", sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["product_id"],
+            ["products.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["promotion_id"],
+            ["promotions.id"],
+        ),
+        sa.PrimaryKeyConstraint("product_id", "promotion_id"),
+    )
+    op.create_table(
+        "product_tags",
+        sa.Column("product_id", sa.String(), nullable=False),
+        sa.Column("tag_id", sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["product_id"],
+            ["products.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["tag_id"],
+            ["tags.id"],
+        ),
+        sa.PrimaryKeyConstraint("product_id", "tag_id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("product_tags")
+    op.drop_table("product_promotions")
+    op.drop_index(op.f("ix_order_items_product_id"), table_name="order_items")
+    op.drop_index(op.f("ix_order_items_order_id"), table_name="order_items")
+    op.drop_table("order_items")
+    op.drop_table("images")
+    op.drop_index(op.f("ix_cart_items_product_id"), table_name="cart_items")
+    op.drop_index(op.f("ix_cart_items_cart_id"), table_name="cart_items")
+    op.drop_table("cart_items")
+    op.drop_index(op.f("ix_products_name"), table_name="products")
+    op.drop_index(op.f("ix_products_category_id"), table_name="products")
+    op.drop_index(op.f("ix_products_brand_id"), table_name="products")
+    op.drop_table("products")
+    op.drop_index(op.f("ix_orders_user_id"), table_name="orders")
+    op.drop_index(op.f("ix_orders_payment_method_id"), table_name="orders")
+    op.drop_index(op.f("ix_orders_address_id"), table_name="orders")
+    op.drop_table("orders")
+    op.drop_index(op.f("ix_carts_user_id"), table_name="carts")
+    op.drop_table("carts")
+    op.drop_index(op.f("ix_users_username"), table_name="users")
+    op.drop_index(op.f("ix_users_name"), table_name="users")
+    op.drop_index(op.f("ix_users_last_name"), table_name="users")
+    op.drop_index(op.f("ix_users_email"), table_name="users")
+    op.drop_table("users")
+    op.drop_index(op.f("ix_tags_name"), table_name="tags")
+    op.drop_table("tags")
+    op.drop_table("promotions")
+    op.drop_table("payment_methods")
+    op.drop_table("config")
+    op.drop_index(op.f("ix_categories_parent_id"), table_name="categories")
+    op.drop_index(op.f("ix_categories_name"), table_name="categories")
+    op.drop_table("categories")
+    op.drop_index(op.f("ix_brands_name"), table_name="brands")
+    op.drop_table("brands")
+    op.drop_table("addresses")
+    for enum in ("orderstatus", "paymentmethodtype", "province"):
+        sa.Enum(name=enum).drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,97 @@
+"""LISTEN/NOTIFY triggers for live product and order updates
+
+Notifications are delivered on commit and only when the watched columns
+actually change, so unrelated edits stay silent. Channel names must match
+src.database.notifications.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 13:40:12.118204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notify_product_changes()
+        RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('product_changes', json_build_object(
+                'id', NEW.id,
+                'category_id', NEW.category_id,
+                'brand_id', NEW.brand_id,
+                'stock', NEW.stock,
+                'current_price', NEW.current_price,
+                'old_price', NEW.old_price
+            )::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE TRIGGER products_notify_changes
+        AFTER UPDATE OF stock, current_price ON products
+        FOR EACH ROW
+        WHEN (
+            OLD.stock IS DISTINCT FROM NEW.stock
+            OR OLD.current_price IS DISTINCT FROM NEW.current_price
+        )
+        EXECUTE FUNCTION notify_product_changes()
+        """
+    )
+    # Enum columns store member names, lowered here to match OrderStatus
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notify_order_changes() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('order_changes', json_build_object(
+                'id', NEW.id,
+                'user_id', NEW.user_id,
+                'status', lower(NEW.status::text),
+                'updated_at', NEW.updated_at
+            )::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE TRIGGER orders_notify_created
+        AFTER INSERT ON orders
+        FOR EACH ROW
+        EXECUTE FUNCTION notify_order_changes()
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE TRIGGER orders_notify_changes
+        AFTER UPDATE OF status ON orders
+        FOR EACH ROW
+        WHEN (OLD.status IS DISTINCT FROM NEW.status)
+        EXECUTE FUNCTION notify_order_changes()
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS orders_notify_changes ON orders")
+    op.execute("DROP TRIGGER IF EXISTS orders_notify_created ON orders")
+    op.execute("DROP FUNCTION IF EXISTS notify_order_changes()")
+    op.execute("DROP TRIGGER IF EXISTS products_notify_changes ON products")
+    op.execute("DROP FUNCTION IF EXISTS notify_product_changes()")
@@ -0,0 +1,49 @@
+"""Index image and link-table lookups
+
+images.product_id is filtered on every product page, and tags and
+promotions are looked up from their own side of the link tables, whose
+primary keys lead with product_id. Built concurrently so that live
+tables keep accepting writes.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 13:52:40.530917
+
+"""
+
+from typing import Sequence, Union
+
+from src.database.migrations import (
+    create_index_concurrently,
+    drop_index_concurrently,
+)
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    create_index_concurrently(
+        "ix_images_product_id", "images", ["product_id"]
+    )
+    create_index_concurrently(
+        "ix_product_tags_tag_id", "product_tags", ["tag_id"]
+    )
+    create_index_concurrently(
+        "ix_product_promotions_promotion_id",
+        "product_promotions",
+        ["promotion_id"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    drop_index_concurrently(
+        "ix_product_promotions_promotion_id", "product_promotions"
+    )
+    drop_index_concurrently("ix_product_tags_tag_id", "product_tags")
+    drop_index_concurrently("ix_images_product_id", "images")
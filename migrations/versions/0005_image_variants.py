@@ -0,0 +1,51 @@
+"""Image dimensions and variants
+
+Uploaded images record their content hash, type and dimensions, and the
+resized copies built from them. Every column is nullable, so adding them
+does not rewrite the table.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 15:02:11.418203
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "images",
+        sa.Column("content_hash", sa.String(length=64), nullable=True),
+    )
+    op.add_column(
+        "images", sa.Column("content_type", sa.String(), nullable=True)
+    )
+    op.add_column("images", sa.Column("width", sa.Integer(), nullable=True))
+    op.add_column("images", sa.Column("height", sa.Integer(), nullable=True))
+    op.add_column(
+        "images",
+        sa.Column(
+            "variants", postgresql.JSONB(astext_type=sa.Text()), nullable=True
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("images", "variants")
+    op.drop_column("images", "height")
+    op.drop_column("images", "width")
+    op.drop_column("images", "content_type")
+    op.drop_column("images", "content_hash")
@@ -0,0 +1,64 @@
+"""Index product listings by their sort orders
+
+Every sort of GET /products gets an index on its column and the id
+tiebreak, one per common filter: none, category, brand and in stock (a
+partial index). A filtered, sorted page is then read in order from one
+index, with no sort step. Built concurrently so that live tables keep
+accepting writes.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 16:10:37.902614
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from src.database.migrations import (
+    create_index_concurrently,
+    drop_index_concurrently,
+)
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Sort columns, matching the orders in src.routers.product.products. An
+# index read backwards serves the descending sort. Names are unique and the
+# existing ix_products_name already serves the unfiltered name sort.
+SORTS = {
+    "price": ["current_price", "id"],
+    "rating": [sa.text("rating DESC NULLS LAST"), sa.text("id DESC")],
+    "created_at": ["created_at", "id"],
+    "name": ["name"],
+}
+
+
+def indexes():
+    """(name, columns, options) of every listing index."""
+    for sort, columns in SORTS.items():
+        if sort != "name":
+            yield f"ix_products_{sort}", columns, {}
+        yield f"ix_products_category_{sort}", ["category_id", *columns], {}
+        yield f"ix_products_brand_{sort}", ["brand_id", *columns], {}
+        yield (
+            f"ix_products_in_stock_{sort}",
+            columns,
+            {"postgresql_where": sa.text("stock > 0")},
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, columns, options in indexes():
+        create_index_concurrently(name, "products", columns, **options)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, _, _ in reversed(list(indexes())):
+        drop_index_concurrently(name, "products")
@@ -0,0 +1,52 @@
+"""Fulfillment claims and the pending order queue
+
+Orders record which packer claimed them and when. The queue of pending
+orders is read oldest first from a partial index that only holds pending
+orders, so it stays small however many orders have shipped. The index is
+built concurrently so that live tables keep accepting writes.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 17:02:45.118306
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from src.database.migrations import (
+    create_index_concurrently,
+    drop_index_concurrently,
+)
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, Sequence[str], None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "orders", sa.Column("claimed_by", sa.String(), nullable=True)
+    )
+    op.add_column(
+        "orders",
+        sa.Column("claimed_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    create_index_concurrently(
+        "ix_orders_pending_created_at",
+        "orders",
+        ["created_at", "id"],
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    drop_index_concurrently("ix_orders_pending_created_at", "orders")
+    op.drop_column("orders", "claimed_at")
+    op.drop_column("orders", "claimed_by")
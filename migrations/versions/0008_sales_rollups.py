@@ -0,0 +1,159 @@
+"""Daily sales rollups
+
+Order items record the price they were sold at. Daily net sales are kept
+per product, category, brand, province and payment method type.
+
+Triggers queue every new order item (+1) and the items of orders that get
+cancelled (-1) in sales_rollup_queue. src.database.rollups folds the queue
+into the rollups. Existing items are queued here, so the first refresh
+builds the history.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 17:48:20.604117
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, Sequence[str], None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def rollup_keys():
+    """Rollup tables and their dimension column."""
+    return {
+        "sales_daily_by_product": sa.Column(
+            "product_id", sa.String(), nullable=False
+        ),
+        "sales_daily_by_category": sa.Column(
+            "category_id", sa.String(), nullable=False
+        ),
+        "sales_daily_by_brand": sa.Column(
+            "brand_id", sa.String(), nullable=False
+        ),
+        "sales_daily_by_province": sa.Column(
+            "province",
+            postgresql.ENUM(name="province", create_type=False),
+            nullable=False,
+        ),
+        "sales_daily_by_payment_method": sa.Column(
+            "payment_method_type",
+            postgresql.ENUM(name="paymentmethodtype", create_type=False),
+            nullable=False,
+        ),
+    }
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "order_items", sa.Column("unit_price", sa.Float(), nullable=True)
+    )
+    op.create_table(
+        "sales_rollup_queue",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column("order_id", sa.String(), nullable=False),
+        sa.Column("order_item_id", sa.String(), nullable=False),
+        sa.Column("sign", sa.SmallInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_sales_rollup_queue_order_id", "sales_rollup_queue", ["order_id"]
+    )
+    for table, key in rollup_keys().items():
+        op.create_table(
+            table,
+            sa.Column("day", sa.Date(), nullable=False),
+            sa.Column("orders", sa.Integer(), nullable=False),
+            sa.Column("units", sa.Integer(), nullable=False),
+            sa.Column("revenue", sa.Float(), nullable=False),
+            key,
+            sa.PrimaryKeyConstraint("day", key.name),
+        )
+
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION queue_sales_rollup_item()
+        RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO sales_rollup_queue (order_id, order_item_id, sign)
+            VALUES (NEW.order_id, NEW.id, 1);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE TRIGGER order_items_queue_sales_rollup
+        AFTER INSERT ON order_items
+        FOR EACH ROW
+        EXECUTE FUNCTION queue_sales_rollup_item()
+        """
+    )
+    # Cancelling an order takes its items back out, undoing it adds them
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION queue_sales_rollup_cancellation()
+        RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO sales_rollup_queue (order_id, order_item_id, sign)
+            SELECT
+                order_id,
+                id,
+                CASE WHEN NEW.status = 'CANCELLED' THEN -1 ELSE 1 END
+            FROM order_items
+            WHERE order_id = NEW.id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE TRIGGER orders_queue_sales_rollup
+        AFTER UPDATE OF status ON orders
+        FOR EACH ROW
+        WHEN (
+            (OLD.status = 'CANCELLED') IS DISTINCT FROM
+            (NEW.status = 'CANCELLED')
+        )
+        EXECUTE FUNCTION queue_sales_rollup_cancellation()
+        """
+    )
+
+    op.execute(
+        """
+        INSERT INTO sales_rollup_queue (order_id, order_item_id, sign)
+        SELECT order_id, id, 1 FROM order_items ORDER BY created_at
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO sales_rollup_queue (order_id, order_item_id, sign)
+        SELECT order_items.order_id, order_items.id, -1
+        FROM order_items JOIN orders ON orders.id = order_items.order_id
+        WHERE orders.status = 'CANCELLED'
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS orders_queue_sales_rollup ON orders")
+    op.execute(
+        "DROP TRIGGER IF EXISTS order_items_queue_sales_rollup ON order_items"
+    )
+    op.execute("DROP FUNCTION IF EXISTS queue_sales_rollup_cancellation()")
+    op.execute("DROP FUNCTION IF EXISTS queue_sales_rollup_item()")
+    for table in reversed(list(rollup_keys())):
+        op.drop_table(table)
+    op.drop_table("sales_rollup_queue")
+    op.drop_column("order_items", "unit_price")
@@ -0,0 +1,41 @@
+"""Frequently bought together recommendations
+
+The top related products of each product, ranked, as rebuilt by
+src.recommendations.job. Keyed by (product_id, rank) so a product page
+reads its list in order from the primary key. No foreign keys: the table
+is replaced wholesale and may briefly name a deleted product, which the
+lookup joins away.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 18:35:52.271940
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, Sequence[str], None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "product_recommendations",
+        sa.Column("product_id", sa.String(), nullable=False),
+        sa.Column("rank", sa.SmallInteger(), nullable=False),
+        sa.Column("related_product_id", sa.String(), nullable=False),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("product_id", "rank"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("product_recommendations")
@@ -0,0 +1,64 @@
+"""Generated effective expiry of products
+
+products.effective_expiry is expiration_date, or else manufactured_at plus
+life_span_days, computed by the database on every write. Adding a stored
+generated column rewrites the table under an exclusive lock, so apply this
+revision outside peak hours. Products in stock are indexed by it, which is
+how expiring stock is found.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 19:12:08.330571
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from src.database.migrations import (
+    create_index_concurrently,
+    drop_index_concurrently,
+)
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, Sequence[str], None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match src.models.product.product.EFFECTIVE_EXPIRY
+EFFECTIVE_EXPIRY = (
+    "COALESCE(expiration_date, (manufactured_at AT TIME ZONE 'UTC'"
+    " + make_interval(days => life_span_days)) AT TIME ZONE 'UTC')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "products",
+        sa.Column(
+            "effective_expiry",
+            sa.DateTime(timezone=True),
+            sa.Computed(EFFECTIVE_EXPIRY, persisted=True),
+            nullable=True,
+        ),
+    )
+    create_index_concurrently(
+        "ix_products_in_stock_effective_expiry",
+        "products",
+        ["effective_expiry", "id"],
+        postgresql_where=sa.text(
+            "stock > 0 AND effective_expiry IS NOT NULL"
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    drop_index_concurrently(
+        "ix_products_in_stock_effective_expiry", "products"
+    )
+    op.drop_column("products", "effective_expiry")
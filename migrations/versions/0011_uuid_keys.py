@@ -0,0 +1,106 @@
+"""Native uuid keys
+
+Keys the application generates, and the columns that refer to them, change
+from varchar to uuid: 16 bytes instead of 37, so their indexes shrink by
+about half. New keys are UUIDv7, see src.models.ids. User ids come from
+Firebase and address ids from clients, so those stay varchar.
+
+Each table is rewritten once under an exclusive lock and its indexes are
+rebuilt, so apply this revision in a maintenance window.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 21:40:52.116730
+
+"""
+
+from typing import Dict, List, Sequence, Tuple, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0011"
+down_revision: Union[str, Sequence[str], None] = "0010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UUID_COLUMNS: Dict[str, List[str]] = {
+    "brands": ["id"],
+    "categories": ["id", "parent_id"],
+    "tags": ["id"],
+    "promotions": ["id"],
+    "products": ["id", "category_id", "brand_id"],
+    "product_tags": ["product_id", "tag_id"],
+    "product_promotions": ["product_id", "promotion_id"],
+    "product_recommendations": ["product_id", "related_product_id"],
+    "images": ["id", "product_id"],
+    "carts": ["id"],
+    "cart_items": ["id", "cart_id", "product_id"],
+    "payment_methods": ["id"],
+    "orders": ["id", "payment_method_id"],
+    "order_items": ["id", "order_id", "product_id"],
+    "sales_rollup_queue": ["order_id", "order_item_id"],
+    "sales_daily_by_product": ["product_id"],
+    "sales_daily_by_category": ["category_id"],
+    "sales_daily_by_brand": ["brand_id"],
+    "config": ["id"],
+}
+
+# (name, table, column, referenced table) of the foreign keys between
+# those columns, which must be dropped while their types differ
+FOREIGN_KEYS: List[Tuple[str, str, str, str]] = [
+    ("categories_parent_id_fkey", "categories", "parent_id", "categories"),
+    ("products_category_id_fkey", "products", "category_id", "categories"),
+    ("products_brand_id_fkey", "products", "brand_id", "brands"),
+    ("product_tags_product_id_fkey", "product_tags", "product_id",
+     "products"),
+    ("product_tags_tag_id_fkey", "product_tags", "tag_id", "tags"),
+    ("product_promotions_product_id_fkey", "product_promotions",
+     "product_id", "products"),
+    ("product_promotions_promotion_id_fkey", "product_promotions",
+     "promotion_id", "promotions"),
+    ("images_product_id_fkey", "images", "product_id", "products"),
+    ("cart_items_cart_id_fkey", "cart_items", "cart_id", "carts"),
+    ("cart_items_product_id_fkey", "cart_items", "product_id", "products"),
+    ("orders_payment_method_id_fkey", "orders", "payment_method_id",
+     "payment_methods"),
+    ("order_items_order_id_fkey", "order_items", "order_id", "orders"),
+    ("order_items_product_id_fkey", "order_items", "product_id",
+     "products"),
+]
+
+
+def _alter_types(type_: str) -> None:
+    # One ALTER TABLE per table, so each is rewritten only once
+    for table, columns in UUID_COLUMNS.items():
+        op.execute(
+            f"ALTER TABLE {table} "
+            + ", ".join(
+                f"ALTER COLUMN {column} TYPE {type_} USING {column}::{type_}"
+                for column in columns
+            )
+        )
+
+
+def _drop_foreign_keys() -> None:
+    for name, table, _, _ in FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_="foreignkey")
+
+
+def _create_foreign_keys() -> None:
+    for name, table, column, referenced in FOREIGN_KEYS:
+        op.create_foreign_key(name, table, referenced, [column], ["id"])
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _drop_foreign_keys()
+    _alter_types("uuid")
+    _create_foreign_keys()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _drop_foreign_keys()
+    _alter_types("varchar")
+    _create_foreign_keys()
@@ -0,0 +1,34 @@
+"""Idempotency key attempts
+
+Each claim records a token of the attempt holding it, so that an attempt
+whose claim was taken over can no longer complete, commit or release the
+row of the attempt that took it.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-20 09:12:37.804512
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0012"
+down_revision: Union[str, Sequence[str], None] = "0011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "idempotency_keys", sa.Column("attempt", sa.String(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("idempotency_keys", "attempt")
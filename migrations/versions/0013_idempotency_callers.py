@@ -0,0 +1,56 @@
+"""Idempotency keys scoped to their caller
+
+Keys become unique per caller, the authenticated user or the client
+address, so that nobody else can reuse a key to get a stored response.
+Keys stored before this revision belong to no caller and are never
+replayed again; they expire as usual.
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-20 11:05:48.361207
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0013"
+down_revision: Union[str, Sequence[str], None] = "0012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "idempotency_keys",
+        sa.Column("caller", sa.String(), nullable=False, server_default=""),
+    )
+    op.alter_column("idempotency_keys", "caller", server_default=None)
+    op.drop_constraint(
+        "idempotency_keys_pkey", "idempotency_keys", type_="primary"
+    )
+    op.create_primary_key(
+        "idempotency_keys_pkey",
+        "idempotency_keys",
+        ["key", "route", "caller"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Keep one caller's row of each key
+    op.execute(
+        "DELETE FROM idempotency_keys a USING idempotency_keys b"
+        " WHERE a.key = b.key AND a.route = b.route AND a.caller > b.caller"
+    )
+    op.drop_constraint(
+        "idempotency_keys_pkey", "idempotency_keys", type_="primary"
+    )
+    op.create_primary_key(
+        "idempotency_keys_pkey", "idempotency_keys", ["key", "route"]
+    )
+    op.drop_column("idempotency_keys", "caller")
@@ -0,0 +1,55 @@
+"""Previous stock and price in product change notifications
+
+The response cache only drops listings beyond the product's own when its
+price changed or its stock ran out or came back, which it needs the values
+before the update to tell.
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-20 13:26:09.548130
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0014"
+down_revision: Union[str, Sequence[str], None] = "0013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _notify_product_changes(previous_values: str) -> str:
+    return f"""
+        CREATE OR REPLACE FUNCTION notify_product_changes()
+        RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('product_changes', json_build_object(
+                'id', NEW.id,
+                'category_id', NEW.category_id,
+                'brand_id', NEW.brand_id,
+                'stock', NEW.stock,
+                'current_price', NEW.current_price,
+                'old_price', NEW.old_price{previous_values}
+            )::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        _notify_product_changes(
+            ",\n                'previous_stock', OLD.stock,"
+            "\n                'previous_price', OLD.current_price"
+        )
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(_notify_product_changes(""))
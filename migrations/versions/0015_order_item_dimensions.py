@@ -0,0 +1,41 @@
+"""Category and brand of order items
+
+Order items record the category and brand their product had when the
+order was placed, so that the sales rollups count a later cancellation
+under the same ones as the sale, even if the product moved in between.
+Items ordered before this revision fall back to the product's current
+category and brand, as items without a unit price fall back to its
+current price.
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-20 14:02:51.730694
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0015"
+down_revision: Union[str, Sequence[str], None] = "0014"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "order_items", sa.Column("category_id", sa.Uuid(), nullable=True)
+    )
+    op.add_column(
+        "order_items", sa.Column("brand_id", sa.Uuid(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("order_items", "brand_id")
+    op.drop_column("order_items", "category_id")
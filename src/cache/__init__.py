@@ -0,0 +1,33 @@
+from src.cache.backends import CacheBackend, LRUCache, RedisCache
+from src.cache.response import (
+    CATALOG_TAG,
+    PRICE_TAG,
+    STOCK_TAG,
+    ResponseCache,
+    brand_tag,
+    category_tag,
+    facet_tags,
+    invalidate_on_commit,
+    listing_tags,
+    product_tag,
+    product_tags,
+    response_cache,
+)
+
+__all__ = [
+    "CATALOG_TAG",
+    "CacheBackend",
+    "LRUCache",
+    "PRICE_TAG",
+    "RedisCache",
+    "ResponseCache",
+    "STOCK_TAG",
+    "brand_tag",
+    "category_tag",
+    "facet_tags",
+    "invalidate_on_commit",
+    "listing_tags",
+    "product_tag",
+    "product_tags",
+    "response_cache",
+]
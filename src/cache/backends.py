@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+
+class CacheBackend:
+    """Byte store with tag-based invalidation."""
+
+    # True when every worker sees the same entries, so an invalidation only
+    # has to be applied once
+    shared = False
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(
+        self, key: str, value: bytes, tags: Iterable[str], ttl: float
+    ) -> None:
+        raise NotImplementedError
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        """Drop every entry stored with any of ``tags``."""
+        raise NotImplementedError
+
+
+class LRUCache(CacheBackend):
+    """In-process cache bounded by the total size of its values."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._size = 0
+        # key -> (value, tags, expires_at)
+        self._entries: OrderedDict[str, Tuple[bytes, Tuple[str, ...], float]]
+        self._entries = OrderedDict()
+        self._keys_by_tag: Dict[str, Set[str]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[2] < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(
+        self, key: str, value: bytes, tags: Iterable[str], ttl: float
+    ) -> None:
+        if len(value) > self.max_bytes:
+            return
+        tags = tuple(tags)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, tags, time.monotonic() + ttl)
+            self._size += len(value)
+            for tag in tags:
+                self._keys_by_tag[tag].add(key)
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            for tag in tags:
+                for key in self._keys_by_tag.pop(tag, ()):
+                    self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        value, tags, _ = entry
+        self._size -= len(value)
+        for tag in tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+
+class RedisCache(CacheBackend):
+    """Cache in Redis or anything speaking its protocol.
+
+    ``client`` is a ``redis.Redis`` instance, or any object with the same
+    ``get``, ``pipeline`` and ``smembers`` methods such as
+    ``fakeredis.FakeRedis``. Each tag is a set of the keys stored with it.
+    """
+
+    shared = True
+
+    def __init__(self, client, prefix: str = "omega:cache:") -> None:
+        self.client = client
+        self.prefix = prefix
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def set(
+        self, key: str, value: bytes, tags: Iterable[str], ttl: float
+    ) -> None:
+        ttl = max(int(ttl), 1)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.set(self.prefix + key, value, ex=ttl)
+        for tag in tags:
+            # A tag set expires together with its newest entry
+            pipe.sadd(self._tag_key(tag), self.prefix + key)
+            pipe.expire(self._tag_key(tag), ttl)
+        pipe.execute()
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        if not tag_keys:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        for tag_key in tag_keys:
+            pipe.smembers(tag_key)
+        keys = set().union(*pipe.execute())
+        self.client.delete(*keys, *tag_keys)
@@ -0,0 +1,262 @@
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Iterable, Optional, Set
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import event, func, select
+from sqlmodel import Session
+
+from src.cache.backends import CacheBackend, LRUCache, RedisCache
+from src.database.notifications import PRODUCT_CHANGES_CHANNEL, listener
+from src.database.replicas import current_read_consistency
+from src.metrics import CACHE_REQUESTS
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Tags published by a worker's writes so the others drop their own copies
+CACHE_INVALIDATION_CHANNEL = "cache_invalidations"
+
+# Every listing not restricted to a category or brand, i.e. every listing a
+# new product could appear in
+CATALOG_TAG = "catalog"
+
+# Listings filtered or sorted by price, and facets, which count products
+# per price bucket
+PRICE_TAG = "price"
+
+# Listings filtered by stock, and facets, which count products in stock
+STOCK_TAG = "stock"
+
+
+def product_tag(product_id: str) -> str:
+    return f"product:{product_id}"
+
+
+def category_tag(category_id: str) -> str:
+    return f"category:{category_id}"
+
+
+def brand_tag(brand_id: str) -> str:
+    return f"brand:{brand_id}"
+
+
+def product_tags(product) -> Set[str]:
+    """Tags of every cached response a change to ``product`` may affect."""
+    return {
+        product_tag(product.id),
+        category_tag(product.category_id),
+        brand_tag(product.brand_id),
+        CATALOG_TAG,
+    }
+
+
+def listing_tags(
+    products: Iterable,
+    category_id: Optional[str] = None,
+    brand_id: Optional[str] = None,
+    by_price: bool = False,
+    by_stock: bool = False,
+) -> Set[str]:
+    """Tags of a product listing: its rows and the filters that chose them.
+
+    ``by_price`` and ``by_stock`` mark listings whose rows depend on the
+    prices or stock of products they do not show.
+    """
+    tags = set()
+    for product in products:
+        tags.add(product_tag(product.id))
+        tags.add(category_tag(product.category_id))
+        tags.add(brand_tag(product.brand_id))
+    if category_id:
+        tags.add(category_tag(category_id))
+    if brand_id:
+        tags.add(brand_tag(brand_id))
+    if not (category_id or brand_id):
+        tags.add(CATALOG_TAG)
+    if by_price:
+        tags.add(PRICE_TAG)
+    if by_stock:
+        tags.add(STOCK_TAG)
+    return tags
+
+
+def facet_tags(
+    brand_ids: Iterable[str], category_ids: Iterable[str]
+) -> Set[str]:
+    """Tags of facet counts.
+
+    Any product may move them, and the brands and categories they name
+    may be renamed.
+    """
+    tags = {CATALOG_TAG, PRICE_TAG, STOCK_TAG}
+    tags.update(brand_tag(id) for id in brand_ids)
+    tags.update(category_tag(id) for id in category_ids)
+    return tags
+
+
+class ResponseCache:
+    """Rendered JSON responses keyed by endpoint and normalized parameters.
+
+    Backend errors are logged and treated as misses, so a cache outage
+    only costs the queries it would have saved.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend], ttl: float) -> None:
+        self.backend = backend
+        self.ttl = ttl
+
+    @staticmethod
+    def key(namespace: str, **params) -> str:
+        """Key for ``params`` after FastAPI parsed them.
+
+        ``?limit=010&in_stock=1`` and ``?in_stock=true&limit=10`` map to
+        the same entry because the typed values, defaults included, are
+        hashed in a fixed order.
+        """
+        canonical = json.dumps(params, sort_keys=True, default=str)
+        return f"{namespace}:{hashlib.sha1(canonical.encode()).hexdigest()}"
+
+    def get(self, key: str) -> Optional[Response]:
+        if self.backend is None:
+            return None
+        namespace = key.split(":", 1)[0]
+        consistency = current_read_consistency()
+        if consistency is not None and consistency.min_lsn is not None:
+            # The client just wrote something; read it from the database
+            CACHE_REQUESTS.labels(namespace, "bypass").inc()
+            return None
+        try:
+            body = self.backend.get(key)
+        except Exception:
+            logger.exception("Response cache read failed")
+            CACHE_REQUESTS.labels(namespace, "error").inc()
+            return None
+        if body is None:
+            CACHE_REQUESTS.labels(namespace, "miss").inc()
+            return None
+        CACHE_REQUESTS.labels(namespace, "hit").inc()
+        return Response(body, media_type="application/json")
+
+    def store(
+        self,
+        key: str,
+        content: BaseModel,
+        tags: Iterable[str],
+        session: Session,
+    ) -> JSONResponse:
+        """Render ``content`` as the endpoint would and keep the bytes.
+
+        Nothing is kept when ``session`` read from a replica: entries are
+        invalidated when the primary commits, and a replica that has not
+        replayed that commit yet would cache the old rows again.
+        """
+        response = JSONResponse(jsonable_encoder(content))
+        if self.backend is not None and not session.info.get("replica"):
+            try:
+                self.backend.set(key, response.body, tags, self.ttl)
+            except Exception:
+                logger.exception("Response cache write failed")
+        return response
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        if self.backend is None:
+            return
+        try:
+            self.backend.invalidate(tags)
+        except Exception:
+            logger.exception("Response cache invalidation failed")
+
+    def _invalidate_from_notification(self, tags: Iterable[str]) -> None:
+        # Runs on the event loop; a network round trip must not block it
+        if self.backend is not None and self.backend.shared:
+            asyncio.get_running_loop().run_in_executor(
+                None, self.invalidate, list(tags)
+            )
+        else:
+            self.invalidate(tags)
+
+    def on_invalidation_notice(self, event: dict) -> None:
+        # The writer already cleared a shared backend itself
+        if self.backend is not None and not self.backend.shared:
+            self.invalidate(event.get("tags", ()))
+
+    def on_product_change(self, event: dict) -> None:
+        """Stock and price changes, whoever made them.
+
+        Entries showing the product are dropped. Other listings and the
+        facets only change with its price, or when its stock runs out or
+        comes back, so the decrements of a checkout leave them cached.
+        """
+        tags = {product_tag(event["id"])}
+        if event.get("previous_price") != event["current_price"]:
+            tags.add(PRICE_TAG)
+        previous_stock = event.get("previous_stock")
+        if previous_stock is None or (previous_stock > 0) != (
+            event["stock"] > 0
+        ):
+            tags.add(STOCK_TAG)
+        self._invalidate_from_notification(tags)
+
+
+def create_backend() -> Optional[CacheBackend]:
+    if settings.CACHE_BACKEND == "memory":
+        return LRUCache(settings.CACHE_MAX_BYTES)
+    if settings.CACHE_BACKEND == "redis":
+        import redis  # optional dependency, only needed for this backend
+
+        return RedisCache(
+            redis.Redis.from_url(
+                settings.REDIS_URL,
+                socket_timeout=settings.REDIS_TIMEOUT_SECONDS,
+                socket_connect_timeout=settings.REDIS_TIMEOUT_SECONDS,
+            )
+        )
+    return None
+
+
+response_cache = ResponseCache(create_backend(), settings.CACHE_TTL_SECONDS)
+listener.watch(
+    CACHE_INVALIDATION_CHANNEL, response_cache.on_invalidation_notice
+)
+listener.watch(PRODUCT_CHANGES_CHANNEL, response_cache.on_product_change)
+
+
+def invalidate_on_commit(session: Session, tags: Iterable[str]) -> None:
+    """Drop cached responses tagged with ``tags`` once ``session`` commits.
+
+    Other workers are told through a NOTIFY sent in the same transaction,
+    so nothing is invalidated if it rolls back.
+    """
+    session.info.setdefault("cache_tags", set()).update(tags)
+
+
+@event.listens_for(Session, "before_commit")
+def _publish_cache_invalidation(session) -> None:
+    tags = session.info.get("cache_tags")
+    if tags:
+        session.execute(
+            select(
+                func.pg_notify(
+                    CACHE_INVALIDATION_CHANNEL,
+                    json.dumps({"tags": sorted(tags)}),
+                )
+            )
+        )
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session) -> None:
+    tags = session.info.pop("cache_tags", None)
+    if tags:
+        response_cache.invalidate(tags)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back(session) -> None:
+    session.info.pop("cache_tags", None)
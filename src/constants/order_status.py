@@ -6,3 +6,12 @@ class OrderStatus(str, Enum):
     DELIVERED = "delivered"
     CANCELLED = "cancelled"
     COMPLETED = "completed"
+
+
+# Statuses an order may move to from each status
+ORDER_STATUS_TRANSITIONS = {
+    OrderStatus.PENDING: {OrderStatus.DELIVERED, OrderStatus.CANCELLED},
+    OrderStatus.DELIVERED: {OrderStatus.COMPLETED},
+    OrderStatus.CANCELLED: set(),
+    OrderStatus.COMPLETED: set(),
+}
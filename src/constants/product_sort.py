@@ -0,0 +1,12 @@
+from enum import Enum
+
+
+class ProductSort(str, Enum):
+    PRICE = "price"
+    PRICE_DESC = "-price"
+    RATING = "rating"
+    RATING_DESC = "-rating"
+    CREATED_AT = "created_at"
+    CREATED_AT_DESC = "-created_at"
+    NAME = "name"
+    NAME_DESC = "-name"
@@ -0,0 +1,9 @@
+from enum import Enum
+
+
+class SalesDimension(str, Enum):
+    PRODUCT = "product"
+    CATEGORY = "category"
+    BRAND = "brand"
+    PROVINCE = "province"
+    PAYMENT_METHOD = "payment_method"
@@ -1,58 +1,224 @@
-from typing import Generator
+import logging
+import threading
+from typing import Generator, Optional, Tuple
 from fastapi import Request, Depends, HTTPException, status
-from sqlmodel import Session, SQLModel, create_engine, select
-
-import firebase_admin
-from firebase_admin import auth, credentials
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+from sqlmodel import Session, create_engine, select
 
+from src.database.profiling import (
+    instrument_engine_profiling,
+    profile_timing,
+)
+from src.database.replicas import ReplicaMonitor, current_read_consistency
+from src.database.timeouts import (
+    connect_args,
+    instrument_engine_cancellation,
+    route_statement_timeout,
+    set_statement_timeout,
+)
+from src.metrics import FIREBASE_CALL_DURATION, instrument_engine
 from src.models.user import User
+from src.ratelimit import rate_limiter
 from src.settings import settings
 
+logger = logging.getLogger(__name__)
+
+
+def pool_limits(workers: int) -> Tuple[int, int]:
+    """Split the instance's connection budget into (pool_size, overflow).
+
+    Every worker gets an equal share, minus the connection its
+    notification listener holds. Half of the share stays open, the rest
+    is overflow opened under bursts.
+    """
+    share = max(settings.DB_MAX_CONNECTIONS // workers - 1, 2)
+    pool_size = max(share // 2, 1)
+    return pool_size, share - pool_size
+
+
+pool_size, max_overflow = pool_limits(settings.WEB_CONCURRENCY or 1)
+
 # Create SQLAlchemy engine
 engine = create_engine(
     settings.DATABASE_URL,
     echo=False,  # Set to True to see SQL queries in console
+    pool_size=pool_size,
+    max_overflow=max_overflow,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    connect_args=connect_args(),
 )
+instrument_engine(engine)
+instrument_engine_cancellation(engine)
+if settings.SQL_PROFILING_ENABLED:
+    instrument_engine_profiling(engine)
+
+# Optional read replica for read-only endpoints, see get_read_session
+replica_engine = None
+replica_monitor: Optional[ReplicaMonitor] = None
+if settings.REPLICA_DATABASE_URL:
+    replica_engine = create_engine(
+        settings.REPLICA_DATABASE_URL,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        connect_args=connect_args(),
+    )
+    instrument_engine(replica_engine, "replica")
+    instrument_engine_cancellation(replica_engine)
+    if settings.SQL_PROFILING_ENABLED:
+        instrument_engine_profiling(replica_engine)
+    replica_monitor = ReplicaMonitor(replica_engine)
+
 
+class PrimarySession(Session):
+    """Session on the primary that remembers where its commits landed.
 
-def create_db_and_tables() -> None:
-    """Create database tables for all SQLModel models."""
-    SQLModel.metadata.create_all(engine)
+    With a replica configured, the WAL position after each commit is kept
+    for the request so that the client's next reads can wait for a
+    replica that has replayed it.
+    """
 
+    def commit(self) -> None:
+        super().commit()
+        consistency = current_read_consistency()
+        if replica_monitor is not None and consistency is not None:
+            consistency.written_lsn = self.scalar(
+                text("SELECT pg_current_wal_lsn()::text")
+            )
 
-def get_session() -> Generator[Session, None, None]:
+
+def _route_name(request: Request) -> Optional[str]:
+    route = request.scope.get("route")
+    return getattr(route, "name", None)
+
+
+def get_session(request: Request) -> Generator[Session, None, None]:
     """Dependency for database sessions."""
-    with Session(engine) as session:
+    with PrimarySession(engine) as session:
+        set_statement_timeout(
+            session, route_statement_timeout(_route_name(request))
+        )
+        yield session
+
+
+def get_read_session(request: Request) -> Generator[Session, None, None]:
+    """Dependency for read-only endpoints.
+
+    Uses the replica unless it lags by more than REPLICA_MAX_LAG_SECONDS
+    or has not yet replayed this client's latest write, in which case the
+    primary serves the read.
+    """
+    bind = engine
+    if replica_monitor is not None:
+        consistency = current_read_consistency()
+        min_lsn = consistency.min_lsn if consistency else None
+        if replica_monitor.can_serve(min_lsn):
+            bind = replica_engine
+    with Session(bind) as session:
+        # Responses read here must not be cached, see ResponseCache.store
+        session.info["replica"] = bind is not engine
+        set_statement_timeout(
+            session, route_statement_timeout(_route_name(request))
+        )
         yield session
         
         
-def create_firebase_auth() -> Generator[Session, None, None]:
-    """Initialize Firebase Admin SDK."""
-    if not firebase_admin._apps:
-        cred = credentials.Certificate(settings.FIREBASE_CRED)
-        firebase_admin.initialize_app(cred)
+_firebase_lock = threading.Lock()
+
+
+def create_firebase_auth():
+    """Initialize Firebase Admin SDK and return its ``auth`` module.
+
+    firebase_admin drags in the Google auth and HTTP client stacks, so it
+    is imported on first use instead of when a worker boots.
+    """
+    import firebase_admin
+    from firebase_admin import auth, credentials
+
+    with _firebase_lock:
+        if not firebase_admin._apps:
+            cred = credentials.Certificate(settings.FIREBASE_CRED)
+            firebase_admin.initialize_app(cred)
+    return auth
+
+
+def warm_up_firebase_auth() -> None:
+    """Initialize Firebase ahead of the first protected request.
+
+    Meant to run in a background thread after startup. Failures are only
+    logged, the first request that needs Firebase will retry.
+    """
+    if not settings.FIREBASE_WARM_UP:
+        return
+    try:
+        create_firebase_auth()
+    except Exception:
+        logger.exception("Firebase warm-up failed")
+
+
+def authenticate_token(id_token: str) -> dict:
+    """Verify a Firebase ID token and load the matching user record.
+
+    Raises 429 once the user exceeds the ``user`` rate limit.
+    """
+    with profile_timing("auth"):
+        # Outside the try: a broken Firebase setup is a server error
+        auth = create_firebase_auth()
+        try:
+            with FIREBASE_CALL_DURATION.labels("verify_id_token").time():
+                decoded_token = auth.verify_id_token(id_token)
+            uid = decoded_token["uid"]
+
+            # Full Firebase user record
+            with FIREBASE_CALL_DURATION.labels("get_user").time():
+                firebase_user = auth.get_user(uid)
+
+        except Exception:
+            raise HTTPException(status_code=401, detail="You are not authorized to access this resource.")
+
+    rate_limiter.check("user", f"uid:{uid}")
+    return {
+        "firebase_user": firebase_user,
+        "decoded_token": decoded_token,
+    }
 
 
 async def get_current_user(
     request: Request,
 ):
+    # Verified once per request, the idempotency key may already have
+    auth = getattr(request.state, "auth", None)
+    if auth is not None:
+        return auth
+
     auth_header = request.headers.get("Authorization")
     
     if not auth_header or not auth_header.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="You are not authorized to access this resource.")
 
-    try:
-        id_token = auth_header.split(" ")[1]
-        decoded_token = auth.verify_id_token(id_token)
-        uid = decoded_token["uid"]
+    # Token verification may fetch Google's signing keys and get_user is a
+    # network call, keep both off the event loop
+    request.state.auth = await run_in_threadpool(
+        authenticate_token, auth_header.split(" ")[1]
+    )
+    return request.state.auth
 
-        # Full Firebase user record
-        firebase_user = auth.get_user(uid)
 
-    except Exception:
-        raise HTTPException(status_code=401, detail="You are not authorized to access this resource.")
+def is_staff(session: Session, uid: str) -> bool:
+    user = session.get(User, uid)
+    return bool(user and user.is_admin)
 
-    return {
-        "firebase_user": firebase_user,
-        "decoded_token": decoded_token,
-    }
\ No newline at end of file
+
+def get_staff_user_id(
+    auth=Depends(get_current_user),
+    session: Session = Depends(get_session),
+) -> str:
+    """The id of the authenticated user, who must be staff (``is_admin``)."""
+    uid = auth["decoded_token"]["uid"]
+    if not is_staff(session, uid):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only staff can access this resource.",
+        )
+    return uid
@@ -0,0 +1,80 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import or_, update
+from sqlmodel import select
+
+from src.cache import invalidate_on_commit, product_tags
+from src.database.config import PrimarySession, engine
+from src.models.product.product import Product
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _update_in_batches(condition, **values) -> int:
+    """Apply ``values`` to the products matching ``condition``.
+
+    At most ``EXPIRY_BADGE_BATCH_SIZE`` rows per transaction, so row locks
+    stay short, and rows an API request is writing are skipped until the
+    next run instead of waited on. Returns how many products changed.
+    """
+    changed = 0
+    while True:
+        with PrimarySession(engine) as session:
+            batch = (
+                select(Product.id)
+                .where(condition)
+                .limit(settings.EXPIRY_BADGE_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+            )
+            products = session.exec(
+                update(Product)
+                .where(Product.id.in_(batch.scalar_subquery()))
+                .values(**values, updated_at=datetime.now(timezone.utc))
+                .returning(Product.id, Product.category_id, Product.brand_id)
+            ).all()
+            for product in products:
+                invalidate_on_commit(session, product_tags(product))
+            session.commit()
+        changed += len(products)
+        if len(products) < settings.EXPIRY_BADGE_BATCH_SIZE:
+            return changed
+
+
+def badge_expiring_products() -> int:
+    """Badge products in stock that expire within ``EXPIRY_BADGE_DAYS``.
+
+    Products already carrying another badge keep it. The badge comes off
+    once a product is sold out or its expiry is moved back.
+    """
+    horizon = datetime.now(timezone.utc) + timedelta(
+        days=settings.EXPIRY_BADGE_DAYS
+    )
+    expiring = (Product.stock > 0) & (Product.effective_expiry <= horizon)
+    badged = _update_in_batches(
+        expiring & Product.badge_label.is_(None),
+        badge_label=settings.EXPIRY_BADGE_LABEL,
+        badge_color=settings.EXPIRY_BADGE_COLOR,
+    )
+    cleared = _update_in_batches(
+        (Product.badge_label == settings.EXPIRY_BADGE_LABEL)
+        & or_(
+            Product.stock <= 0,
+            Product.effective_expiry.is_(None),
+            Product.effective_expiry > horizon,
+        ),
+        badge_label=None,
+        badge_color=None,
+    )
+    return badged + cleared
+
+
+async def badge_expiring_products_periodically() -> None:
+    while True:
+        try:
+            await asyncio.to_thread(badge_expiring_products)
+        except Exception:
+            logger.exception("Could not badge expiring products")
+        await asyncio.sleep(settings.EXPIRY_BADGE_REFRESH_SECONDS)
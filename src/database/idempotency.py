@@ -0,0 +1,221 @@
+import asyncio
+import hashlib
+import logging
+import uuid
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Optional
+
+from sqlalchemy import and_, delete, event, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from src.database.config import PrimarySession, engine
+from src.models.idempotency import (
+    COMMITTED,
+    COMPLETED,
+    IN_PROGRESS,
+    IdempotencyKey,
+)
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+
+_table = IdempotencyKey.__table__
+
+
+def fingerprint(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+@dataclass
+class IdempotentRequest:
+    """The key the current request claimed.
+
+    ``caller`` scopes the key to whoever sent it. ``attempt`` tells this
+    attempt's claim apart from a later one that took the key over, so
+    that neither can overwrite the other's row.
+    """
+
+    key: str
+    route: str
+    caller: str
+    attempt: str = field(default_factory=lambda: uuid.uuid4().hex)
+    started: bool = False  # the endpoint ran, its dependencies passed
+    committed: bool = False  # its business transaction has committed
+
+
+_current: ContextVar[Optional[IdempotentRequest]] = ContextVar(
+    "idempotent_request", default=None
+)
+
+
+def start_idempotent_request(request: IdempotentRequest) -> None:
+    _current.set(request)
+
+
+def current_idempotent_request() -> Optional[IdempotentRequest]:
+    return _current.get()
+
+
+def _where(request: IdempotentRequest):
+    return and_(
+        _table.c.key == request.key,
+        _table.c.route == request.route,
+        _table.c.caller == request.caller,
+    )
+
+
+def _owned(request: IdempotentRequest):
+    return and_(_where(request), _table.c.attempt == request.attempt)
+
+
+def claim(request: IdempotentRequest, request_fingerprint: str):
+    """Record a first attempt, or return the row of an earlier one.
+
+    Returns ``None`` when the caller should run the request: the key is
+    new, expired, or held by an attempt that stopped renewing it (its
+    worker died). A concurrent first attempt that has not committed its
+    claim yet makes this wait for it inside Postgres.
+    """
+    now = func.now()
+    statement = insert(_table).values(
+        key=request.key,
+        route=request.route,
+        caller=request.caller,
+        fingerprint=request_fingerprint,
+        status=IN_PROGRESS,
+        attempt=request.attempt,
+        locked_at=now,
+        created_at=now,
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[_table.c.key, _table.c.route, _table.c.caller],
+        set_={
+            "fingerprint": statement.excluded.fingerprint,
+            "status": IN_PROGRESS,
+            "attempt": statement.excluded.attempt,
+            "response_status": None,
+            "response_content_type": None,
+            "response_body": None,
+            "locked_at": now,
+            "created_at": now,
+        },
+        where=or_(
+            and_(
+                _table.c.status == IN_PROGRESS,
+                _table.c.fingerprint == statement.excluded.fingerprint,
+                _table.c.locked_at
+                < now - timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS),
+            ),
+            _table.c.created_at
+            < now - timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS),
+        ),
+    ).returning(_table.c.key)
+    with engine.begin() as connection:
+        if connection.execute(statement).first() is not None:
+            return None
+        return connection.execute(
+            select(_table).where(_where(request))
+        ).first()
+
+
+def renew(request: IdempotentRequest) -> None:
+    """Keep a running attempt's claim from being taken over."""
+    with engine.begin() as connection:
+        connection.execute(
+            update(_table)
+            .where(_owned(request), _table.c.status == IN_PROGRESS)
+            .values(locked_at=func.now())
+        )
+
+
+async def keep_claimed(request: IdempotentRequest) -> None:
+    """Renew the claim until cancelled, while the attempt runs."""
+    while True:
+        await asyncio.sleep(settings.IDEMPOTENCY_LOCK_SECONDS / 3)
+        try:
+            await asyncio.to_thread(renew, request)
+        except Exception:
+            logger.exception("Could not renew idempotency key claim")
+
+
+def complete(
+    request: IdempotentRequest,
+    status_code: int,
+    content_type: Optional[str],
+    body: bytes,
+) -> None:
+    """Store the response that retries of ``request`` will receive."""
+    with engine.begin() as connection:
+        connection.execute(
+            update(_table)
+            .where(_owned(request))
+            .values(
+                status=COMPLETED,
+                response_status=status_code,
+                response_content_type=content_type,
+                response_body=body,
+            )
+        )
+
+
+def release(request: IdempotentRequest) -> None:
+    """Forget a failed attempt so that a retry runs it again."""
+    with engine.begin() as connection:
+        connection.execute(
+            delete(_table).where(
+                _owned(request),
+                _table.c.status == IN_PROGRESS,
+            )
+        )
+
+
+def purge_expired() -> int:
+    with engine.begin() as connection:
+        return connection.execute(
+            delete(_table).where(
+                _table.c.created_at
+                < func.now()
+                - timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS)
+            )
+        ).rowcount
+
+
+async def purge_expired_periodically() -> None:
+    while True:
+        try:
+            await asyncio.to_thread(purge_expired)
+        except Exception:
+            logger.exception("Could not purge expired idempotency keys")
+        await asyncio.sleep(settings.IDEMPOTENCY_PURGE_SECONDS)
+
+
+# The claim is marked committed in the business transaction itself, so a
+# crash between that commit and storing the response can never lead a
+# retry to run the request a second time.
+@event.listens_for(PrimarySession, "before_commit")
+def _mark_committed(session) -> None:
+    request = _current.get()
+    if request is None or request.committed:
+        return
+    session.execute(
+        update(_table)
+        .where(_owned(request))
+        .values(status=COMMITTED)
+    )
+    session.info["idempotency_marked"] = True
+
+
+@event.listens_for(PrimarySession, "after_commit")
+def _committed(session) -> None:
+    request = _current.get()
+    if session.info.pop("idempotency_marked", False) and request is not None:
+        request.committed = True
+
+
+@event.listens_for(PrimarySession, "after_rollback")
+def _rolled_back(session) -> None:
+    session.info.pop("idempotency_marked", None)
@@ -0,0 +1,130 @@
+import ast
+from pathlib import Path
+from typing import List, Set
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+# Alembic itself is imported inside the functions that run migrations: it
+# costs more to import than the rest of the database layer, and workers
+# only need to read the current revision.
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+VERSIONS_DIR = ALEMBIC_INI.parent / "migrations" / "versions"
+
+
+class SchemaVersionError(RuntimeError):
+    """The database is not at the schema version this code expects."""
+
+
+def alembic_config():
+    from alembic.config import Config
+
+    return Config(str(ALEMBIC_INI))
+
+
+def upgrade_database(revision: str = "head") -> None:
+    """Apply pending migrations, like ``alembic upgrade head``."""
+    from alembic import command
+
+    command.upgrade(alembic_config(), revision)
+
+
+def _script_heads() -> Set[str]:
+    """Head revisions of ``migrations/versions``, read without alembic."""
+    revisions: Set[str] = set()
+    parents: Set[str] = set()
+    for path in VERSIONS_DIR.glob("*.py"):
+        for node in ast.parse(path.read_text()).body:
+            if not isinstance(node, ast.AnnAssign | ast.Assign):
+                continue
+            targets = (
+                [node.target] if isinstance(node, ast.AnnAssign)
+                else node.targets
+            )
+            names = {t.id for t in targets if isinstance(t, ast.Name)}
+            if "revision" in names:
+                revisions.add(ast.literal_eval(node.value))
+            elif "down_revision" in names:
+                down = ast.literal_eval(node.value)
+                if isinstance(down, str):
+                    parents.add(down)
+                elif down:
+                    parents.update(down)
+    return revisions - parents
+
+
+def check_schema_version(engine: Engine) -> None:
+    """Fail fast unless the database is at the latest migration.
+
+    Only ``alembic_version`` is read, and alembic is not imported, which
+    keeps worker startup cheap and free of DDL. Migrations are applied
+    separately with ``make migrate`` before deploying.
+    """
+    expected = _script_heads()
+    with engine.connect() as connection:
+        current = set()
+        if inspect(connection).has_table("alembic_version"):
+            current = set(
+                connection.scalars(
+                    text("SELECT version_num FROM alembic_version")
+                )
+            )
+    if current != expected:
+        raise SchemaVersionError(
+            f"Database schema is at {sorted(current) or 'no revision'} but "
+            f"the code expects {sorted(expected)}. Run `make migrate`."
+        )
+
+
+def create_index_concurrently(
+    name: str, table: str, columns: List[str], **kwargs
+) -> None:
+    """Build an index without blocking writes to ``table``.
+
+    ``CREATE INDEX CONCURRENTLY`` cannot run inside a transaction, so the
+    build steps out of the revision's transaction. A build interrupted
+    earlier leaves an INVALID index behind; it is dropped and rebuilt.
+    In offline mode (``--sql``) there is no database to check, so only
+    the ``CREATE INDEX CONCURRENTLY IF NOT EXISTS`` is emitted.
+    """
+    from alembic import context, op
+
+    with op.get_context().autocommit_block():
+        invalid = None
+        if not context.is_offline_mode():
+            invalid = op.get_bind().execute(
+                text(
+                    "SELECT 1 FROM pg_index i"
+                    " JOIN pg_class c ON c.oid = i.indexrelid"
+                    " WHERE c.relname = :name AND NOT i.indisvalid"
+                ),
+                {"name": name},
+            ).first()
+        if invalid:
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+        op.create_index(
+            name,
+            table,
+            columns,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+            **kwargs,
+        )
+
+
+def drop_index_concurrently(name: str, table: str) -> None:
+    from alembic import op
+
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            name,
+            table_name=table,
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,256 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Published by the triggers in migrations/versions/0002_notification_triggers
+PRODUCT_CHANGES_CHANNEL = "product_changes"
+ORDER_CHANGES_CHANNEL = "order_changes"
+
+
+def product_key(product_id: str) -> str:
+    return f"product:{product_id}"
+
+
+def category_key(category_id: str) -> str:
+    return f"category:{category_id}"
+
+
+def user_key(user_id: str) -> str:
+    return f"user:{user_id}"
+
+
+class Subscription:
+    """A single subscriber's queue of pending events.
+
+    Events are coalesced by ``(channel, id)``: a slow consumer only ever
+    holds the latest state of each row, so memory stays bounded by the
+    number of rows it watches instead of by the update rate.
+    """
+
+    def __init__(self, broker: "Broker", keys: Set[str], max_pending: int):
+        self.keys = frozenset(keys)
+        self.overflowed = False
+        self.terminated = False
+        self._broker = broker
+        self._max_pending = max_pending
+        self._pending: Dict[Tuple[str, str], dict] = {}
+        self._wakeup = asyncio.Event()
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def active(self) -> bool:
+        return not (self.overflowed or self.terminated)
+
+    def terminate(self) -> None:
+        """Ask the consumer to stop, e.g. because the worker is exiting."""
+        self.terminated = True
+        self._wakeup.set()
+
+    def push(self, channel: str, event: dict) -> None:
+        key = (channel, str(event.get("id")))
+        if key in self._pending:
+            # Re-insert so delivery order follows the latest update
+            del self._pending[key]
+        elif len(self._pending) >= self._max_pending:
+            self.overflowed = True
+            self._wakeup.set()
+            return
+        self._pending[key] = event
+        self._wakeup.set()
+
+    async def get(self, timeout: float) -> List[Tuple[str, dict]]:
+        """Wait up to ``timeout`` seconds and drain the pending events."""
+        if not self._pending and self.active:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._wakeup.clear()
+        events = [
+            (channel, event) for (channel, _), event in self._pending.items()
+        ]
+        self._pending.clear()
+        return events
+
+    def close(self) -> None:
+        self._broker.unsubscribe(self)
+
+
+class Broker:
+    """In-process pub/sub indexed by subscription key.
+
+    Publishing costs one lookup per event key, independent of how many
+    subscribers are connected to the worker.
+    """
+
+    def __init__(self) -> None:
+        self._subscriptions: Dict[str, Set[Subscription]] = defaultdict(set)
+
+    def subscribe(
+        self, keys: Iterable[str], max_pending: Optional[int] = None
+    ) -> Subscription:
+        subscription = Subscription(
+            self,
+            set(keys),
+            max_pending or settings.SSE_MAX_PENDING_EVENTS,
+        )
+        for key in subscription.keys:
+            self._subscriptions[key].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        for key in subscription.keys:
+            subscribers = self._subscriptions.get(key)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscriptions[key]
+
+    def terminate_all(self) -> None:
+        for subscription in set().union(*self._subscriptions.values()):
+            subscription.terminate()
+
+    def publish(self, channel: str, keys: Iterable[str], event: dict) -> None:
+        targets: Set[Subscription] = set()
+        for key in keys:
+            targets.update(self._subscriptions.get(key, ()))
+        for subscription in targets:
+            subscription.push(channel, event)
+
+
+class NotificationListener:
+    """Single LISTEN connection per worker feeding the broker.
+
+    The connection is watched with ``loop.add_reader`` so no thread or
+    pooled connection is held, and it is re-established with exponential
+    backoff if Postgres goes away.
+    """
+
+    def __init__(self, dsn: str, broker: Broker) -> None:
+        self._dsn = dsn
+        self._broker = broker
+        self._channels: Dict[str, Callable[[dict], Iterable[str]]] = {}
+        self._callbacks: Dict[str, List[Callable[[dict], None]]] = (
+            defaultdict(list)
+        )
+        self._task: Optional[asyncio.Task] = None
+
+    def register(
+        self, channel: str, keys_for: Callable[[dict], Iterable[str]]
+    ) -> None:
+        """Route ``channel`` payloads to the subscription keys returned."""
+        self._channels[channel] = keys_for
+
+    def watch(self, channel: str, callback: Callable[[dict], None]) -> None:
+        """Call ``callback`` with every ``channel`` payload in this worker."""
+        self._callbacks[channel].append(callback)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        backoff = 1.0
+        while True:
+            connection = None
+            try:
+                connection = await asyncio.to_thread(self._connect)
+                backoff = 1.0
+                await self._consume(connection)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception(
+                    "Notification listener failed, retrying in %ss", backoff
+                )
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if connection is not None:
+                    connection.close()
+
+    def _connect(self):
+        connection = psycopg2.connect(self._dsn)
+        connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        with connection.cursor() as cursor:
+            for channel in {*self._channels, *self._callbacks}:
+                cursor.execute(f"LISTEN {channel}")
+        return connection
+
+    async def _consume(self, connection) -> None:
+        loop = asyncio.get_running_loop()
+        readable = asyncio.Event()
+        fileno = connection.fileno()
+        loop.add_reader(fileno, readable.set)
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(
+                        readable.wait(), settings.NOTIFY_KEEPALIVE_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    # Surfaces half-open connections as errors
+                    with connection.cursor() as cursor:
+                        cursor.execute("SELECT 1")
+                readable.clear()
+                connection.poll()
+                while connection.notifies:
+                    notify = connection.notifies.pop(0)
+                    self._dispatch(notify.channel, notify.payload)
+        finally:
+            loop.remove_reader(fileno)
+
+    def _dispatch(self, channel: str, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning("Discarding malformed payload on %s", channel)
+            return
+        for callback in self._callbacks.get(channel, ()):
+            try:
+                callback(event)
+            except Exception:
+                logger.exception("Notification callback failed on %s", channel)
+        keys_for = self._channels.get(channel)
+        if keys_for is not None:
+            self._broker.publish(channel, keys_for(event), event)
+
+
+broker = Broker()
+listener = NotificationListener(settings.DATABASE_URL, broker)
+listener.register(
+    PRODUCT_CHANGES_CHANNEL,
+    lambda event: (
+        product_key(event["id"]),
+        category_key(event["category_id"]),
+    ),
+)
+listener.register(
+    ORDER_CHANGES_CHANNEL,
+    lambda event: (user_key(event["user_id"]),),
+)
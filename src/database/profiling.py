@@ -0,0 +1,236 @@
+import functools
+import inspect
+import json
+import logging
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.settings import settings
+
+logger = logging.getLogger("src.profiling")
+slow_query_logger = logging.getLogger("src.profiling.slow_queries")
+
+
+@dataclass
+class StatementRecord:
+    statement: str
+    duration_ms: float
+    rowcount: int
+
+
+@dataclass
+class RequestProfile:
+    """Everything the profiler learned about one request."""
+
+    method: str
+    path: str
+    statements: List[StatementRecord] = field(default_factory=list)
+    timings: Dict[str, float] = field(default_factory=dict)
+    endpoint_done_at: Optional[float] = None
+
+    @property
+    def db_seconds(self) -> float:
+        return sum(s.duration_ms for s in self.statements) / 1000
+
+    def add_timing(self, name: str, seconds: float) -> None:
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def server_timing(self, total_seconds: float) -> str:
+        """Render the ``Server-Timing`` header value."""
+        metrics = [
+            f'db;dur={self.db_seconds * 1000:.2f};'
+            f'desc="{len(self.statements)} statements"'
+        ]
+        for name, seconds in self.timings.items():
+            metrics.append(f"{name};dur={seconds * 1000:.2f}")
+        metrics.append(f"total;dur={total_seconds * 1000:.2f}")
+        return ", ".join(metrics)
+
+    def as_log_record(self) -> dict:
+        return {
+            "event": "request_profile",
+            "method": self.method,
+            "path": self.path,
+            "db_ms": round(self.db_seconds * 1000, 2),
+            "timings_ms": {
+                name: round(seconds * 1000, 2)
+                for name, seconds in self.timings.items()
+            },
+            "statements": [
+                {
+                    "statement": s.statement,
+                    "duration_ms": round(s.duration_ms, 2),
+                    "rowcount": s.rowcount,
+                }
+                for s in self.statements
+            ],
+        }
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar(
+    "request_profile", default=None
+)
+
+
+def start_profile(method: str, path: str) -> RequestProfile:
+    profile = RequestProfile(method=method, path=path)
+    _current_profile.set(profile)
+    return profile
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _current_profile.get()
+
+
+@contextmanager
+def profile_timing(name: str) -> Iterator[None]:
+    """Add the wrapped block's duration to the current request profile."""
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_timing(name, time.perf_counter() - start)
+
+
+# Reads that must not run twice: row locks, writes in a WITH, and calls
+# with side effects
+_NOT_REPEATABLE = re.compile(
+    r"\b(UPDATE|SHARE|INSERT|DELETE|MERGE)\b"
+    r"|\b(pg_notify|nextval|setval|set_config|pg_advisory_\w*"
+    r"|pg_try_advisory_\w*|pg_cancel_backend|pg_terminate_backend)\s*\(",
+    re.IGNORECASE,
+)
+
+
+def _explain(cursor, statement: str, parameters) -> Optional[list]:
+    """Capture the plan of a read-only statement on the same connection.
+
+    ANALYZE runs the statement a second time, which is why this is only
+    done in dev mode and never for writes or locking reads. It runs in a
+    savepoint, so a failure, such as hitting the statement timeout, does
+    not abort the request's transaction.
+    """
+    if statement.lstrip().split(" ", 1)[0].upper() not in ("SELECT", "WITH"):
+        return None
+    if _NOT_REPEATABLE.search(statement):
+        return None
+    connection = cursor.connection
+    in_transaction = not connection.autocommit
+    with connection.cursor() as explain_cursor:
+        if in_transaction:
+            explain_cursor.execute("SAVEPOINT profiling_explain")
+        try:
+            explain_cursor.execute(
+                "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + statement,
+                parameters,
+            )
+            plan = explain_cursor.fetchone()[0]
+        except Exception as e:
+            if in_transaction:
+                explain_cursor.execute(
+                    "ROLLBACK TO SAVEPOINT profiling_explain"
+                )
+            return [{"error": str(e)}]
+        if in_transaction:
+            explain_cursor.execute("RELEASE SAVEPOINT profiling_explain")
+        return plan
+
+
+def _before_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+):
+    context._profiling_start = time.perf_counter()
+
+
+def _after_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+):
+    duration_ms = (time.perf_counter() - context._profiling_start) * 1000
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.statements.append(
+            StatementRecord(statement, duration_ms, cursor.rowcount)
+        )
+
+    if duration_ms < settings.SLOW_QUERY_THRESHOLD_MS:
+        return
+    record = {
+        "event": "slow_query",
+        "duration_ms": round(duration_ms, 2),
+        "rowcount": cursor.rowcount,
+        "statement": statement,
+        "path": profile.path if profile else None,
+    }
+    if settings.SQL_EXPLAIN_SLOW_QUERIES and not executemany:
+        record["plan"] = _explain(cursor, statement, parameters)
+    slow_query_logger.warning(json.dumps(record, default=str))
+
+
+def instrument_engine_profiling(engine: Engine) -> None:
+    """Record every statement on ``engine`` into the request profile."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _mark_endpoint_done(endpoint: Callable) -> Callable:
+    def mark() -> None:
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.endpoint_done_at = time.perf_counter()
+
+    if inspect.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                mark()
+
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            mark()
+
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """APIRoute that attributes response validation and serialization time.
+
+    Everything between the endpoint returning and the response object
+    being ready is reported as ``serialize`` in the request profile.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs) -> None:
+        super().__init__(path, _mark_endpoint_done(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def profiled_handler(request):
+            response = await handler(request)
+            profile = _current_profile.get()
+            if profile is not None and profile.endpoint_done_at is not None:
+                profile.add_timing(
+                    "serialize", time.perf_counter() - profile.endpoint_done_at
+                )
+            return response
+
+        return profiled_handler
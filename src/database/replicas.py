@@ -0,0 +1,121 @@
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from src.metrics import DB_READ_ROUTES
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Carries the WAL position of a client's last write so that its next reads
+# only hit a replica that has replayed it
+LSN_COOKIE = "omega_lsn"
+LSN_HEADER = "x-min-lsn"
+
+
+def parse_lsn(value: Optional[str]) -> Optional[int]:
+    """Turn a ``pg_lsn`` such as ``16/B374D848`` into a comparable int."""
+    if not value:
+        return None
+    try:
+        high, low = value.split("/")
+        return (int(high, 16) << 32) | int(low, 16)
+    except ValueError:
+        return None
+
+
+@dataclass
+class ReadConsistency:
+    """Per-request read-your-writes state."""
+
+    min_lsn: Optional[int] = None  # sent by the client
+    written_lsn: Optional[str] = None  # set when this request commits
+
+
+_read_consistency: ContextVar[Optional[ReadConsistency]] = ContextVar(
+    "read_consistency", default=None
+)
+
+
+def start_read_consistency(min_lsn: Optional[int]) -> ReadConsistency:
+    consistency = ReadConsistency(min_lsn=min_lsn)
+    _read_consistency.set(consistency)
+    return consistency
+
+
+def current_read_consistency() -> Optional[ReadConsistency]:
+    return _read_consistency.get()
+
+
+@dataclass
+class ReplicaStatus:
+    replay_lsn: Optional[int]
+    lag_seconds: float
+    checked_at: float
+
+
+class ReplicaMonitor:
+    """Cached view of how far behind a replica is.
+
+    At most one request per ``REPLICA_LAG_CHECK_SECONDS`` pays for the
+    check; the others read the cached status. An unreachable replica is
+    treated as infinitely behind until the next check.
+    """
+
+    _query = text(
+        "SELECT pg_last_wal_replay_lsn()::text,"
+        " CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn()"
+        " THEN 0"
+        " ELSE COALESCE(EXTRACT(EPOCH FROM"
+        " now() - pg_last_xact_replay_timestamp()), 0)"
+        " END"
+    )
+
+    def __init__(self, engine: Engine) -> None:
+        self.engine = engine
+        self._status: Optional[ReplicaStatus] = None
+        self._lock = threading.Lock()
+
+    def status(self) -> ReplicaStatus:
+        status = self._status
+        now = time.monotonic()
+        max_age = settings.REPLICA_LAG_CHECK_SECONDS
+        if status and now - status.checked_at < max_age:
+            return status
+        # Only one thread refreshes; the others keep using the stale value
+        if not self._lock.acquire(blocking=status is None):
+            return status
+        try:
+            self._status = self._check(now)
+            return self._status
+        finally:
+            self._lock.release()
+
+    def _check(self, now: float) -> ReplicaStatus:
+        try:
+            with self.engine.connect() as connection:
+                replay_lsn, lag = connection.execute(self._query).one()
+            return ReplicaStatus(parse_lsn(replay_lsn), float(lag), now)
+        except Exception:
+            logger.exception("Replica status check failed")
+            return ReplicaStatus(None, float("inf"), now)
+
+    def can_serve(self, min_lsn: Optional[int]) -> bool:
+        """Whether reads may go to the replica, recording the decision."""
+        status = self.status()
+        if status.lag_seconds > settings.REPLICA_MAX_LAG_SECONDS:
+            DB_READ_ROUTES.labels("primary", "lag").inc()
+            return False
+        if min_lsn is not None and (
+            status.replay_lsn is None or status.replay_lsn < min_lsn
+        ):
+            DB_READ_ROUTES.labels("primary", "read_your_writes").inc()
+            return False
+        DB_READ_ROUTES.labels("replica", "").inc()
+        return True
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+
+from sqlalchemy import (
+    BigInteger,
+    Date,
+    any_,
+    cast,
+    delete,
+    func,
+    literal,
+    select,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+
+from src.database.config import engine
+from src.database.timeouts import set_local_statement_timeout
+from src.models.order.address import Address
+from src.models.order.order import Order
+from src.models.order.order_item import OrderItem
+from src.models.order.payment import PaymentMethod
+from src.models.product.product import Product
+from src.models.reporting import (
+    BrandSalesDaily,
+    CategorySalesDaily,
+    PaymentMethodSalesDaily,
+    ProductSalesDaily,
+    ProvinceSalesDaily,
+    SalesRollupQueue,
+)
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_queue = SalesRollupQueue.__table__
+
+# Held for the refresh transaction, so one worker refreshes at a time and
+# concurrent upserts cannot deadlock on the same rollup rows
+_REFRESH_LOCK = 7_236_001
+
+# Rollup model, its dimension column and where that comes from. Items keep
+# the category and brand of their sale, so its cancellation is taken back
+# out of the same rollup rows even after the product moved.
+ROLLUPS = [
+    (ProductSalesDaily, "product_id", OrderItem.product_id),
+    (
+        CategorySalesDaily,
+        "category_id",
+        func.coalesce(OrderItem.category_id, Product.category_id),
+    ),
+    (
+        BrandSalesDaily,
+        "brand_id",
+        func.coalesce(OrderItem.brand_id, Product.brand_id),
+    ),
+    (ProvinceSalesDaily, "province", Address.province),
+    (PaymentMethodSalesDaily, "payment_method_type", PaymentMethod.type),
+]
+
+
+def _rollup_upsert(model, key: str, source, batch):
+    """Add the net sales of the ``batch`` queue rows to ``model``."""
+    sign = _queue.c.sign
+    day = cast(func.timezone("UTC", Order.created_at), Date)
+    price = func.coalesce(OrderItem.unit_price, Product.current_price)
+    rows = (
+        select(
+            day.label("day"),
+            source.label(key),
+            (
+                func.count(Order.id.distinct()).filter(sign > 0)
+                - func.count(Order.id.distinct()).filter(sign < 0)
+            ).label("orders"),
+            func.sum(sign * OrderItem.quantity).label("units"),
+            func.sum(sign * OrderItem.quantity * price).label("revenue"),
+        )
+        .select_from(_queue)
+        .join(OrderItem, OrderItem.id == _queue.c.order_item_id)
+        .join(Order, Order.id == OrderItem.order_id)
+        .join(Product, Product.id == OrderItem.product_id)
+        .join(Address, Address.id == Order.address_id)
+        .join(PaymentMethod, PaymentMethod.id == Order.payment_method_id)
+        .where(batch)
+        .group_by(day, source)
+    )
+    statement = insert(model).from_select(
+        ["day", key, "orders", "units", "revenue"], rows
+    )
+    table = model.__table__
+    return statement.on_conflict_do_update(
+        index_elements=["day", key],
+        set_={
+            "orders": table.c.orders + statement.excluded.orders,
+            "units": table.c.units + statement.excluded.units,
+            "revenue": table.c.revenue + statement.excluded.revenue,
+        },
+    )
+
+
+def refresh_sales_rollups(batch_size: int) -> int:
+    """Fold about ``batch_size`` queued order items into the rollups.
+
+    The rollups and the queue change in one transaction, so every item is
+    counted exactly once. Returns how many queue rows were consumed; 0 also
+    when another worker is refreshing.
+    """
+    with engine.begin() as connection:
+        set_local_statement_timeout(
+            connection, settings.SALES_ROLLUP_STATEMENT_TIMEOUT_MS
+        )
+        if not connection.execute(
+            select(func.pg_try_advisory_xact_lock(_REFRESH_LOCK))
+        ).scalar():
+            return 0
+        # Whole orders at a time: an order split across two batches would
+        # be counted in both
+        head = (
+            select(_queue.c.order_id, _queue.c.sign)
+            .order_by(_queue.c.id)
+            .limit(batch_size)
+            .subquery()
+        )
+        ids = connection.execute(
+            select(_queue.c.id).where(
+                tuple_(_queue.c.order_id, _queue.c.sign).in_(select(head))
+            )
+        ).scalars().all()
+        if not ids:
+            return 0
+        batch = _queue.c.id == any_(literal(list(ids), ARRAY(BigInteger)))
+        for model, key, source in ROLLUPS:
+            connection.execute(_rollup_upsert(model, key, source, batch))
+        connection.execute(delete(_queue).where(batch))
+        return len(ids)
+
+
+def refresh_all_sales_rollups() -> int:
+    """Drain the queue. Returns how many queue rows were consumed."""
+    total = 0
+    while True:
+        count = refresh_sales_rollups(settings.SALES_ROLLUP_BATCH_SIZE)
+        total += count
+        if count < settings.SALES_ROLLUP_BATCH_SIZE:
+            return total
+
+
+async def refresh_sales_rollups_periodically() -> None:
+    while True:
+        try:
+            await asyncio.to_thread(refresh_all_sales_rollups)
+        except Exception:
+            logger.exception("Could not refresh the sales rollups")
+        await asyncio.sleep(settings.SALES_ROLLUP_REFRESH_SECONDS)
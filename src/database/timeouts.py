@@ -0,0 +1,146 @@
+import logging
+import threading
+from contextvars import ContextVar
+from typing import Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from src.metrics import DB_QUERIES_CANCELLED
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# SQLSTATE query_canceled, raised for statement timeouts and cancel requests
+QUERY_CANCELED = "57014"
+
+
+def connect_args() -> dict:
+    """Engine ``connect_args`` giving every connection the default budget.
+
+    Setting it at connect time costs nothing per request; only routes with
+    their own budget pay for a ``SET LOCAL``.
+    """
+    return {
+        "options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+    }
+
+
+def set_local_statement_timeout(connection, timeout_ms: int) -> None:
+    """Budget for the rest of ``connection``'s transaction; 0 lifts it.
+
+    For batch jobs, whose statements outgrow the per-request default.
+    """
+    connection.exec_driver_sql(
+        f"SET LOCAL statement_timeout = {int(timeout_ms)}"
+    )
+
+
+def route_statement_timeout(route_name: Optional[str]) -> int:
+    """Statement budget in milliseconds for the named endpoint."""
+    return settings.DB_ROUTE_STATEMENT_TIMEOUTS_MS.get(
+        route_name, settings.DB_STATEMENT_TIMEOUT_MS
+    )
+
+
+def set_statement_timeout(session: Session, timeout_ms: int) -> None:
+    """Apply ``timeout_ms`` to every transaction ``session`` begins."""
+    if timeout_ms != settings.DB_STATEMENT_TIMEOUT_MS:
+        session.info["statement_timeout_ms"] = int(timeout_ms)
+
+
+@event.listens_for(Session, "after_begin")
+def _set_local_statement_timeout(session, transaction, connection) -> None:
+    timeout_ms = session.info.get("statement_timeout_ms")
+    if timeout_ms is not None:
+        set_local_statement_timeout(connection, timeout_ms)
+
+
+class ClientDisconnected(Exception):
+    """The client went away, so the request's queries are not worth running."""
+
+
+class QueryCancellation:
+    """Tracks the DBAPI connections a request is running statements on.
+
+    When the client disconnects, ``cancel`` asks Postgres to stop whatever
+    those connections are executing and any later statement of the request
+    fails straight away, so its pooled connections are released at once.
+    """
+
+    def __init__(self) -> None:
+        self.disconnected = False
+        self._running: Set = set()
+        self._lock = threading.Lock()
+
+    def started(self, dbapi_connection) -> None:
+        with self._lock:
+            if self.disconnected:
+                raise ClientDisconnected()
+            self._running.add(dbapi_connection)
+
+    def finished(self, dbapi_connection) -> None:
+        with self._lock:
+            self._running.discard(dbapi_connection)
+
+    def cancel(self) -> None:
+        """Cancel running statements. Blocks on the cancel round trip."""
+        with self._lock:
+            self.disconnected = True
+            for dbapi_connection in self._running:
+                try:
+                    dbapi_connection.cancel()
+                    DB_QUERIES_CANCELLED.labels("disconnect").inc()
+                except Exception:
+                    logger.exception("Could not cancel query")
+
+
+_query_cancellation: ContextVar[Optional[QueryCancellation]] = ContextVar(
+    "query_cancellation", default=None
+)
+
+
+def start_query_cancellation() -> QueryCancellation:
+    cancellation = QueryCancellation()
+    _query_cancellation.set(cancellation)
+    return cancellation
+
+
+def current_query_cancellation() -> Optional[QueryCancellation]:
+    return _query_cancellation.get()
+
+
+def _before_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+):
+    cancellation = _query_cancellation.get()
+    if cancellation is not None:
+        cancellation.started(cursor.connection)
+
+
+def _after_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+):
+    cancellation = _query_cancellation.get()
+    if cancellation is not None:
+        cancellation.finished(cursor.connection)
+
+
+def _handle_error(context) -> None:
+    cancellation = _query_cancellation.get()
+    execution = context.execution_context
+    if cancellation is not None and execution is not None:
+        cancellation.finished(execution.cursor.connection)
+    pgcode = getattr(context.original_exception, "pgcode", None)
+    if pgcode == QUERY_CANCELED and not (
+        cancellation is not None and cancellation.disconnected
+    ):
+        DB_QUERIES_CANCELLED.labels("statement_timeout").inc()
+
+
+def instrument_engine_cancellation(engine: Engine) -> None:
+    """Let client disconnects cancel statements running on ``engine``."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
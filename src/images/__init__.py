@@ -0,0 +1,12 @@
+# Imported by the image worker processes, so only the Pillow side is
+# re-exported here; the server side lives in src.images.pipeline.
+from src.images.processing import InvalidImage, ingest
+from src.images.storage import MEDIA_TYPES, image_directory, stored_file
+
+__all__ = [
+    "InvalidImage",
+    "MEDIA_TYPES",
+    "image_directory",
+    "ingest",
+    "stored_file",
+]
@@ -0,0 +1,54 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Optional
+
+from src.images.processing import ingest
+from src.metrics import IMAGE_INGEST_DURATION
+from src.settings import settings
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # Spawned rather than forked: the server process runs threads and
+        # an event loop that a fork would copy in an unknown state
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_PROCESS_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            max_tasks_per_child=settings.IMAGE_TASKS_PER_PROCESS,
+        )
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+
+
+async def ingest_upload(data: bytes) -> dict:
+    """Store an upload and build its variants in the process pool.
+
+    Decoding and encoding are CPU bound and would otherwise stall the event
+    loop, or hold the GIL against the threadpool serving other requests.
+    Raises ``InvalidImage`` when ``data`` is not an accepted image.
+    """
+    loop = asyncio.get_running_loop()
+    with IMAGE_INGEST_DURATION.time():
+        return await loop.run_in_executor(
+            _get_pool(),
+            partial(
+                ingest,
+                data,
+                settings.IMAGE_STORAGE_DIR,
+                settings.IMAGE_VARIANT_WIDTHS,
+                settings.IMAGE_VARIANT_FORMATS,
+                settings.IMAGE_VARIANT_QUALITY,
+                settings.IMAGE_MAX_PIXELS,
+            ),
+        )
@@ -0,0 +1,122 @@
+"""Decoding and resizing of uploaded images.
+
+``ingest`` runs in worker processes, so this module only depends on Pillow
+and the storage helpers and receives its settings as arguments. Pillow is
+imported on first use to keep it off the server's startup path.
+"""
+
+import hashlib
+import io
+from typing import TYPE_CHECKING, List, Sequence
+
+from src.images.storage import MEDIA_TYPES, image_directory, write_atomic
+
+if TYPE_CHECKING:
+    from PIL.Image import Image as PillowImage
+
+# Pillow format name -> file extension of the stored original
+_ORIGINAL_FORMATS = {"JPEG": "jpg", "PNG": "png", "GIF": "gif", "WEBP": "webp"}
+
+
+class InvalidImage(ValueError):
+    """The upload is not an image we accept."""
+
+
+def _open(data: bytes, max_pixels: int) -> "PillowImage":
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        with Image.open(io.BytesIO(data)) as probe:
+            if probe.format not in _ORIGINAL_FORMATS:
+                raise InvalidImage(
+                    f"Unsupported image format {probe.format}"
+                )
+            # Checked before decoding, a small file can expand enormously
+            if probe.width * probe.height > max_pixels:
+                raise InvalidImage("Image has too many pixels")
+            probe.verify()
+        image = Image.open(io.BytesIO(data))
+        image.load()
+    except UnidentifiedImageError:
+        raise InvalidImage("Not a supported image file") from None
+    except Image.DecompressionBombError as e:
+        raise InvalidImage(str(e)) from None
+    except (OSError, SyntaxError) as e:
+        raise InvalidImage(f"Corrupt image: {e}") from None
+    return image
+
+
+def _for_encoding(image: "PillowImage") -> "PillowImage":
+    if image.mode in ("RGB", "RGBA"):
+        return image
+    has_alpha = "A" in image.getbands() or "transparency" in image.info
+    return image.convert("RGBA" if has_alpha else "RGB")
+
+
+def ingest(
+    data: bytes,
+    root: str,
+    widths: Sequence[int],
+    formats: Sequence[str],
+    quality: int,
+    max_pixels: int,
+) -> dict:
+    """Store an uploaded original and its resized variants.
+
+    Variants are made for every width in ``widths`` narrower than the
+    original, in every format of ``formats`` this Pillow build can encode.
+    Files that already exist are not encoded again.
+    """
+    from PIL import Image, ImageOps, features
+
+    digest = hashlib.sha256(data).hexdigest()
+    image = _open(data, max_pixels)
+    extension = _ORIGINAL_FORMATS[image.format]
+    directory = image_directory(root, digest)
+
+    original = directory / f"original.{extension}"
+    if not original.exists():
+        write_atomic(original, data)
+
+    # Phones record rotation in EXIF; variants are stored upright
+    upright = _for_encoding(ImageOps.exif_transpose(image))
+    variants: List[dict] = []
+    for width in sorted(set(widths)):
+        if width >= upright.width:
+            continue
+        height = max(1, round(upright.height * width / upright.width))
+        resized = None
+        for image_format in formats:
+            if not features.check(image_format):
+                continue
+            name = f"w{width}.{image_format}"
+            path = directory / name
+            if not path.exists():
+                if resized is None:
+                    resized = upright.resize(
+                        (width, height), Image.Resampling.LANCZOS
+                    )
+                buffer = io.BytesIO()
+                resized.save(
+                    buffer, format=image_format.upper(), quality=quality
+                )
+                write_atomic(path, buffer.getvalue())
+            variants.append(
+                {
+                    "name": name,
+                    "width": width,
+                    "height": height,
+                    "content_type": MEDIA_TYPES[image_format],
+                    "size": path.stat().st_size,
+                }
+            )
+
+    return {
+        "digest": digest,
+        "original": original.name,
+        "content_type": MEDIA_TYPES[extension],
+        "size": len(data),
+        "width": upright.width,
+        "height": upright.height,
+        "variants": variants,
+    }
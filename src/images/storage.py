@@ -0,0 +1,50 @@
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+MEDIA_TYPES = {
+    "avif": "image/avif",
+    "gif": "image/gif",
+    "jpg": "image/jpeg",
+    "png": "image/png",
+    "webp": "image/webp",
+}
+
+_DIGEST = re.compile(r"[0-9a-f]{64}")
+_NAME = re.compile(r"[a-z0-9]+\.[a-z]+")
+
+
+def image_directory(root: str, digest: str) -> Path:
+    """Directory holding an original and its variants.
+
+    Files are addressed by the SHA-256 of the original, so uploading the
+    same picture twice stores it once, and a path never changes content.
+    """
+    return Path(root) / digest[:2] / digest
+
+
+def stored_file(root: str, digest: str, name: str) -> Optional[Path]:
+    """Path of a stored file, or None if it does not exist.
+
+    ``digest`` and ``name`` come from the URL and are validated so that
+    they cannot point outside the storage directory.
+    """
+    if not (_DIGEST.fullmatch(digest) and _NAME.fullmatch(name)):
+        return None
+    path = image_directory(root, digest) / name
+    return path if path.is_file() else None
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Write ``data`` so that readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temporary = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
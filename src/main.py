@@ -1,15 +1,43 @@
+import asyncio
+import signal
 from contextlib import asynccontextmanager
+from typing import Callable
 
 from fastapi import FastAPI
 
-from src.database.config import create_db_and_tables, create_firebase_auth
-from src.routers import auth, order, users, configuration
+from src.database.config import (
+    engine,
+    replica_engine,
+    warm_up_firebase_auth,
+)
+from src.database.expiry import badge_expiring_products_periodically
+from src.database.idempotency import purge_expired_periodically
+from src.database.rollups import refresh_sales_rollups_periodically
+from src.database.migrations import check_schema_version
+from src.database.notifications import broker, listener
+from src.images.pipeline import shutdown_pool
+from src.metrics import mark_worker_stopped
+from src.middleware.admission import AdmissionControlMiddleware
+from src.middleware.consistency import ReadYourWritesMiddleware
+from src.middleware.disconnect import CancelOnDisconnectMiddleware
+from src.middleware.metrics import MetricsMiddleware
+from src.middleware.profiling import ProfilingMiddleware
+from src.routers import (
+    auth,
+    configuration,
+    fulfillment,
+    metrics,
+    order,
+    reports,
+    users,
+)
 from src.routers.product import (
     brand,
     category,
     image,
     products,
     promotion,
+    stream,
     tag,
 )
 from src.settings import settings
@@ -18,13 +46,59 @@ from src.routers import cart
 
 
 
+def on_shutdown_signal(callback: Callable[[], None]) -> None:
+    """Run ``callback`` on the event loop when the worker is told to stop.
+
+    uvicorn waits for open connections to finish before the lifespan
+    shutdown runs, so long-lived streams have to be ended from here or
+    they hold the worker until the graceful shutdown timeout. uvicorn's
+    own handler still runs afterwards.
+    """
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        previous = signal.getsignal(sig)
+
+        def handler(signum, frame, previous=previous):
+            loop.call_soon_threadsafe(callback)
+            if callable(previous):
+                previous(signum, frame)
+
+        try:
+            signal.signal(sig, handler)
+        except ValueError:
+            # Not running in the main thread, e.g. under TestClient
+            return
+
+
 # Runs on every server startup
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan events for the FastAPI application."""
-    create_db_and_tables()
-    create_firebase_auth()
+    check_schema_version(engine)
+    # Firebase is slow to import and initialize; do it off the startup path
+    warm_up = asyncio.create_task(
+        asyncio.to_thread(warm_up_firebase_auth)
+    )
+    await listener.start()
+    purge = asyncio.create_task(purge_expired_periodically())
+    rollups = asyncio.create_task(refresh_sales_rollups_periodically())
+    badges = None
+    if settings.EXPIRY_BADGE_ENABLED:
+        badges = asyncio.create_task(badge_expiring_products_periodically())
+    on_shutdown_signal(broker.terminate_all)
     yield
+    # In-flight requests have been drained by now
+    purge.cancel()
+    rollups.cancel()
+    if badges is not None:
+        badges.cancel()
+    await listener.stop()
+    await asyncio.to_thread(shutdown_pool)
+    await warm_up
+    engine.dispose()
+    if replica_engine is not None:
+        replica_engine.dispose()
+    mark_worker_stopped()
 
 
 app = FastAPI(
@@ -32,6 +106,17 @@ app = FastAPI(
     openapi_url=f"/{settings.API_BASE_PATH}/openapi.json",
     lifespan=lifespan,
 )
+app.add_middleware(CancelOnDisconnectMiddleware)
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(AdmissionControlMiddleware)
+app.add_middleware(MetricsMiddleware)
+if settings.SQL_PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+if settings.REPLICA_DATABASE_URL:
+    app.add_middleware(ReadYourWritesMiddleware)
+
+# Monitoring routes
+app.include_router(metrics.router)
 
 # Auth and user routes
 app.include_router(auth.router)
@@ -42,12 +127,16 @@ app.include_router(cart.router)
 
 # Order routes
 app.include_router(order.router)
+app.include_router(fulfillment.router)
+app.include_router(reports.router)
 
 # Product routes
+app.include_router(stream.router)  # before products so /stream isn't an id
 app.include_router(products.router)
 app.include_router(brand.router)
 app.include_router(category.router)
 app.include_router(promotion.router)
 app.include_router(tag.router)
+app.include_router(image.files_router)
 app.include_router(image.router)
 app.include_router(configuration.router)
@@ -0,0 +1,193 @@
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Gauges use "livesum" so that, with PROMETHEUS_MULTIPROC_DIR set, each
+# uvicorn worker reports its own value and dead workers drop out.
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served.",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+COALESCED_REQUESTS = Counter(
+    "http_coalesced_requests",
+    "Requests to single-flight routes by whether they ran the endpoint.",
+    ["route", "role"],
+)
+IDEMPOTENT_REQUESTS = Counter(
+    "http_idempotent_requests",
+    "Requests carrying an Idempotency-Key by outcome.",
+    ["route", "outcome"],
+)
+ADMISSION_REQUESTS = Counter(
+    "http_admission_requests",
+    "Requests admitted or shed by admission control, by priority class.",
+    ["priority", "outcome"],
+)
+ADMISSION_LIMIT = Gauge(
+    "http_admission_limit",
+    "Current adaptive concurrency limit.",
+    multiprocess_mode="livesum",
+)
+RATE_LIMIT_REQUESTS = Counter(
+    "http_rate_limit_requests",
+    "Rate limit checks by policy and outcome.",
+    ["policy", "outcome"],
+)
+REQUEST_DB_STATEMENTS = Histogram(
+    "http_request_db_statements",
+    "SQL statements executed per request.",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250),
+)
+REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds",
+    "Time spent in SQL statements per request.",
+    ["route"],
+)
+DB_STATEMENT_DURATION = Histogram(
+    "db_statement_duration_seconds",
+    "Duration of individual SQL statements.",
+    ["operation"],
+)
+DB_POOL_SIZE = Gauge(
+    "db_pool_size",
+    "Configured connection pool size.",
+    ["database"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Connections currently checked out of the pool.",
+    ["database"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow_connections",
+    "Connections opened beyond the pool size.",
+    ["database"],
+    multiprocess_mode="livesum",
+)
+DB_CONNECTIONS_OPENED = Counter(
+    "db_connections_opened",
+    "New DBAPI connections opened by the pool.",
+    ["database"],
+)
+DB_READ_ROUTES = Counter(
+    "db_read_routes",
+    "Read-only sessions by target database and reason for using primary.",
+    ["target", "reason"],
+)
+DB_QUERIES_CANCELLED = Counter(
+    "db_queries_cancelled",
+    "Statements stopped by a statement timeout or a client disconnect.",
+    ["reason"],
+)
+CACHE_REQUESTS = Counter(
+    "response_cache_requests",
+    "Response cache lookups by endpoint and result.",
+    ["cache", "result"],
+)
+IMAGE_INGEST_DURATION = Histogram(
+    "image_ingest_duration_seconds",
+    "Time to store an uploaded image and build its variants.",
+)
+FIREBASE_CALL_DURATION = Histogram(
+    "firebase_call_duration_seconds",
+    "Latency of Firebase Admin SDK calls.",
+    ["operation"],
+)
+
+
+@dataclass
+class RequestStats:
+    """Per-request counters filled in by the engine event hooks."""
+
+    db_statements: int = 0
+    db_seconds: float = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "request_stats", default=None
+)
+
+
+def start_request_stats() -> RequestStats:
+    stats = RequestStats()
+    _request_stats.set(stats)
+    return stats
+
+
+def _before_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+):
+    context._metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+):
+    elapsed = time.perf_counter() - context._metrics_start
+    operation = statement.lstrip().split(" ", 1)[0].upper()
+    DB_STATEMENT_DURATION.labels(operation).observe(elapsed)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.db_statements += 1
+        stats.db_seconds += elapsed
+
+
+def instrument_engine(engine: Engine, database: str = "primary") -> None:
+    """Attach statement timing and pool gauges to ``engine``."""
+    pool = engine.pool
+    checked_out = DB_POOL_CHECKED_OUT.labels(database)
+    overflow = DB_POOL_OVERFLOW.labels(database)
+
+    def update_pool_gauges(*_):
+        checked_out.set(pool.checkedout())
+        overflow.set(max(pool.overflow(), 0))
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(pool, "checkout", update_pool_gauges)
+    event.listen(pool, "checkin", update_pool_gauges)
+    opened = DB_CONNECTIONS_OPENED.labels(database)
+    event.listen(pool, "connect", lambda *_: opened.inc())
+    if hasattr(pool, "size"):
+        DB_POOL_SIZE.labels(database).set(pool.size())
+
+
+def mark_worker_stopped() -> None:
+    """Drop this worker's live gauges from the multiprocess directory."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Render metrics for every worker when running multi-process."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,179 @@
+import statistics
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.metrics import ADMISSION_LIMIT, ADMISSION_REQUESTS
+from src.middleware.metrics import route_label
+from src.settings import settings
+
+# Priority classes, see ADMISSION_PRIORITY_SHARES
+CRITICAL = "critical"
+NORMAL = "normal"
+LOW = "low"
+EXEMPT = "exempt"  # never limited, e.g. long-lived streams
+
+
+class AdaptiveLimit:
+    """Concurrency limit that follows the latency the server delivers.
+
+    Latencies are compared per route with that route's usual latency, so
+    fast and slow endpoints can share one limit. Once per window the limit
+    is cut multiplicatively when the typical request took more than
+    ``tolerance`` times its usual latency, and otherwise grows by one if
+    the window came close to using it (AIMD).
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int,
+        maximum: int,
+        window_seconds: float,
+        tolerance: float,
+        backoff: float = 0.9,
+        min_samples: int = 10,
+    ) -> None:
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.window_seconds = window_seconds
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.min_samples = min_samples
+        self.in_flight = 0
+        self._baselines: Dict[str, float] = {}
+        self._samples: List[Tuple[str, float]] = []
+        self._window_end = time.monotonic() + window_seconds
+        self._peak_in_flight = 0
+
+    def try_acquire(self, share: float) -> bool:
+        if self.in_flight >= max(self.limit * share, 1):
+            return False
+        self.in_flight += 1
+        self._peak_in_flight = max(self._peak_in_flight, self.in_flight)
+        return True
+
+    def release(self, route: str, latency: float) -> None:
+        self.in_flight -= 1
+        self._samples.append((route, latency))
+        now = time.monotonic()
+        if now >= self._window_end and len(self._samples) >= self.min_samples:
+            self._update()
+            self._samples = []
+            self._window_end = now + self.window_seconds
+            self._peak_in_flight = self.in_flight
+
+    def _update(self) -> None:
+        by_route: Dict[str, List[float]] = defaultdict(list)
+        for route, latency in self._samples:
+            by_route[route].append(latency)
+        medians = {
+            route: statistics.median(latencies)
+            for route, latencies in by_route.items()
+        }
+
+        # Sample-weighted slowdown over the routes with a known baseline
+        weighted = total = 0
+        for route, median in medians.items():
+            baseline = self._baselines.get(route)
+            if baseline:
+                weighted += len(by_route[route]) * median / baseline
+                total += len(by_route[route])
+        slowdown = weighted / total if total else 1.0
+
+        if slowdown > self.tolerance:
+            self.limit = max(self.minimum, self.limit * self.backoff)
+        else:
+            if self._peak_in_flight >= 0.8 * self.limit:
+                self.limit = min(self.maximum, self.limit + 1)
+            # Only uncongested windows may move the baselines, so that a
+            # long overload cannot become the new normal
+            for route, median in medians.items():
+                baseline = self._baselines.get(route)
+                self._baselines[route] = (
+                    median if baseline is None
+                    else 0.9 * baseline + 0.1 * median
+                )
+        ADMISSION_LIMIT.set(self.limit)
+
+
+def request_priority(method: str, path: str) -> str:
+    """Priority class of a request.
+
+    Requests listed as ``"METHOD /path"`` in ``ADMISSION_ROUTE_PRIORITIES``
+    get that class; other reads are ``low`` and other writes ``normal``.
+    """
+    key = f"{method} {path.rstrip('/') or '/'}"
+    priority = settings.ADMISSION_ROUTE_PRIORITIES.get(key)
+    if priority is not None:
+        return priority
+    return LOW if method in ("GET", "HEAD") else NORMAL
+
+
+class AdmissionControlMiddleware:
+    """Shed load before requests queue up for database connections.
+
+    Requests beyond the current limit get an immediate ``503`` with
+    ``Retry-After`` instead of waiting. Lower priority classes may only use
+    part of the limit, which keeps headroom for checkout when the catalog
+    is busy. The limit is per worker.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.limit = AdaptiveLimit(
+            initial=settings.ADMISSION_INITIAL_LIMIT,
+            minimum=settings.ADMISSION_MIN_LIMIT,
+            maximum=settings.ADMISSION_MAX_LIMIT,
+            window_seconds=settings.ADMISSION_WINDOW_SECONDS,
+            tolerance=settings.ADMISSION_LATENCY_TOLERANCE,
+        )
+        ADMISSION_LIMIT.set(self.limit.limit)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Routing has not happened yet, so classify by method and path
+        priority = request_priority(scope["method"], scope["path"])
+        if priority == EXEMPT:
+            await self.app(scope, receive, send)
+            return
+
+        share = settings.ADMISSION_PRIORITY_SHARES.get(priority, 1.0)
+        if not self.limit.try_acquire(share):
+            ADMISSION_REQUESTS.labels(priority, "rejected").inc()
+            response = JSONResponse(
+                {"detail": "Server is overloaded, please retry later"},
+                status_code=503,
+                headers={
+                    "Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)
+                },
+            )
+            await response(scope, receive, send)
+            return
+
+        ADMISSION_REQUESTS.labels(priority, "admitted").inc()
+        start = time.perf_counter()
+        finished: Optional[float] = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal finished
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get(
+                "more_body", False
+            ):
+                finished = time.perf_counter()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Background tasks run after the body is sent; they do not
+            # count towards the latency
+            end = finished if finished is not None else time.perf_counter()
+            self.limit.release(route_label(scope), end - start)
@@ -0,0 +1,61 @@
+from starlette.datastructures import MutableHeaders
+from starlette.requests import cookie_parser
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.database.replicas import (
+    LSN_COOKIE,
+    LSN_HEADER,
+    parse_lsn,
+    start_read_consistency,
+)
+from src.settings import settings
+
+
+class ReadYourWritesMiddleware:
+    """Keep a client's reads on the primary until a replica catches up.
+
+    The WAL position of a request's last commit is returned in the
+    ``omega_lsn`` cookie and the ``X-Min-LSN`` header. Clients send either
+    back, and read-only sessions only use a replica that has replayed at
+    least that position.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        cookie_lsn = header_lsn = None
+        for name, value in scope["headers"]:
+            if name == b"cookie":
+                cookie_lsn = cookie_parser(value.decode("latin-1")).get(
+                    LSN_COOKIE
+                )
+            elif name == LSN_HEADER.encode():
+                header_lsn = value.decode("latin-1")
+        candidates = [
+            lsn
+            for lsn in (parse_lsn(cookie_lsn), parse_lsn(header_lsn))
+            if lsn is not None
+        ]
+        consistency = start_read_consistency(max(candidates, default=None))
+
+        async def send_wrapper(message: Message) -> None:
+            if (
+                message["type"] == "http.response.start"
+                and consistency.written_lsn
+            ):
+                headers = MutableHeaders(scope=message)
+                headers.append(LSN_HEADER, consistency.written_lsn)
+                headers.append(
+                    "set-cookie",
+                    f"{LSN_COOKIE}={consistency.written_lsn}; "
+                    f"Max-Age={settings.READ_YOUR_WRITES_SECONDS}; "
+                    "Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,57 @@
+import asyncio
+
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.database.timeouts import start_query_cancellation
+
+
+class CancelOnDisconnectMiddleware:
+    """Cancel a request's database work when its client disconnects.
+
+    The server's ``receive`` channel is read in the background so that an
+    ``http.disconnect`` is noticed while the endpoint is still running in
+    the threadpool. Messages are handed on to the app unchanged.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        cancellation = start_query_cancellation()
+        messages: asyncio.Queue = asyncio.Queue()
+        response_complete = False
+
+        async def watch_for_disconnect() -> None:
+            while True:
+                message = await receive()
+                messages.put_nowait(message)
+                if message["type"] == "http.disconnect":
+                    # Servers also report a disconnect once the response
+                    # has been sent; background tasks must keep running
+                    if not response_complete:
+                        await run_in_threadpool(cancellation.cancel)
+                    return
+
+        async def receive_wrapper() -> Message:
+            if messages.empty() and watcher.done():
+                return {"type": "http.disconnect"}
+            return await messages.get()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_complete
+            if message["type"] == "http.response.body" and not message.get(
+                "more_body", False
+            ):
+                response_complete = True
+            await send(message)
+
+        watcher = asyncio.create_task(watch_for_disconnect())
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            watcher.cancel()
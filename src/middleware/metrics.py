@@ -0,0 +1,63 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.metrics import (
+    REQUEST_DB_DURATION,
+    REQUEST_DB_STATEMENTS,
+    REQUEST_LATENCY,
+    REQUESTS_IN_FLIGHT,
+    start_request_stats,
+)
+
+
+def route_label(scope: Scope) -> str:
+    """Route template of the matched endpoint, e.g. ``/products/{id}``.
+
+    Unmatched paths share one label so scanners can't blow up the series
+    count.
+    """
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """Record per-route latency, in-flight requests and SQL usage."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        stats = start_request_stats()
+        status_code = 500
+        streaming = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, streaming
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                for name, value in message.get("headers", ()):
+                    if name == b"content-type":
+                        streaming = value.startswith(b"text/event-stream")
+            await send(message)
+
+        in_flight = REQUESTS_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            route = route_label(scope)
+            # Long-lived streams would swamp the latency buckets
+            if not streaming:
+                REQUEST_LATENCY.labels(method, route, status_code).observe(
+                    time.perf_counter() - start
+                )
+            REQUEST_DB_STATEMENTS.labels(route).observe(stats.db_statements)
+            REQUEST_DB_DURATION.labels(route).observe(stats.db_seconds)
@@ -1,5 +1,6 @@
 from src.models.cart.cart import Cart
 from src.models.cart.cart_item import CartItem
+from src.models.idempotency import IdempotencyKey
 from src.models.order.address import Address, Province
 from src.models.order.order import Order
 from src.models.order.order_item import OrderItem
@@ -9,7 +10,16 @@ from src.models.product.category import Category
 from src.models.product.image import Image
 from src.models.product.product import Product
 from src.models.product.promotion import ProductPromotion, Promotion
+from src.models.product.recommendation import ProductRecommendation
 from src.models.product.tag import ProductTag, Tag
+from src.models.reporting import (
+    BrandSalesDaily,
+    CategorySalesDaily,
+    PaymentMethodSalesDaily,
+    ProductSalesDaily,
+    ProvinceSalesDaily,
+    SalesRollupQueue,
+)
 from src.models.user import User
 
 __all__ = [
@@ -19,6 +29,7 @@ __all__ = [
     "Product",
     "Promotion",
     "ProductPromotion",
+    "ProductRecommendation",
     "Tag",
     "ProductTag",
     "User",
@@ -29,4 +40,11 @@ __all__ = [
     "Address",
     "Province",
     "PaymentMethod",
+    "IdempotencyKey",
+    "SalesRollupQueue",
+    "ProductSalesDaily",
+    "CategorySalesDaily",
+    "BrandSalesDaily",
+    "ProvinceSalesDaily",
+    "PaymentMethodSalesDaily",
 ]
@@ -1,10 +1,10 @@
-import uuid
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING, List
 
 from sqlmodel import Field, Relationship, SQLModel
 
 from src.models.cart.cart_item import CartItem
+from src.models.ids import UUIDString, new_id
 
 if TYPE_CHECKING:
     from src.models.user import User
@@ -14,7 +14,7 @@ class Cart(SQLModel, table=True):
     __tablename__ = "carts"
 
     id: str = Field(
-        default_factory=lambda: str(uuid.uuid4()), primary_key=True
+        default_factory=new_id, primary_key=True, sa_type=UUIDString
     )
     user_id: str = Field(foreign_key="users.id", index=True)
     created_at: datetime = Field(
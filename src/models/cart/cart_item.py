@@ -1,9 +1,10 @@
-import uuid
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING
 
 from sqlmodel import Field, Relationship, SQLModel
 
+from src.models.ids import UUIDString, new_id
+
 if TYPE_CHECKING:
     from src.models.cart.cart import Cart
     from src.models.product.product import Product
@@ -13,10 +14,14 @@ class CartItem(SQLModel, table=True):
     __tablename__ = "cart_items"
 
     id: str = Field(
-        default_factory=lambda: str(uuid.uuid4()), primary_key=True
+        default_factory=new_id, primary_key=True, sa_type=UUIDString
+    )
+    cart_id: str = Field(
+        foreign_key="carts.id", index=True, sa_type=UUIDString
+    )
+    product_id: str = Field(
+        foreign_key="products.id", index=True, sa_type=UUIDString
     )
-    cart_id: str = Field(foreign_key="carts.id", index=True)
-    product_id: str = Field(foreign_key="products.id", index=True)
     quantity: int
     created_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc)
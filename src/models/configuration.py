@@ -1,11 +1,12 @@
 from typing import List, Optional
-import uuid
 from pydantic import BaseModel
 from sqlmodel import SQLModel, Field, Column
 from sqlalchemy.dialects.postgresql import JSONB
 from typing import Optional
 import datetime
 
+from src.models.ids import UUIDString, new_id
+
 
 # ----- Base class that allows dynamic keys -----
 class FlexibleBase(BaseModel):
@@ -111,7 +112,7 @@ class ConfigSchema(FlexibleBase):
 
 class Config(SQLModel, table=True):
     id: str = Field(
-        default_factory=lambda: str(uuid.uuid4()), primary_key=True
+        default_factory=new_id, primary_key=True, sa_type=UUIDString
     )
 
     # Store config as JSON (use JSONB for Postgres)
@@ -0,0 +1,37 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import Column, LargeBinary
+from sqlmodel import Field, SQLModel
+
+# Request lifecycle stored in IdempotencyKey.status
+IN_PROGRESS = "in_progress"  # first attempt running
+COMMITTED = "committed"  # its transaction committed, response not stored yet
+COMPLETED = "completed"  # response stored, replayed to retries
+
+
+class IdempotencyKey(SQLModel, table=True):
+    """Outcome of a request sent with an ``Idempotency-Key`` header."""
+
+    __tablename__ = "idempotency_keys"
+
+    key: str = Field(primary_key=True, max_length=255)
+    route: str = Field(primary_key=True)
+    # Who sent it, keys of other callers are never shared
+    caller: str = Field(primary_key=True)
+    # Hash of the request body, reuse with another is an error
+    fingerprint: str
+    status: str = IN_PROGRESS
+    # Token of the attempt holding the claim, see IdempotentRequest
+    attempt: Optional[str] = None
+    response_status: Optional[int] = None
+    response_content_type: Optional[str] = None
+    response_body: Optional[bytes] = Field(
+        default=None, sa_column=Column(LargeBinary)
+    )
+    locked_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc)
+    )
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc), index=True
+    )
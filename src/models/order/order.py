@@ -1,10 +1,10 @@
-import uuid
 from datetime import datetime, timezone
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, List, Optional
 
 from sqlmodel import Field, Relationship, SQLModel
 
 from src.constants.order_status import OrderStatus
+from src.models.ids import UUIDString, new_id
 from src.models.order.address import Address
 from src.models.order.order_item import OrderItem
 from src.models.order.payment import PaymentMethod
@@ -17,15 +17,18 @@ class Order(SQLModel, table=True):
     __tablename__ = "orders"
 
     id: str = Field(
-        default_factory=lambda: str(uuid.uuid4()), primary_key=True
+        default_factory=new_id, primary_key=True, sa_type=UUIDString
     )
     user_id: str = Field(foreign_key="users.id", index=True)
     address_id: str = Field(foreign_key="addresses.id", index=True)
     payment_method_id: str = Field(
-        foreign_key="payment_methods.id", index=True
+        foreign_key="payment_methods.id", index=True, sa_type=UUIDString
     )
     total_amount: float
     status: OrderStatus = Field(default=OrderStatus.PENDING)
+    # Packer working on a pending order, until the claim expires
+    claimed_by: Optional[str] = None
+    claimed_at: Optional[datetime] = None
     created_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc)
     )
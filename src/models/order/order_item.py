@@ -1,9 +1,10 @@
-import uuid
 from datetime import datetime, timezone
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from sqlmodel import Field, Relationship, SQLModel
 
+from src.models.ids import UUIDString, new_id
+
 if TYPE_CHECKING:
     from src.models.order.order import Order
     from src.models.product.product import Product
@@ -13,11 +14,19 @@ class OrderItem(SQLModel, table=True):
     __tablename__ = "order_items"
 
     id: str = Field(
-        default_factory=lambda: str(uuid.uuid4()), primary_key=True
+        default_factory=new_id, primary_key=True, sa_type=UUIDString
+    )
+    order_id: str = Field(
+        foreign_key="orders.id", index=True, sa_type=UUIDString
+    )
+    product_id: str = Field(
+        foreign_key="products.id", index=True, sa_type=UUIDString
     )
-    order_id: str = Field(foreign_key="orders.id", index=True)
-    product_id: str = Field(foreign_key="products.id", index=True)
     quantity: int
+    # Product price, category and brand when the order was placed
+    unit_price: Optional[float] = None
+    category_id: Optional[str] = Field(default=None, sa_type=UUIDString)
+    brand_id: Optional[str] = Field(default=None, sa_type=UUIDString)
     created_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc)
     )
@@ -1,16 +1,16 @@
-import uuid
 from datetime import datetime, timezone
 
 from sqlmodel import Field, SQLModel
 
 from src.constants.payment import PaymentMethodType
+from src.models.ids import UUIDString, new_id
 
 
 class PaymentMethod(SQLModel, table=True):
     __tablename__ = "payment_methods"
 
     id: str = Field(
-        default_factory=lambda: str(uuid.uuid4()), primary_key=True
+        default_factory=new_id, primary_key=True, sa_type=UUIDString
     )
     type: PaymentMethodType
     details: str | None = None
@@ -3,6 +3,7 @@ from src.models.product.category import Category
 from src.models.product.image import Image
 from src.models.product.product import Product
 from src.models.product.promotion import ProductPromotion, Promotion
+from src.models.product.recommendation import ProductRecommendation
 from src.models.product.tag import ProductTag, Tag
 
 __all__ = [
@@ -12,6 +13,7 @@ __all__ = [
     "Product",
     "Promotion",
     "ProductPromotion",
+    "ProductRecommendation",
     "Tag",
     "ProductTag",
 ]
@@ -1,9 +1,10 @@
-import uuid
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING, List
 
 from sqlmodel import Field, Relationship, SQLModel
 
+from src.models.ids import UUIDString, new_id
+
 if TYPE_CHECKING:
     from src.models.product.product import Product
 
@@ -12,7 +13,7 @@ class Brand(SQLModel, table=True):
     __tablename__ = "brands"
 
     id: str = Field(
-        default_factory=lambda: str(uuid.uuid4()), primary_key=True
+        default_factory=new_id, primary_key=True, sa_type=UUIDString
     )
     name: str = Field(index=True)
     description: str
@@ -1,9 +1,10 @@
-import uuid
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING, List, Optional
 
 from sqlmodel import Field, Relationship, SQLModel
 
+from src.models.ids import UUIDString, new_id
+
 if TYPE_CHECKING:
     from src.models.product.product import Product
 
@@ -12,12 +13,15 @@ class Category(SQLModel, table=True):
     __tablename__ = "categories"
 
     id: str = Field(
-        default_factory=lambda: str(uuid.uuid4()), primary_key=True
+        default_factory=new_id, primary_key=True, sa_type=UUIDString
     )
     name: str = Field(index=True)
     description: str
     parent_id: Optional[str] = Field(
-        foreign_key="categories.id", default=None, index=True
+        foreign_key="categories.id",
+        default=None,
+        index=True,
+        sa_type=UUIDString,
     )
     created_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc)
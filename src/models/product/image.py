@@ -1,9 +1,12 @@
-import uuid
 from datetime import datetime, timezone
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, List, Optional
 
+from sqlalchemy import Column
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlmodel import Field, Relationship, SQLModel
 
+from src.models.ids import UUIDString, new_id
+
 if TYPE_CHECKING:
     from src.models.product.product import Product
 
@@ -12,10 +15,21 @@ class Image(SQLModel, table=True):
     __tablename__ = "images"
 
     id: str = Field(
-        default_factory=lambda: str(uuid.uuid4()), primary_key=True
+        default_factory=new_id, primary_key=True, sa_type=UUIDString
     )
     url: str
     alt_text: str | None = None
+
+    # Set for uploads kept in our own storage, see src/images
+    content_hash: Optional[str] = Field(default=None, max_length=64)
+    content_type: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    # Resized copies, each with its url, width, height, content_type and
+    # size, narrowest first
+    variants: Optional[List[dict]] = Field(
+        default=None, sa_column=Column(JSONB)
+    )
     created_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc)
     )
@@ -23,5 +37,7 @@ class Image(SQLModel, table=True):
         default_factory=lambda: datetime.now(timezone.utc)
     )
 
-    product_id: str = Field(foreign_key="products.id")
+    product_id: str = Field(
+        foreign_key="products.id", index=True, sa_type=UUIDString
+    )
     product: "Product" = Relationship(back_populates="images")
@@ -1,23 +1,31 @@
-import uuid
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING, List, Optional
 
+from sqlalchemy import Column, Computed, DateTime
 from sqlmodel import Field, Relationship, SQLModel
 
 from src.models.cart.cart_item import CartItem
+from src.models.ids import UUIDString, new_id
 from src.models.order.order_item import OrderItem
 from src.models.product.brand import Brand
 from src.models.product.category import Category
 from src.models.product.image import Image
-from src.models.product.promotion import Promotion
-from src.models.product.tag import Tag
+from src.models.product.promotion import ProductPromotion, Promotion
+from src.models.product.tag import ProductTag, Tag
+
+# Days are added in UTC: adding an interval to a timestamptz depends on the
+# session time zone, which a generated column may not
+EFFECTIVE_EXPIRY = (
+    "COALESCE(expiration_date, (manufactured_at AT TIME ZONE 'UTC'"
+    " + make_interval(days => life_span_days)) AT TIME ZONE 'UTC')"
+)
 
 
 class Product(SQLModel, table=True):
     __tablename__ = "products"
 
     id: str = Field(
-        default_factory=lambda: str(uuid.uuid4()), primary_key=True
+        default_factory=new_id, primary_key=True, sa_type=UUIDString
     )
     name: str = Field(index=True, unique=True)
     summary: str
@@ -29,12 +37,25 @@ class Product(SQLModel, table=True):
     condition: Optional[str] = None
     badge_label: Optional[str] = Field(None, alias="badgeLabel")
     badge_color: Optional[str] = Field(None, alias="badgeColor")
-    category_id: str = Field(foreign_key="categories.id", index=True)
-    brand_id: str = Field(foreign_key="brands.id", index=True)
+    category_id: str = Field(
+        foreign_key="categories.id", index=True, sa_type=UUIDString
+    )
+    brand_id: str = Field(
+        foreign_key="brands.id", index=True, sa_type=UUIDString
+    )
     stock: int = 0
     manufactured_at: Optional[datetime] = Field(None, alias="mfg")
     life_span_days: Optional[int] = Field(None, alias="life") 
     expiration_date: Optional[datetime] = None
+    # expiration_date, or else manufactured_at plus life_span_days, kept up
+    # to date by the database
+    effective_expiry: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(
+            DateTime(timezone=True),
+            Computed(EFFECTIVE_EXPIRY, persisted=True),
+        ),
+    )
 
     created_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc)
@@ -45,8 +66,12 @@ class Product(SQLModel, table=True):
 
     category: Optional[Category] = Relationship(back_populates="products")
     brand: Optional[Brand] = Relationship(back_populates="products")
-    promotions: List[Promotion] = Relationship(back_populates="products")
+    promotions: List[Promotion] = Relationship(
+        back_populates="products", link_model=ProductPromotion
+    )
     images: List[Image] = Relationship(back_populates="product")
-    tags: List[Tag] = Relationship(back_populates="products")
+    tags: List[Tag] = Relationship(
+        back_populates="products", link_model=ProductTag
+    )
     cart_items: List["CartItem"] = Relationship(back_populates="product")
     order_items: List["OrderItem"] = Relationship(back_populates="product")
@@ -1,9 +1,10 @@
-import uuid
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING, List
 
 from sqlmodel import Field, Relationship, SQLModel
 
+from src.models.ids import UUIDString, new_id
+
 if TYPE_CHECKING:
     from src.models.product.product import Product
 
@@ -11,15 +12,22 @@ if TYPE_CHECKING:
 class ProductPromotion(SQLModel, table=True):
     __tablename__ = "product_promotions"
 
-    product_id: str = Field(foreign_key="products.id", primary_key=True)
-    promotion_id: str = Field(foreign_key="promotions.id", primary_key=True)
+    product_id: str = Field(
+        foreign_key="products.id", primary_key=True, sa_type=UUIDString
+    )
+    promotion_id: str = Field(
+        foreign_key="promotions.id",
+        primary_key=True,
+        index=True,
+        sa_type=UUIDString,
+    )
 
 
 class Promotion(SQLModel, table=True):
     __tablename__ = "promotions"
 
     id: str = Field(
-        default_factory=lambda: str(uuid.uuid4()), primary_key=True
+        default_factory=new_id, primary_key=True, sa_type=UUIDString
     )
     name: str
     description: str | None = None
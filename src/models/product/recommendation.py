@@ -0,0 +1,18 @@
+from sqlalchemy import Column, SmallInteger
+from sqlmodel import Field, SQLModel
+
+from src.models.ids import UUIDString
+
+
+class ProductRecommendation(SQLModel, table=True):
+    """A product often bought together with ``product_id``.
+
+    Rebuilt by src.recommendations.job; ``rank`` 0 is the strongest.
+    """
+
+    __tablename__ = "product_recommendations"
+
+    product_id: str = Field(primary_key=True, sa_type=UUIDString)
+    rank: int = Field(sa_column=Column(SmallInteger, primary_key=True))
+    related_product_id: str = Field(sa_type=UUIDString)
+    score: float
@@ -0,0 +1,62 @@
+from datetime import date
+
+from sqlalchemy import BigInteger, Column, SmallInteger
+from sqlmodel import Field, SQLModel
+
+from src.constants.payment import PaymentMethodType
+from src.constants.province import Province
+from src.models.ids import UUIDString
+
+
+class SalesRollupQueue(SQLModel, table=True):
+    """Order items not yet counted in the sales rollups.
+
+    Filled by triggers: +1 when an item is inserted, -1 for each item of
+    an order that gets cancelled. See src.database.rollups.
+    """
+
+    __tablename__ = "sales_rollup_queue"
+
+    id: int = Field(sa_column=Column(BigInteger, primary_key=True))
+    order_id: str = Field(index=True, sa_type=UUIDString)
+    order_item_id: str = Field(sa_type=UUIDString)
+    sign: int = Field(sa_column=Column(SmallInteger, nullable=False))
+
+
+class SalesRollup(SQLModel):
+    """Net sales of one day (UTC) for one value of a dimension."""
+
+    day: date = Field(primary_key=True)
+    orders: int = 0
+    units: int = 0
+    revenue: float = 0.0
+
+
+class ProductSalesDaily(SalesRollup, table=True):
+    __tablename__ = "sales_daily_by_product"
+
+    product_id: str = Field(primary_key=True, sa_type=UUIDString)
+
+
+class CategorySalesDaily(SalesRollup, table=True):
+    __tablename__ = "sales_daily_by_category"
+
+    category_id: str = Field(primary_key=True, sa_type=UUIDString)
+
+
+class BrandSalesDaily(SalesRollup, table=True):
+    __tablename__ = "sales_daily_by_brand"
+
+    brand_id: str = Field(primary_key=True, sa_type=UUIDString)
+
+
+class ProvinceSalesDaily(SalesRollup, table=True):
+    __tablename__ = "sales_daily_by_province"
+
+    province: Province = Field(primary_key=True)
+
+
+class PaymentMethodSalesDaily(SalesRollup, table=True):
+    __tablename__ = "sales_daily_by_payment_method"
+
+    payment_method_type: PaymentMethodType = Field(primary_key=True)
@@ -0,0 +1,21 @@
+from src.ratelimit.backends import (
+    MemoryBuckets,
+    RateLimitBackend,
+    RedisBuckets,
+)
+from src.ratelimit.limiter import (
+    RateLimiter,
+    client_address,
+    rate_limit,
+    rate_limiter,
+)
+
+__all__ = [
+    "MemoryBuckets",
+    "RateLimitBackend",
+    "RateLimiter",
+    "RedisBuckets",
+    "client_address",
+    "rate_limit",
+    "rate_limiter",
+]
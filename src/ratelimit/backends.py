@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+
+class RateLimitBackend:
+    """Token buckets, one per key.
+
+    A bucket holds up to ``burst`` tokens and refills at ``rate`` tokens
+    per second; each request takes one.
+    """
+
+    def take(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        """Take a token from ``key``'s bucket.
+
+        Returns whether one was available and, if not, how many seconds
+        until one will be.
+        """
+        raise NotImplementedError
+
+
+class MemoryBuckets(RateLimitBackend):
+    """Per-worker buckets.
+
+    At most ``max_keys`` buckets are kept; the least recently used is
+    dropped first, which only makes its next request start from a full
+    bucket.
+    """
+
+    def __init__(self, max_keys: int) -> None:
+        self.max_keys = max_keys
+        # key -> (tokens, updated_at)
+        self._buckets: OrderedDict[str, Tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated_at) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+
+# Refill and take atomically, on the server's clock so that workers on
+# different hosts agree
+_TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or burst
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call(
+    'HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now)
+)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisBuckets(RateLimitBackend):
+    """Buckets shared by every worker, in Redis or anything speaking its
+    protocol.
+
+    ``client`` is a ``redis.Redis`` instance or any object with the same
+    ``register_script`` method, such as ``fakeredis.FakeRedis``. A bucket
+    expires once it would have refilled completely.
+    """
+
+    def __init__(self, client, prefix: str = "omega:ratelimit:") -> None:
+        self.prefix = prefix
+        self._take = client.register_script(_TAKE_SCRIPT)
+
+    def take(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        allowed, tokens = self._take(
+            keys=[self.prefix + key], args=[rate, burst]
+        )
+        if allowed:
+            return True, 0.0
+        return False, (1 - float(tokens)) / rate
@@ -0,0 +1,107 @@
+import ipaddress
+import logging
+import math
+from typing import Callable, Optional
+
+from fastapi import HTTPException, status
+from starlette.requests import HTTPConnection
+
+from src.metrics import RATE_LIMIT_REQUESTS
+from src.ratelimit.backends import (
+    MemoryBuckets,
+    RateLimitBackend,
+    RedisBuckets,
+)
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def client_address(connection: HTTPConnection) -> str:
+    """Address requests are counted against.
+
+    IPv6 clients usually own a whole /64, so they share one bucket per
+    network rather than getting one per address. Behind a proxy the address
+    comes from ``X-Forwarded-For`` when the proxy is in
+    ``FORWARDED_ALLOW_IPS``.
+    """
+    host = connection.client.host if connection.client else "unknown"
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return host
+    if address.version == 6:
+        return str(ipaddress.ip_network(f"{address}/64", strict=False))
+    return host
+
+
+class RateLimiter:
+    """Token-bucket limits by policy, see ``RATE_LIMITS``.
+
+    Backend errors are logged and let the request through, so an outage of
+    a shared store does not take the API down with it.
+    """
+
+    def __init__(self, backend: Optional[RateLimitBackend]) -> None:
+        self.backend = backend
+
+    def check(self, policy: str, key: str) -> None:
+        """Take a token for ``key`` or raise ``429 Too Many Requests``."""
+        limit = settings.RATE_LIMITS.get(policy)
+        if self.backend is None or limit is None:
+            return
+        rate, burst = limit
+        try:
+            allowed, retry_after = self.backend.take(
+                f"{policy}:{key}", rate, burst
+            )
+        except Exception:
+            logger.exception("Rate limit check failed")
+            RATE_LIMIT_REQUESTS.labels(policy, "error").inc()
+            return
+        if allowed:
+            RATE_LIMIT_REQUESTS.labels(policy, "allowed").inc()
+            return
+        RATE_LIMIT_REQUESTS.labels(policy, "limited").inc()
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, please slow down",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+def create_backend() -> Optional[RateLimitBackend]:
+    if settings.RATE_LIMIT_BACKEND == "memory":
+        return MemoryBuckets(settings.RATE_LIMIT_MAX_KEYS)
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        import redis  # optional dependency, only needed for this backend
+
+        return RedisBuckets(
+            redis.Redis.from_url(
+                settings.REDIS_URL,
+                socket_timeout=settings.REDIS_TIMEOUT_SECONDS,
+                socket_connect_timeout=settings.REDIS_TIMEOUT_SECONDS,
+            )
+        )
+    return None
+
+
+rate_limiter = RateLimiter(create_backend())
+
+
+def rate_limit(policy: str) -> Callable[[HTTPConnection], None]:
+    """Dependency limiting each client address to ``policy``'s rate.
+
+    Applied per router, e.g.
+    ``APIRouter(dependencies=[Depends(rate_limit("catalog"))])``.
+    Authenticated users are also limited per Firebase uid, see
+    ``authenticate_token``.
+    """
+
+    def limit_client(connection: HTTPConnection) -> None:
+        rate_limiter.check(policy, client_address(connection))
+
+    # Found by SingleFlightRoute, which charges requests it answers
+    # without resolving their dependencies
+    limit_client.rate_limit_policy = policy
+    return limit_client
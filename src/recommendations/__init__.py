@@ -0,0 +1,5 @@
+# NumPy and SciPy are optional and only imported once the job runs, so the
+# API can import this package without them.
+from src.recommendations.job import refresh_recommendations
+
+__all__ = ["refresh_recommendations"]
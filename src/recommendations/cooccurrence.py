@@ -0,0 +1,76 @@
+from typing import Iterator, Tuple
+
+import numpy as np
+from scipy import sparse
+
+SCORES = ("cosine", "lift")
+
+
+class CooccurrenceCounter:
+    """How many orders contain each pair of products, built chunk by chunk.
+
+    Memory grows with the number of distinct pairs seen, not with the
+    number of order lines: each chunk's baskets are folded into the
+    running sparse counts and dropped.
+    """
+
+    def __init__(self, products: int, max_basket: int):
+        self.products = products
+        self.max_basket = max_basket
+        self.orders = 0
+        self._counts = sparse.csr_matrix((products, products), dtype=np.int32)
+
+    def add(self, orders: np.ndarray, products: np.ndarray) -> None:
+        """Count baskets given as parallel arrays of order and product
+        indexes. Every line of an order must be in the same call."""
+        if not len(orders):
+            return
+        baskets = sparse.csr_matrix(
+            (np.ones(len(orders), dtype=np.int32), (orders, products)),
+            shape=(int(orders.max()) + 1, self.products),
+        )
+        # The same product twice in an order counts once
+        baskets.sum_duplicates()
+        baskets.data[:] = 1
+        # Very large orders add a pair for every two of their products
+        # while saying little about any of them
+        sizes = np.diff(baskets.indptr)
+        keep = (sizes > 0) & (sizes <= self.max_basket)
+        baskets = baskets[keep]
+        self.orders += int(keep.sum())
+        self._counts = self._counts + (baskets.T @ baskets).tocsr()
+
+    def top_related(
+        self, k: int, min_support: int, score: str = "cosine"
+    ) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+        """(product, related products, scores) for every product with at
+        least one pair bought together in ``min_support`` orders, the
+        ``k`` best scored first."""
+        if score not in SCORES:
+            raise ValueError(f"score must be one of {SCORES}")
+        counts = self._counts.tocsr()
+        # The diagonal holds how many orders contain each product
+        product_orders = counts.diagonal().astype(np.float64)
+        counts.setdiag(0)
+        counts.data[counts.data < min_support] = 0
+        counts.eliminate_zeros()
+
+        rows = np.repeat(
+            np.arange(self.products), np.diff(counts.indptr)
+        )
+        expected = product_orders[rows] * product_orders[counts.indices]
+        if score == "cosine":
+            scores = counts.data / np.sqrt(expected)
+        else:
+            scores = counts.data * float(self.orders) / expected
+
+        for product in np.flatnonzero(np.diff(counts.indptr)):
+            start, end = counts.indptr[product], counts.indptr[product + 1]
+            related = counts.indices[start:end]
+            row_scores = scores[start:end]
+            if len(related) > k:
+                best = np.argpartition(-row_scores, k - 1)[:k]
+                related, row_scores = related[best], row_scores[best]
+            # Best first, ties by index so that reruns agree
+            order = np.lexsort((related, -row_scores))
+            yield int(product), related[order], row_scores[order]
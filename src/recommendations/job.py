@@ -0,0 +1,135 @@
+"""Rebuild the "frequently bought together" recommendations.
+
+Streams order lines, counts how often each pair of products shares an
+order, and stores each product's best scored neighbours in
+``product_recommendations``. Run it periodically, e.g. nightly:
+
+    uv sync --extra recommendations
+    uv run python -m src.recommendations.job
+"""
+
+import io
+import logging
+import time
+from typing import Dict, Iterator, List, Tuple
+
+from sqlalchemy import delete, select
+
+from src.constants.order_status import OrderStatus
+from src.database.config import engine
+from src.database.timeouts import set_local_statement_timeout
+from src.models.order.order import Order
+from src.models.order.order_item import OrderItem
+from src.models.product.product import Product
+from src.models.product.recommendation import ProductRecommendation
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _baskets(
+    connection, index: Dict[str, int], chunk_orders: int
+) -> Iterator[Tuple[List[int], List[int]]]:
+    """(order indexes, product indexes) of about ``chunk_orders`` orders at
+    a time, never splitting an order across chunks."""
+    rows = connection.execute(
+        select(OrderItem.order_id, OrderItem.product_id)
+        .join(Order, Order.id == OrderItem.order_id)
+        .where(Order.status != OrderStatus.CANCELLED)
+        .order_by(OrderItem.order_id)
+        .execution_options(
+            stream_results=True,
+            yield_per=settings.RECOMMENDATION_FETCH_SIZE,
+        )
+    )
+    orders: List[int] = []
+    products: List[int] = []
+    current = None
+    position = -1
+    for order_id, product_id in rows:
+        if order_id != current:
+            current = order_id
+            position += 1
+            if position == chunk_orders:
+                yield orders, products
+                orders, products, position = [], [], 0
+        product = index.get(product_id)
+        if product is not None:
+            orders.append(position)
+            products.append(product)
+    if orders:
+        yield orders, products
+
+
+def _store(connection, rows: Iterator[Tuple[str, int, str, float]]) -> int:
+    """Replace the stored recommendations with ``rows``.
+
+    Readers keep seeing the previous set until the transaction commits.
+    """
+    connection.execute(delete(ProductRecommendation))
+    cursor = connection.connection.cursor()
+    stored = 0
+    buffer = io.StringIO()
+    for product_id, rank, related_id, score in rows:
+        buffer.write(f"{product_id}\t{rank}\t{related_id}\t{score!r}\n")
+        stored += 1
+        if stored % 10_000 == 0:
+            buffer.seek(0)
+            cursor.copy_from(buffer, ProductRecommendation.__tablename__)
+            buffer = io.StringIO()
+    buffer.seek(0)
+    cursor.copy_from(buffer, ProductRecommendation.__tablename__)
+    return stored
+
+
+def refresh_recommendations() -> int:
+    """Rebuild every product's recommendations. Returns the rows stored."""
+    import numpy as np  # optional dependency, see the module docstring
+
+    from src.recommendations.cooccurrence import CooccurrenceCounter
+
+    with engine.begin() as connection:
+        # Millions of order lines take longer than a request's budget
+        set_local_statement_timeout(
+            connection, settings.RECOMMENDATION_STATEMENT_TIMEOUT_MS
+        )
+        product_ids = connection.execute(select(Product.id)).scalars().all()
+        index = {product_id: i for i, product_id in enumerate(product_ids)}
+        counter = CooccurrenceCounter(
+            len(product_ids), settings.RECOMMENDATION_MAX_BASKET
+        )
+        for orders, products in _baskets(
+            connection, index, settings.RECOMMENDATION_CHUNK_ORDERS
+        ):
+            counter.add(
+                np.asarray(orders, dtype=np.int64),
+                np.asarray(products, dtype=np.int64),
+            )
+
+        rows = (
+            (product_ids[product], rank, product_ids[related], float(score))
+            for product, related_products, scores in counter.top_related(
+                settings.RECOMMENDATION_TOP_K,
+                settings.RECOMMENDATION_MIN_SUPPORT,
+                settings.RECOMMENDATION_SCORE,
+            )
+            for rank, (related, score) in enumerate(
+                zip(related_products, scores, strict=True)
+            )
+        )
+        return _store(connection, rows)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    start = time.perf_counter()
+    stored = refresh_recommendations()
+    logger.info(
+        "Stored %d recommendations in %.1fs",
+        stored,
+        time.perf_counter() - start,
+    )
+
+
+if __name__ == "__main__":
+    main()
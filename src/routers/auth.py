@@ -1,13 +1,18 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from starlette import status
 
+from src.ratelimit import rate_limit
 from src.schemas.auth import (
     LoginCredentials,
     RegisterCredentials,
 )
 from src.schemas.base import BaseResponse
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(
+    prefix="/auth",
+    tags=["auth"],
+    dependencies=[Depends(rate_limit("auth"))],
+)
 
 
 @router.post("/login", response_model=BaseResponse)
@@ -0,0 +1,69 @@
+import uuid
+from typing import Callable, List, Sequence, Tuple, TypeVar
+
+from fastapi import HTTPException, status
+from sqlalchemy import any_, literal
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from src.settings import settings
+
+T = TypeVar("T")
+
+
+def _canonical(id: str) -> str:
+    try:
+        return str(uuid.UUID(id))
+    except ValueError:
+        return id  # matches no row, and is reported as missing
+
+
+def batch_ids(values: Sequence[str], name: str = "ids") -> List[str]:
+    """Ids from ``?ids=a,b&ids=c``, without duplicates, in request order.
+
+    UUIDs are written the way Postgres returns them, so that rows can be
+    matched back to the ids asked for. Raises 422 when none are given or
+    more than ``BATCH_MAX_IDS``.
+    """
+    ids = list(
+        dict.fromkeys(
+            _canonical(part.strip())
+            for value in values
+            for part in value.split(",")
+            if part.strip()
+        )
+    )
+    if not ids:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"'{name}' must list at least one id",
+        )
+    if len(ids) > settings.BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {settings.BATCH_MAX_IDS} ids may be requested "
+            "at once",
+        )
+    return ids
+
+
+def any_id(column, ids: List[str]):
+    """``column = ANY(:ids)``.
+
+    One array parameter instead of an ``IN`` list keeps the statement text,
+    and so its cached plan, the same whatever the number of ids. The array
+    takes the column's type, so ``uuid`` keys compare against ``uuid[]``.
+    """
+    return column == any_(literal(ids, ARRAY(column.type)))
+
+
+def in_request_order(
+    ids: List[str],
+    rows: Sequence[T],
+    key: Callable[[T], str] = lambda row: row.id,
+) -> Tuple[List[T], List[str]]:
+    """``rows`` sorted like ``ids``, and the ids that matched no row."""
+    by_id = {key(row): row for row in rows}
+    return (
+        [by_id[id] for id in ids if id in by_id],
+        [id for id in ids if id not in by_id],
+    )
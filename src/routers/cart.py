@@ -1,24 +1,51 @@
+from datetime import datetime, timezone
 from typing import List, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import Integer, column, delete, update, values
 from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, and_, func, select
 
-from src.database.config import get_session
-from src.models.cart.cart import CartItem
+from src.database.config import get_current_user, get_session
+from src.models.cart.cart import Cart, CartItem
+from src.models.order.address import Address
+from src.models.order.order import Order
+from src.models.order.order_item import OrderItem
+from src.models.order.payment import PaymentMethod
 from src.models.product.product import Product
+from src.models.product.promotion import ProductPromotion, Promotion
+from src.ratelimit import rate_limit
+from src.routers.idempotency import IdempotentRoute, idempotent
 from src.schemas.base import BaseResponse
-from src.schemas.cart import CartItemCreate, CartItemUpdate, CartResponse
+from src.schemas.cart import (
+    CartItemCreate,
+    CartItemUpdate,
+    CartResponse,
+    CheckoutCreate,
+)
+from src.schemas.order import OrderResponse
+from src.settings import settings
 
-router = APIRouter(prefix="/cart", tags=["cart"])
+router = APIRouter(
+    prefix="/cart",
+    tags=["cart"],
+    route_class=IdempotentRoute,
+    # Reads count as browsing, the POSTs below also against ``checkout``
+    dependencies=[Depends(rate_limit("catalog"))],
+)
 
 
 @router.get("/", response_model=BaseResponse)
-async def get_cart(
+def get_cart(
     session: Session = Depends(get_session),
-    skip: int = Query(0, description="Number of records to skip"),
-    limit: int = Query(10, description="Maximum number of records to return"),
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(
+        10,
+        ge=1,
+        le=settings.MAX_PAGE_SIZE,
+        description="Maximum number of records to return",
+    ),
 ) -> BaseResponse:
     try:
         # Get cart items with product details
@@ -64,8 +91,13 @@ async def get_cart(
         )
 
 
-@router.post("/items", response_model=BaseResponse)
-async def add_item(
+@router.post(
+    "/items",
+    response_model=BaseResponse,
+    dependencies=[Depends(rate_limit("checkout"))],
+)
+@idempotent
+def add_item(
     cart_item: CartItemCreate, session: Session = Depends(get_session)
 ) -> BaseResponse:
     try:
@@ -130,7 +162,7 @@ async def add_item(
 
 
 @router.put("/items/{id}", response_model=BaseResponse)
-async def update_item(
+def update_item(
     id: UUID,
     cart_item_update: CartItemUpdate,
     session: Session = Depends(get_session),
@@ -178,7 +210,7 @@ async def update_item(
 
 
 @router.delete("/items/{id}", response_model=BaseResponse)
-async def delete_item(
+def delete_item(
     id: UUID, session: Session = Depends(get_session)
 ) -> BaseResponse:
     try:
@@ -209,3 +241,189 @@ async def delete_item(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error deleting cart item: {str(e)}",
         )
+
+
+def _cart_lines(user_id: str):
+    """Quantity per product across the user's carts."""
+    return (
+        select(
+            CartItem.product_id,
+            func.sum(CartItem.quantity).label("quantity"),
+        )
+        .join(Cart, Cart.id == CartItem.cart_id)
+        .where(Cart.user_id == user_id)
+        .group_by(CartItem.product_id)
+        .subquery("lines")
+    )
+
+
+def _best_discount(lines, now: datetime):
+    """Largest active promotion whose minimum quantity the line reaches."""
+    return (
+        select(func.coalesce(func.max(Promotion.discount_percentage), 0.0))
+        .join(
+            ProductPromotion,
+            ProductPromotion.promotion_id == Promotion.id,
+        )
+        .where(
+            ProductPromotion.product_id == Product.id,
+            Promotion.start_date <= now,
+            Promotion.end_date >= now,
+            Promotion.minimun_number_of_products <= lines.c.quantity,
+        )
+        .correlate(Product, lines)
+        .scalar_subquery()
+    )
+
+
+@router.post(
+    "/checkout",
+    response_model=BaseResponse,
+    dependencies=[Depends(rate_limit("checkout"))],
+)
+@idempotent
+def checkout(
+    checkout_info: CheckoutCreate,
+    session: Session = Depends(get_session),
+    auth=Depends(get_current_user),
+) -> BaseResponse:
+    """Turn the authenticated user's cart into an order.
+
+    Prices, promotions and stock are read on the server, and the order, its
+    items, the stock decrements and the emptied cart commit together. The
+    number of statements does not depend on the number of cart lines.
+    """
+    try:
+        user_id = auth["decoded_token"]["uid"]
+        address = session.get(Address, checkout_info.address_id)
+        if not address:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Address '{checkout_info.address_id}' not found",
+            )
+        payment_method = session.get(
+            PaymentMethod, checkout_info.payment_method_id
+        )
+        if not payment_method:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Payment method "
+                f"'{checkout_info.payment_method_id}' not found",
+            )
+
+        # Held until commit: a concurrent checkout for this user waits, then
+        # sees the emptied cart. Quantity changes to cart items do not wait,
+        # so everything below works from the lines as read once.
+        cart_ids = session.exec(
+            select(Cart.id)
+            .where(Cart.user_id == user_id)
+            .order_by(Cart.id)
+            .with_for_update()
+        ).all()
+
+        now = datetime.now(timezone.utc)
+        lines = _cart_lines(user_id)
+        rows = session.exec(
+            select(
+                Product.id,
+                Product.stock,
+                Product.current_price,
+                Product.category_id,
+                Product.brand_id,
+                lines.c.quantity,
+                _best_discount(lines, now).label("discount"),
+            )
+            .join(lines, lines.c.product_id == Product.id)
+            .order_by(Product.id)
+            .with_for_update(of=Product)
+        ).all()
+        if not rows:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cart is empty.",
+            )
+        short = [row for row in rows if row.stock < row.quantity]
+        if short:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Not enough stock available for "
+                + ", ".join(
+                    f"product {row.id} ({row.stock} left)" for row in short
+                ),
+            )
+
+        order = Order(
+            user_id=user_id,
+            address_id=address.id,
+            payment_method_id=payment_method.id,
+            total_amount=0.0,
+            created_at=now,
+            updated_at=now,
+        )
+        items = []
+        for row in rows:
+            unit_price = round(
+                row.current_price * (1 - row.discount / 100), 2
+            )
+            items.append(
+                OrderItem(
+                    order_id=order.id,
+                    product_id=row.id,
+                    quantity=row.quantity,
+                    unit_price=unit_price,
+                    category_id=row.category_id,
+                    brand_id=row.brand_id,
+                    created_at=now,
+                    updated_at=now,
+                )
+            )
+            order.total_amount += unit_price * row.quantity
+        order.total_amount = round(order.total_amount, 2)
+
+        # The quantities that were checked and priced, not the cart's
+        # current ones
+        taken = values(
+            column("product_id", Product.__table__.c.id.type),
+            column("quantity", Integer),
+            name="taken",
+        ).data([(row.id, row.quantity) for row in rows])
+        session.exec(
+            update(Product)
+            .where(Product.id == taken.c.product_id)
+            .values(stock=Product.stock - taken.c.quantity)
+        )
+        # Flushed as one INSERT for the order and one for all its items
+        session.add(order)
+        session.add_all(items)
+        session.flush()
+        session.exec(delete(CartItem).where(CartItem.cart_id.in_(cart_ids)))
+
+        order_response = OrderResponse(
+            id=order.id,
+            user_id=order.user_id,
+            address_id=order.address_id,
+            payment_method_id=order.payment_method_id,
+            total_amount=order.total_amount,
+            status=order.status,
+            created_at=order.created_at,
+            updated_at=order.updated_at,
+            items=items,
+            address=address,
+            payment_method=payment_method.type,
+        )
+        session.commit()
+
+        return BaseResponse(
+            message="Order created successfully.",
+            status_code=status.HTTP_201_CREATED,
+            detail={"order": order_response},
+        )
+    except HTTPException:
+        session.rollback()
+        raise
+    except Exception as e:
+        session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error checking out cart: {str(e)}",
+        )
@@ -4,8 +4,13 @@ from src.schemas.base import BaseResponse
 from src.models.configuration import ConfigSchema, Config
 from sqlmodel import Session, select 
 from src.database.config import get_current_user, get_session
+from src.database.profiling import ProfiledRoute
 
-router = APIRouter(prefix="/configuration", tags=["configuration"])
+router = APIRouter(
+    prefix="/configuration",
+    tags=["configuration"],
+    route_class=ProfiledRoute,
+)
 
 
 @router.post("/", response_model=BaseResponse)
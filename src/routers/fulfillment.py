@@ -0,0 +1,261 @@
+from datetime import datetime, timedelta, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import or_, update
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, select
+
+from src.constants.order_status import ORDER_STATUS_TRANSITIONS, OrderStatus
+from src.database.config import get_session, get_staff_user_id
+from src.models.order.order import Order
+from src.ratelimit import rate_limit
+from src.routers.batch import any_id
+from src.routers.order import _order_response
+from src.schemas.base import BaseResponse
+from src.schemas.fulfillment import (
+    FulfillmentClaim,
+    FulfillmentRelease,
+    FulfillmentTransition,
+)
+from src.settings import settings
+
+router = APIRouter(
+    prefix="/fulfillment",
+    tags=["fulfillment"],
+    dependencies=[Depends(rate_limit("staff"))],
+)
+
+
+def _claim_cutoff() -> datetime:
+    """Claims taken before this have lapsed."""
+    return datetime.now(timezone.utc) - timedelta(
+        seconds=settings.FULFILLMENT_CLAIM_SECONDS
+    )
+
+
+def _claimable(packer: str, cutoff: datetime):
+    """Orders nobody else holds a live claim on."""
+    return or_(
+        Order.claimed_by.is_(None),
+        Order.claimed_by == packer,
+        Order.claimed_at < cutoff,
+    )
+
+
+def _queue_entry(order: Order) -> dict:
+    return {
+        "order": _order_response(order),
+        "claimed_by": order.claimed_by,
+        "claimed_at": order.claimed_at,
+    }
+
+
+def _with_details(statement):
+    return statement.options(
+        selectinload(Order.items),
+        selectinload(Order.address),
+        selectinload(Order.payment_method),
+    )
+
+
+@router.get("/queue", response_model=BaseResponse)
+def get_queue(
+    session: Session = Depends(get_session),
+    packer: str = Depends(get_staff_user_id),
+    include_claimed: bool = Query(
+        False,
+        description="Also list orders other packers are working on",
+    ),
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(
+        100,
+        ge=1,
+        le=settings.MAX_PAGE_SIZE,
+        description="Maximum number of records to return",
+    ),
+) -> BaseResponse:
+    """Pending orders, oldest first.
+
+    Read in order from the partial index on pending orders.
+    """
+    try:
+        query = select(Order).where(Order.status == OrderStatus.PENDING)
+        if not include_claimed:
+            query = query.where(_claimable(packer, _claim_cutoff()))
+        orders = session.exec(
+            _with_details(
+                query.order_by(Order.created_at, Order.id)
+                .offset(skip)
+                .limit(limit)
+            )
+        ).all()
+
+        return BaseResponse(
+            message="Fulfillment queue retrieved successfully.",
+            status_code=status.HTTP_200_OK,
+            detail={"orders": [_queue_entry(order) for order in orders]},
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving fulfillment queue: {str(e)}",
+        )
+
+
+@router.post("/claim", response_model=BaseResponse)
+def claim_orders(
+    claim: FulfillmentClaim,
+    session: Session = Depends(get_session),
+    packer: str = Depends(get_staff_user_id),
+) -> BaseResponse:
+    """Claim the oldest pending orders nobody else is working on.
+
+    Rows another packer is claiming at the same moment are locked and
+    skipped rather than waited for, so concurrent claims never block each
+    other or return the same order. A claim lapses after
+    ``FULFILLMENT_CLAIM_SECONDS``.
+    """
+    try:
+        now = datetime.now(timezone.utc)
+        candidates = (
+            select(Order.id)
+            .where(
+                Order.status == OrderStatus.PENDING,
+                or_(
+                    Order.claimed_by.is_(None),
+                    Order.claimed_at < _claim_cutoff(),
+                ),
+            )
+            .order_by(Order.created_at, Order.id)
+            .limit(claim.count)
+            .with_for_update(skip_locked=True)
+        )
+        claimed_ids = session.exec(
+            update(Order)
+            .where(Order.id.in_(candidates.scalar_subquery()))
+            .values(claimed_by=packer, claimed_at=now)
+            .returning(Order.id)
+        ).scalars().all()
+        session.commit()
+
+        orders = []
+        if claimed_ids:
+            orders = session.exec(
+                _with_details(
+                    select(Order)
+                    .where(any_id(Order.id, list(claimed_ids)))
+                    .order_by(Order.created_at, Order.id)
+                )
+            ).all()
+
+        return BaseResponse(
+            message=f"{len(orders)} orders claimed.",
+            status_code=status.HTTP_200_OK,
+            detail={"orders": [_queue_entry(order) for order in orders]},
+        )
+    except Exception as e:
+        session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error claiming orders: {str(e)}",
+        )
+
+
+@router.post("/release", response_model=BaseResponse)
+def release_orders(
+    release: FulfillmentRelease,
+    session: Session = Depends(get_session),
+    packer: str = Depends(get_staff_user_id),
+) -> BaseResponse:
+    """Hand the caller's claimed orders back to the queue."""
+    try:
+        order_ids = list(dict.fromkeys(release.order_ids))
+        released = session.exec(
+            update(Order)
+            .where(
+                any_id(Order.id, order_ids),
+                Order.status == OrderStatus.PENDING,
+                Order.claimed_by == packer,
+            )
+            .values(claimed_by=None, claimed_at=None)
+            .returning(Order.id)
+        ).scalars().all()
+        session.commit()
+
+        released = set(released)
+        return BaseResponse(
+            message=f"{len(released)} orders released.",
+            status_code=status.HTTP_200_OK,
+            detail={
+                "released": [id for id in order_ids if id in released],
+                "skipped": [id for id in order_ids if id not in released],
+            },
+        )
+    except Exception as e:
+        session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error releasing orders: {str(e)}",
+        )
+
+
+@router.post("/transitions", response_model=BaseResponse)
+def transition_orders(
+    transition: FulfillmentTransition,
+    session: Session = Depends(get_session),
+    packer: str = Depends(get_staff_user_id),
+) -> BaseResponse:
+    """Move up to ``FULFILLMENT_MAX_ORDERS`` orders to a status at once.
+
+    One ``UPDATE`` applies the change to every order that is allowed to
+    make it and that no other packer holds a live claim on. The rest are
+    returned as ``skipped``, unchanged. Any claim on a moved order ends.
+    """
+    try:
+        sources = [
+            source
+            for source, targets in ORDER_STATUS_TRANSITIONS.items()
+            if transition.status in targets
+        ]
+        if not sources:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"No order can be moved to '{transition.status.value}'",
+            )
+
+        order_ids = list(dict.fromkeys(transition.order_ids))
+        moved = session.exec(
+            update(Order)
+            .where(
+                any_id(Order.id, order_ids),
+                Order.status.in_(sources),
+                _claimable(packer, _claim_cutoff()),
+            )
+            .values(
+                status=transition.status,
+                claimed_by=None,
+                claimed_at=None,
+                updated_at=datetime.now(timezone.utc),
+            )
+            .returning(Order.id)
+        ).scalars().all()
+        session.commit()
+
+        moved = set(moved)
+        return BaseResponse(
+            message=f"{len(moved)} orders moved to "
+            f"'{transition.status.value}'.",
+            status_code=status.HTTP_200_OK,
+            detail={
+                "updated": [id for id in order_ids if id in moved],
+                "skipped": [id for id in order_ids if id not in moved],
+            },
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error updating orders: {str(e)}",
+        )
@@ -0,0 +1,202 @@
+import asyncio
+import functools
+import inspect
+import time
+from typing import Callable, Optional
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from src.database.config import get_current_user
+from src.database.idempotency import (
+    IDEMPOTENCY_HEADER,
+    IdempotentRequest,
+    claim,
+    complete,
+    current_idempotent_request,
+    fingerprint,
+    keep_claimed,
+    release,
+    start_idempotent_request,
+)
+from src.database.profiling import ProfiledRoute
+from src.metrics import IDEMPOTENT_REQUESTS
+from src.models.idempotency import COMPLETED
+from src.ratelimit import client_address
+from src.settings import settings
+
+
+def idempotent(endpoint: Callable) -> Callable:
+    """Mark a POST endpoint that honours the ``Idempotency-Key`` header.
+
+    Only effective on routers using ``IdempotentRoute``.
+    """
+    endpoint.idempotent = True
+    return endpoint
+
+
+def _mark_endpoint_started(endpoint: Callable) -> Callable:
+    """Record on the claimed key that ``endpoint`` itself began running."""
+
+    def mark() -> None:
+        request = current_idempotent_request()
+        if request is not None:
+            request.started = True
+
+    if inspect.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            mark()
+            return await endpoint(*args, **kwargs)
+
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        mark()
+        return endpoint(*args, **kwargs)
+
+    return wrapper
+
+
+async def _caller(request: Request) -> str:
+    """Who sent ``request``: its verified Firebase user, else its address.
+
+    Keys are scoped to their caller, so a client reusing or guessing
+    someone else's key never gets their stored response.
+    """
+    if request.headers.get("Authorization"):
+        try:
+            auth = await get_current_user(request)
+        except HTTPException as e:
+            # Endpoints without authentication ignore a bad token
+            if e.status_code != status.HTTP_401_UNAUTHORIZED:
+                raise
+        else:
+            return f"uid:{auth['decoded_token']['uid']}"
+    return f"address:{client_address(request)}"
+
+
+def _replay(row) -> Response:
+    return Response(
+        row.response_body,
+        status_code=row.response_status,
+        media_type=row.response_content_type,
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
+class IdempotentRoute(ProfiledRoute):
+    """Route whose ``@idempotent`` endpoints run once per idempotency key.
+
+    The first request with a key runs normally and its response is stored.
+    Keys are scoped to the caller: the authenticated user, or else the
+    client address.
+    Retries with the same key and body get the stored response without
+    running the endpoint; retries arriving while the first attempt is still
+    running wait for it, up to ``IDEMPOTENCY_WAIT_SECONDS``. Attempts that
+    fail with a server error, or that a dependency such as authentication
+    or a rate limit refused, are forgotten so that a retry runs again.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs) -> None:
+        if getattr(endpoint, "idempotent", False):
+            endpoint = _mark_endpoint_started(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        if not getattr(self.endpoint, "idempotent", False):
+            return handler
+        route = f"{','.join(sorted(self.methods))} {self.path}"
+
+        async def earlier_response(
+            attempt: IdempotentRequest, request_fingerprint: str
+        ) -> Optional[Response]:
+            """Answer of an earlier attempt, or None once this one may run."""
+            deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+            delay = 0.05
+            while True:
+                row = await run_in_threadpool(
+                    claim, attempt, request_fingerprint
+                )
+                if row is None:
+                    return None
+                if row.fingerprint != request_fingerprint:
+                    IDEMPOTENT_REQUESTS.labels(self.path, "mismatch").inc()
+                    raise HTTPException(
+                        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                        detail="Idempotency-Key was already used with a "
+                        "different request body",
+                    )
+                if row.status == COMPLETED:
+                    IDEMPOTENT_REQUESTS.labels(self.path, "replayed").inc()
+                    return _replay(row)
+                if time.monotonic() >= deadline:
+                    IDEMPOTENT_REQUESTS.labels(self.path, "conflict").inc()
+                    raise HTTPException(
+                        status_code=status.HTTP_409_CONFLICT,
+                        detail="A request with this Idempotency-Key is "
+                        "still being processed",
+                    )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 0.5)
+
+        async def idempotent_handler(request: Request) -> Response:
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if key is None:
+                return await handler(request)
+            if not key or len(key) > 255:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Idempotency-Key must be 1 to 255 characters",
+                )
+            attempt = IdempotentRequest(key, route, await _caller(request))
+            earlier = await earlier_response(
+                attempt, fingerprint(await request.body())
+            )
+            if earlier is not None:
+                return earlier
+
+            IDEMPOTENT_REQUESTS.labels(self.path, "executed").inc()
+            start_idempotent_request(attempt)
+            renewal = asyncio.create_task(keep_claimed(attempt))
+            try:
+                response = await handler(request)
+            except HTTPException as e:
+                # Client errors of the endpoint are answers too, retrying
+                # cannot change them. A refusal by a dependency (401, 429)
+                # came before it ran, and a retry may well pass.
+                if attempt.committed or (
+                    attempt.started and e.status_code < 500
+                ):
+                    body = JSONResponse(
+                        jsonable_encoder({"detail": e.detail})
+                    ).body
+                    await run_in_threadpool(
+                        complete, attempt, e.status_code,
+                        "application/json", body,
+                    )
+                else:
+                    await run_in_threadpool(release, attempt)
+                raise
+            except BaseException:
+                if not attempt.committed:
+                    await run_in_threadpool(release, attempt)
+                raise
+            finally:
+                renewal.cancel()
+            await run_in_threadpool(
+                complete,
+                attempt,
+                response.status_code,
+                response.headers.get("content-type"),
+                response.body,
+            )
+            return response
+
+        return idempotent_handler
+
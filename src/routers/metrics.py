@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Response
+
+from src.metrics import render_metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics() -> Response:
+    content, media_type = render_metrics()
+    return Response(content=content, media_type=media_type)
@@ -1,23 +1,183 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+from typing import List, Optional
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import selectinload
 from sqlmodel import Session, select
 
-from src.database.config import get_session, get_current_user
+from src.database.config import (
+    authenticate_token,
+    get_current_user,
+    get_session,
+    is_staff,
+)
+from src.database.notifications import broker, user_key
 from src.models.order.order import Order
 from src.models.order.order_item import OrderItem
 from src.models.order.payment import PaymentMethod
 from src.models.product.product import Product
 from src.models.user import User
+from src.ratelimit import rate_limit
+from src.routers.batch import any_id, batch_ids, in_request_order
+from src.routers.idempotency import IdempotentRoute, idempotent
 from src.schemas.base import BaseResponse
 from src.schemas.order import (
     OrderCreate,
     OrderResponse,
 )
+from src.settings import settings
+
+router = APIRouter(
+    prefix="/order",
+    tags=["order"],
+    route_class=IdempotentRoute,
+    # Reads count as browsing, the POSTs below also against ``checkout``
+    dependencies=[Depends(rate_limit("catalog"))],
+)
+
+
+async def _drain_client(websocket: WebSocket) -> None:
+    """Consume client frames until the socket closes."""
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+
+
+async def _push_order_changes(websocket: WebSocket, subscription) -> None:
+    while subscription.active:
+        events = await subscription.get(timeout=60)
+        for _, event in events:
+            await websocket.send_json({"order": event})
+
 
-router = APIRouter(prefix="/order", tags=["order"])
+@router.websocket("/ws")
+async def order_status_updates(
+    websocket: WebSocket,
+    token: Optional[str] = Query(
+        None,
+        description="Firebase ID token, for clients that cannot set headers",
+    ),
+):
+    """Push the authenticated user's order status changes as they commit.
+
+    Browsers cannot set headers on a WebSocket handshake, so the token may
+    be sent either as ``Authorization: Bearer`` or as ``?token=``.
+    """
+    auth_header = websocket.headers.get("Authorization")
+    if auth_header and auth_header.startswith("Bearer "):
+        token = auth_header.split(" ")[1]
+    if not token:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    try:
+        current_user = await run_in_threadpool(authenticate_token, token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    uid = current_user["decoded_token"]["uid"]
+    with broker.subscribe([user_key(uid)]) as subscription:
+        tasks = [
+            asyncio.create_task(_drain_client(websocket)),
+            asyncio.create_task(_push_order_changes(websocket, subscription)),
+        ]
+        done, pending = await asyncio.wait(
+            tasks, return_when=asyncio.FIRST_COMPLETED
+        )
+        for task in pending:
+            task.cancel()
+        for task in done:
+            if not task.cancelled() and task.exception():
+                # Send failures just mean the client went away
+                if not isinstance(task.exception(), WebSocketDisconnect):
+                    raise task.exception()
+
+    if subscription.terminated:
+        await websocket.close(code=status.WS_1012_SERVICE_RESTART)
+    elif subscription.overflowed:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+
+
+def _order_response(order: Order) -> OrderResponse:
+    return OrderResponse(
+        id=order.id,
+        user_id=order.user_id,
+        address_id=order.address_id,
+        payment_method_id=order.payment_method_id,
+        total_amount=order.total_amount,
+        status=order.status,
+        created_at=order.created_at,
+        updated_at=order.updated_at,
+        items=list(order.items),
+        address=order.address,
+        payment_method=order.payment_method.type,
+    )
+
+
+@router.get("/batch", response_model=BaseResponse)
+def get_orders_batch(
+    ids: List[str] = Query(
+        ...,
+        description="Order IDs, repeated or comma-separated, at most "
+        "BATCH_MAX_IDS",
+    ),
+    session: Session = Depends(get_session),
+    auth=Depends(get_current_user),
+) -> BaseResponse:
+    """Several orders in the order their ids were given.
+
+    Items, addresses and payment methods are loaded with one query each
+    for the whole batch instead of per order. Only staff see other users'
+    orders, for everyone else those are reported as missing.
+    """
+    try:
+        ids = batch_ids(ids)
+        uid = auth["decoded_token"]["uid"]
+        statement = (
+            select(Order)
+            .where(any_id(Order.id, ids))
+            .options(
+                selectinload(Order.items),
+                selectinload(Order.address),
+                selectinload(Order.payment_method),
+            )
+        )
+        if not is_staff(session, uid):
+            statement = statement.where(Order.user_id == uid)
+        rows = session.exec(statement).all()
+        orders, missing = in_request_order(ids, rows)
+
+        return BaseResponse(
+            message="Orders retrieved successfully.",
+            status_code=status.HTTP_200_OK,
+            detail={
+                "orders": [_order_response(order) for order in orders],
+                "missing": missing,
+            },
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving orders: {str(e)}",
+        )
 
 
 @router.get("/{id}", response_model=BaseResponse)
-async def get_order_by_id(
+def get_order_by_id(
     id: str,
     session: Session = Depends(get_session),
 ) -> BaseResponse:
@@ -30,19 +190,7 @@ async def get_order_by_id(
                 detail=f"Order with id '{id}' not found",
             )
 
-        order_response = OrderResponse(
-            id=order.id,
-            user_id=order.user_id,
-            address_id=order.address_id,
-            payment_method_id=order.payment_method_id,
-            total_amount=order.total_amount,
-            status=order.status,
-            created_at=order.created_at,
-            updated_at=order.updated_at,
-            items=list(order.items),
-            address=order.address,
-            payment_method=order.payment_method.type,
-        )
+        order_response = _order_response(order)
 
         return BaseResponse(
             message="Order retrieved successfully.",
@@ -62,13 +210,26 @@ async def get_order_by_id(
 
 
 @router.get("/user/{id}", response_model=BaseResponse)
-async def get_all_user_orders(
+def get_all_user_orders(
     id: str,
     session: Session = Depends(get_session),
-    auth=Depends(get_current_user)
+    auth=Depends(get_current_user),
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(
+        100,
+        ge=1,
+        le=settings.MAX_PAGE_SIZE,
+        description="Maximum number of records to return",
+    ),
 ) -> BaseResponse:
     try:
-        all_orders = session.exec(select(Order).where(Order.user_id == id)).all()
+        all_orders = session.exec(
+            select(Order)
+            .where(Order.user_id == id)
+            .order_by(Order.created_at.desc())
+            .offset(skip)
+            .limit(limit)
+        ).all()
 
         if not all_orders:
             raise HTTPException(
@@ -76,22 +237,7 @@ async def get_all_user_orders(
                 detail=f"User with id '{id}' has no orders",
             )
 
-        orders_response = [
-            OrderResponse(
-                id=order.id,
-                user_id=order.user_id,
-                address_id=order.address_id,
-                payment_method_id=order.payment_method_id,
-                total_amount=order.total_amount,
-                status=order.status,
-                created_at=order.created_at,
-                updated_at=order.updated_at,
-                items=list(order.items),
-                address=order.address,
-                payment_method=order.payment_method.type,
-            )
-            for order in all_orders
-        ]
+        orders_response = [_order_response(order) for order in all_orders]
 
         return BaseResponse(
             message="Orders retrieved successfully.",
@@ -107,13 +253,25 @@ async def get_all_user_orders(
         
         
 @router.get("/", response_model=BaseResponse)
-async def get_all_orders(
+def get_all_orders(
     session: Session = Depends(get_session),
-    auth=Depends(get_current_user)
+    auth=Depends(get_current_user),
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(
+        100,
+        ge=1,
+        le=settings.MAX_PAGE_SIZE,
+        description="Maximum number of records to return",
+    ),
 ) -> BaseResponse:
     try:
         # Replace with actual user ID retrieval logic
-        all_orders = session.exec(select(Order)).all()
+        all_orders = session.exec(
+            select(Order)
+            .order_by(Order.created_at.desc())
+            .offset(skip)
+            .limit(limit)
+        ).all()
 
         if not all_orders:
             raise HTTPException(
@@ -121,22 +279,7 @@ async def get_all_orders(
                 detail=f"Order with id '{id}' not found",
             )
 
-        orders_response = [
-            OrderResponse(
-                id=order.id,
-                user_id=order.user_id,
-                address_id=order.address_id,
-                payment_method_id=order.payment_method_id,
-                total_amount=order.total_amount,
-                status=order.status,
-                created_at=order.created_at,
-                updated_at=order.updated_at,
-                items=list(order.items),
-                address=order.address,
-                payment_method=order.payment_method.type,
-            )
-            for order in all_orders
-        ]
+        orders_response = [_order_response(order) for order in all_orders]
 
         return BaseResponse(
             message="Orders retrieved successfully.",
@@ -151,8 +294,13 @@ async def get_all_orders(
         )
 
 
-@router.post("/", response_model=BaseResponse)
-async def add_order(
+@router.post(
+    "/",
+    response_model=BaseResponse,
+    dependencies=[Depends(rate_limit("checkout"))],
+)
+@idempotent
+def add_order(
     order_info: OrderCreate, session: Session = Depends(get_session)
 ) -> BaseResponse:
     try:
@@ -199,7 +347,13 @@ async def add_order(
                     detail=f"Not enough stock available. Only {product.stock} items left.",
                 )
             # Create new order item
-            order_item_db = OrderItem(**item.model_dump(), order_id=new_order.id)
+            order_item_db = OrderItem(
+                **item.model_dump(),
+                order_id=new_order.id,
+                unit_price=product.current_price,
+                category_id=product.category_id,
+                brand_id=product.brand_id,
+            )
             session.add(order_item_db)
 
         session.add(new_order)
@@ -5,23 +5,37 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, and_, func, select
 
-from src.database.config import get_session
+from src.cache import brand_tag, invalidate_on_commit
+from src.database.config import get_read_session, get_session
+from src.database.profiling import ProfiledRoute
 from src.models.product.brand import Brand
+from src.ratelimit import rate_limit
 from src.schemas.base import BaseResponse
 from src.schemas.products.brand import BrandCreate, BrandUpdate
+from src.settings import settings
 
-router = APIRouter(prefix="/brands", tags=["brands"])
+router = APIRouter(
+    prefix="/brands",
+    tags=["brands"],
+    route_class=ProfiledRoute,
+    dependencies=[Depends(rate_limit("catalog"))],
+)
 
 
 @router.get("/", response_model=BaseResponse)
-async def get_brands(
-    session: Session = Depends(get_session),
+def get_brands(
+    session: Session = Depends(get_read_session),
     name: Optional[str] = Query(
         None,
         description="Filter by brand name (case-insensitive partial match)",
     ),
-    skip: int = Query(0, description="Number of records to skip"),
-    limit: int = Query(10, description="Maximum number of records to return"),
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(
+        10,
+        ge=1,
+        le=settings.MAX_PAGE_SIZE,
+        description="Maximum number of records to return",
+    ),
 ) -> BaseResponse:
     try:
         # Start with base query
@@ -71,8 +85,8 @@ async def get_brands(
 
 
 @router.get("/{id}", response_model=BaseResponse)
-async def get_brand(
-    id: str, session: Session = Depends(get_session)
+def get_brand(
+    id: str, session: Session = Depends(get_read_session)
 ) -> BaseResponse:
     try:
         statement = select(Brand).where(Brand.id == id)
@@ -99,7 +113,7 @@ async def get_brand(
 
 
 @router.post("/", response_model=BaseResponse)
-async def create_brand(
+def create_brand(
     brand_create: BrandCreate, session: Session = Depends(get_session)
 ) -> BaseResponse:
     try:
@@ -145,7 +159,7 @@ async def create_brand(
 
 
 @router.put("/{id}", response_model=BaseResponse)
-async def update_brand(
+def update_brand(
     id: str, brand_update: BrandUpdate, session: Session = Depends(get_session)
 ) -> BaseResponse:
     try:
@@ -174,6 +188,7 @@ async def update_brand(
 
         brand.updated_at = datetime.now(timezone.utc)
         session.add(brand)
+        invalidate_on_commit(session, {brand_tag(id)})
         session.commit()
         session.refresh(brand)
 
@@ -193,7 +208,7 @@ async def update_brand(
 
 
 @router.delete("/{id}", response_model=BaseResponse)
-async def delete_brand(
+def delete_brand(
     id: str, session: Session = Depends(get_session)
 ) -> BaseResponse:
     try:
@@ -213,6 +228,7 @@ async def delete_brand(
                 detail="Cannot delete brand with associated products. Please delete or reassign the products first.",
             )
 
+        invalidate_on_commit(session, {brand_tag(id)})
         session.delete(brand)
         session.commit()
 
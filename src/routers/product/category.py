@@ -5,17 +5,26 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, and_, func, select
 
-from src.database.config import get_session
+from src.cache import category_tag, invalidate_on_commit
+from src.database.config import get_read_session, get_session
+from src.database.profiling import ProfiledRoute
 from src.models.product.category import Category
+from src.ratelimit import rate_limit
 from src.schemas.base import BaseResponse
 from src.schemas.products.category import CategoryCreate, CategoryUpdate
+from src.settings import settings
 
-router = APIRouter(prefix="/categories", tags=["categories"])
+router = APIRouter(
+    prefix="/categories",
+    tags=["categories"],
+    route_class=ProfiledRoute,
+    dependencies=[Depends(rate_limit("catalog"))],
+)
 
 
 @router.get("/", response_model=BaseResponse)
-async def get_categories(
-    session: Session = Depends(get_session),
+def get_categories(
+    session: Session = Depends(get_read_session),
     name: Optional[str] = Query(
         None,
         description="Filter by category name (case-insensitive partial match)",
@@ -24,8 +33,13 @@ async def get_categories(
         None,
         description="Filter by parent category ID",
     ),
-    skip: int = Query(0, description="Number of records to skip"),
-    limit: int = Query(10, description="Maximum number of records to return"),
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(
+        10,
+        ge=1,
+        le=settings.MAX_PAGE_SIZE,
+        description="Maximum number of records to return",
+    ),
 ) -> BaseResponse:
     try:
         # Start with base query
@@ -78,8 +92,8 @@ async def get_categories(
 
 
 @router.get("/{id}", response_model=BaseResponse)
-async def get_category(
-    id: str, session: Session = Depends(get_session)
+def get_category(
+    id: str, session: Session = Depends(get_read_session)
 ) -> BaseResponse:
     try:
         statement = select(Category).where(Category.id == id)
@@ -106,7 +120,7 @@ async def get_category(
 
 
 @router.post("/", response_model=BaseResponse)
-async def create_category(
+def create_category(
     category_create: CategoryCreate, session: Session = Depends(get_session)
 ) -> BaseResponse:
     try:
@@ -165,7 +179,7 @@ async def create_category(
 
 
 @router.put("/{id}", response_model=BaseResponse)
-async def update_category(
+def update_category(
     id: str,
     category_update: CategoryUpdate,
     session: Session = Depends(get_session),
@@ -234,6 +248,7 @@ async def update_category(
 
         category.updated_at = datetime.now(timezone.utc)
         session.add(category)
+        invalidate_on_commit(session, {category_tag(id)})
         session.commit()
         session.refresh(category)
 
@@ -253,7 +268,7 @@ async def update_category(
 
 
 @router.delete("/{id}", response_model=BaseResponse)
-async def delete_category(
+def delete_category(
     id: str, session: Session = Depends(get_session)
 ) -> BaseResponse:
     try:
@@ -266,6 +281,7 @@ async def delete_category(
                 detail=f"Category with id {id} not found",
             )
 
+        invalidate_on_commit(session, {category_tag(id)})
         session.delete(category)
         session.commit()
 
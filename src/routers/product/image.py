@@ -1,29 +1,81 @@
 from datetime import datetime, timezone
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
 from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, and_, func, select
 
-from src.database.config import get_session
+from src.database.config import get_read_session, get_session
+from src.database.profiling import ProfiledRoute
+from src.images import MEDIA_TYPES, InvalidImage, stored_file
+from src.images.pipeline import ingest_upload
 from src.models.product.image import Image
+from src.models.product.product import Product
+from src.ratelimit import rate_limit
+from src.routers.batch import any_id, batch_ids
 from src.schemas.base import BaseResponse
 from src.schemas.products.image import ImageCreate, ImageUpdate
+from src.settings import settings
 
-router = APIRouter(prefix="/images", tags=["images"])
+router = APIRouter(
+    prefix="/images",
+    tags=["images"],
+    route_class=ProfiledRoute,
+    dependencies=[Depends(rate_limit("catalog"))],
+)
+
+# Stored files are fetched once per picture on a page, so they are not
+# rate limited with the catalog; they are cached by browsers and CDNs.
+files_router = APIRouter(prefix="/images/files", tags=["images"])
+
+FILES_PATH = "/images/files"
+
+
+def _file_url(digest: str, name: str) -> str:
+    return f"{FILES_PATH}/{digest}/{name}"
 
 
 @router.get("/", response_model=BaseResponse)
-async def get_images(
-    session: Session = Depends(get_session),
+def get_images(
+    session: Session = Depends(get_read_session),
     product_id: Optional[str] = Query(
         None,
         description="Filter by product ID",
     ),
-    skip: int = Query(0, description="Number of records to skip"),
-    limit: int = Query(10, description="Maximum number of records to return"),
+    product_ids: Optional[List[str]] = Query(
+        None,
+        description="Images of several products at once, repeated or "
+        "comma-separated, at most BATCH_MAX_IDS. Returns every image of "
+        "those products, grouped in the order the ids were given, and "
+        "ignores skip and limit.",
+    ),
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(
+        10,
+        ge=1,
+        le=settings.MAX_PAGE_SIZE,
+        description="Maximum number of records to return",
+    ),
 ) -> BaseResponse:
     try:
+        if product_ids is not None:
+            return _get_images_of_products(
+                session, batch_ids(product_ids, "product_ids")
+            )
+
         # Start with base query
         query = select(Image)
 
@@ -63,6 +115,8 @@ async def get_images(
                 "images": images,
             },
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -70,9 +124,34 @@ async def get_images(
         )
 
 
+def _get_images_of_products(
+    session: Session, product_ids: List[str]
+) -> BaseResponse:
+    images = session.exec(
+        select(Image)
+        .where(any_id(Image.product_id, product_ids))
+        .order_by(Image.created_at)
+    ).all()
+    position = {id: index for index, id in enumerate(product_ids)}
+    # Stable, so each product's images stay oldest first
+    images = sorted(images, key=lambda image: position[image.product_id])
+    with_images = {image.product_id for image in images}
+
+    return BaseResponse(
+        message="Images retrieved successfully.",
+        status_code=status.HTTP_200_OK,
+        detail={
+            "total": len(images),
+            "filters_applied": {"product_ids": product_ids},
+            "images": images,
+            "missing": [id for id in product_ids if id not in with_images],
+        },
+    )
+
+
 @router.get("/{id}", response_model=BaseResponse)
-async def get_image(
-    id: str, session: Session = Depends(get_session)
+def get_image(
+    id: str, session: Session = Depends(get_read_session)
 ) -> BaseResponse:
     try:
         statement = select(Image).where(Image.id == id)
@@ -99,7 +178,7 @@ async def get_image(
 
 
 @router.post("/", response_model=BaseResponse)
-async def create_image(
+def create_image(
     image_create: ImageCreate, session: Session = Depends(get_session)
 ) -> BaseResponse:
     try:
@@ -144,8 +223,133 @@ async def create_image(
         )
 
 
+def _save_uploaded_image(
+    session: Session, product_id: str, alt_text: Optional[str], stored: dict
+) -> Image:
+    digest = stored["digest"]
+    image = Image(
+        url=_file_url(digest, stored["original"]),
+        alt_text=alt_text,
+        product_id=product_id,
+        content_hash=digest,
+        content_type=stored["content_type"],
+        width=stored["width"],
+        height=stored["height"],
+        variants=[
+            {
+                "url": _file_url(digest, variant["name"]),
+                "width": variant["width"],
+                "height": variant["height"],
+                "content_type": variant["content_type"],
+                "size": variant["size"],
+            }
+            for variant in stored["variants"]
+        ],
+    )
+    session.add(image)
+    session.commit()
+    session.refresh(image)
+    return image
+
+
+@router.post(
+    "/upload",
+    response_model=BaseResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def upload_image(
+    file: UploadFile = File(..., description="JPEG, PNG, GIF or WebP"),
+    product_id: str = Form(...),
+    alt_text: Optional[str] = Form(None),
+    session: Session = Depends(get_session),
+) -> BaseResponse:
+    """Store an image for a product and build its responsive variants.
+
+    The original is kept as uploaded; variants are resized to each of
+    ``IMAGE_VARIANT_WIDTHS`` narrower than it, in AVIF and WebP, so
+    clients can build a ``srcset`` from ``variants``.
+    """
+    try:
+        data = await file.read(settings.IMAGE_MAX_UPLOAD_BYTES + 1)
+        if len(data) > settings.IMAGE_MAX_UPLOAD_BYTES:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="Image is larger than "
+                f"{settings.IMAGE_MAX_UPLOAD_BYTES} bytes",
+            )
+        product = await run_in_threadpool(session.get, Product, product_id)
+        if product is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Product with id {product_id} not found",
+            )
+        # End the read so its connection goes back to the pool instead of
+        # idling in a transaction through the encode
+        await run_in_threadpool(session.rollback)
+        try:
+            stored = await ingest_upload(data)
+        except InvalidImage as e:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail=str(e),
+            )
+        try:
+            image = await run_in_threadpool(
+                _save_uploaded_image, session, product_id, alt_text, stored
+            )
+        except IntegrityError:
+            # The product was deleted while the upload was being encoded
+            await run_in_threadpool(session.rollback)
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Product with id {product_id} not found",
+            )
+
+        return BaseResponse(
+            message="Image uploaded successfully.",
+            status_code=status.HTTP_201_CREATED,
+            detail={"image": image},
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        await run_in_threadpool(session.rollback)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error uploading image: {str(e)}",
+        )
+
+
+@files_router.get("/{digest}/{name}")
+def get_image_file(digest: str, name: str, request: Request) -> Response:
+    """Serve a stored original or variant.
+
+    A path's content never changes, so responses may be cached forever.
+    Range requests are answered with ``206 Partial Content``.
+    """
+    path = stored_file(settings.IMAGE_STORAGE_DIR, digest, name)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Image file not found",
+        )
+    headers = {
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "ETag": f'"{digest}-{name}"',
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers=headers
+        )
+    return FileResponse(
+        path,
+        media_type=MEDIA_TYPES[path.suffix[1:]],
+        headers=headers,
+    )
+
+
 @router.put("/{id}", response_model=BaseResponse)
-async def update_image(
+def update_image(
     id: str, image_update: ImageUpdate, session: Session = Depends(get_session)
 ) -> BaseResponse:
     try:
@@ -182,7 +386,7 @@ async def update_image(
 
 
 @router.delete("/{id}", response_model=BaseResponse)
-async def delete_image(
+def delete_image(
     id: str, session: Session = Depends(get_session)
 ) -> BaseResponse:
     try:
@@ -1,21 +1,104 @@
-from datetime import datetime, timezone
-from typing import List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import Float, case, literal, true, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, and_, func, select
 
-from src.database.config import get_session
+from src.cache import (
+    facet_tags,
+    invalidate_on_commit,
+    listing_tags,
+    product_tags,
+    response_cache,
+)
+from src.constants.product_sort import ProductSort
+from src.database.config import get_read_session, get_session
+from src.models.product.brand import Brand
+from src.models.product.category import Category
 from src.models.product.product import Product
+from src.models.product.recommendation import ProductRecommendation
+from src.models.product.tag import ProductTag, Tag
+from src.ratelimit import rate_limit
+from src.routers.batch import any_id, batch_ids, in_request_order
+from src.routers.single_flight import SingleFlightRoute, single_flight
 from src.schemas.base import BaseResponse
 from src.schemas.products.product import ProductCreate, ProductUpdate
-
-router = APIRouter(prefix="/products", tags=["products"])
+from src.settings import settings
+
+router = APIRouter(
+    prefix="/products",
+    tags=["products"],
+    route_class=SingleFlightRoute,
+    dependencies=[Depends(rate_limit("catalog"))],
+)
+
+
+# Each order ends on the id, so pages are stable, and in the same direction
+# as the sort column, so an index on (column, id) serves it read forwards
+# or backwards; see migration 0006. Names are unique and need no tiebreak.
+# Unrated products come first in ``rating`` and last in ``-rating``.
+_SORT_ORDERS = {
+    ProductSort.PRICE: (Product.current_price.asc(), Product.id.asc()),
+    ProductSort.PRICE_DESC: (Product.current_price.desc(), Product.id.desc()),
+    ProductSort.RATING: (
+        Product.rating.asc().nulls_first(),
+        Product.id.asc(),
+    ),
+    ProductSort.RATING_DESC: (
+        Product.rating.desc().nulls_last(),
+        Product.id.desc(),
+    ),
+    ProductSort.CREATED_AT: (Product.created_at.asc(), Product.id.asc()),
+    ProductSort.CREATED_AT_DESC: (
+        Product.created_at.desc(),
+        Product.id.desc(),
+    ),
+    ProductSort.NAME: (Product.name.asc(),),
+    ProductSort.NAME_DESC: (Product.name.desc(),),
+}
+
+
+def _product_conditions(
+    name: Optional[str],
+    category_id: Optional[str],
+    brand_id: Optional[str],
+    min_price: Optional[float],
+    max_price: Optional[float],
+    in_stock: Optional[bool],
+) -> Dict[str, list]:
+    """Listing filters as SQL conditions, grouped by the facet they set."""
+    conditions: Dict[str, list] = {
+        "name": [],
+        "category": [],
+        "brand": [],
+        "price": [],
+        "in_stock": [],
+    }
+    if name:
+        conditions["name"].append(Product.name.ilike(f"%{name}%"))
+    if category_id:
+        conditions["category"].append(Product.category_id == category_id)
+    if brand_id:
+        conditions["brand"].append(Product.brand_id == brand_id)
+    if min_price is not None:
+        conditions["price"].append(Product.current_price >= min_price)
+    if max_price is not None:
+        conditions["price"].append(Product.current_price <= max_price)
+    if in_stock is not None:
+        if in_stock:
+            conditions["in_stock"].append(Product.stock > 0)
+        else:
+            conditions["in_stock"].append(Product.stock == 0)
+    return conditions
 
 
 @router.get("/", response_model=BaseResponse)
-async def get_products(
-    session: Session = Depends(get_session),
+@single_flight
+def get_products(
+    session: Session = Depends(get_read_session),
     name: Optional[str] = Query(
         None,
         description="Filter by product name (case-insensitive partial match)",
@@ -40,37 +123,53 @@ async def get_products(
         None,
         description="Filter by stock availability",
     ),
-    skip: int = Query(0, description="Number of records to skip"),
-    limit: int = Query(100, description="Maximum number of records to return"),
+    sort: ProductSort = Query(
+        ProductSort.CREATED_AT_DESC,
+        description="Sort order, '-' for descending",
+    ),
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(
+        100,
+        ge=1,
+        le=settings.MAX_PAGE_SIZE,
+        description="Maximum number of records to return",
+    ),
 ) -> BaseResponse:
     try:
+        cache_key = response_cache.key(
+            "products",
+            name=name,
+            category_id=category_id,
+            brand_id=brand_id,
+            min_price=min_price,
+            max_price=max_price,
+            in_stock=in_stock,
+            sort=sort.value,
+            skip=skip,
+            limit=limit,
+        )
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         # Start with base query
         query = select(Product)
 
         # Build filter conditions
-        conditions = []
-        if name:
-            conditions.append(Product.name.ilike(f"%{name}%"))
-        if category_id:
-            conditions.append(Product.category_id == category_id)
-        if brand_id:
-            conditions.append(Product.brand_id == brand_id)
-        if min_price is not None:
-            conditions.append(Product.price >= min_price)
-        if max_price is not None:
-            conditions.append(Product.price <= max_price)
-        if in_stock is not None:
-            if in_stock:
-                conditions.append(Product.stock > 0)
-            else:
-                conditions.append(Product.stock == 0)
+        conditions = [
+            condition
+            for facet_conditions in _product_conditions(
+                name, category_id, brand_id, min_price, max_price, in_stock
+            ).values()
+            for condition in facet_conditions
+        ]
 
         # Apply filters if any exist
         if conditions:
             query = query.where(and_(*conditions))
 
-        # Apply pagination
-        query = query.offset(skip).limit(limit)
+        # Apply sorting and pagination
+        query = query.order_by(*_SORT_ORDERS[sort]).offset(skip).limit(limit)
 
         # Execute query
         products = session.exec(query).all()
@@ -83,34 +182,355 @@ async def get_products(
             select(func.count()).select_from(count_query.subquery())
         ).first()
 
+        return response_cache.store(
+            cache_key,
+            BaseResponse(
+                message="Products retrieved successfully.",
+                status_code=status.HTTP_200_OK,
+                detail={
+                    "total": total,
+                    "skip": skip,
+                    "limit": limit,
+                    "filters_applied": {
+                        "name": name,
+                        "category_id": category_id,
+                        "brand_id": brand_id,
+                        "min_price": min_price,
+                        "max_price": max_price,
+                        "in_stock": in_stock,
+                    },
+                    "sort": sort.value,
+                    "products": products,
+                },
+            ),
+            listing_tags(
+                products,
+                category_id,
+                brand_id,
+                by_price=min_price is not None
+                or max_price is not None
+                or sort in (ProductSort.PRICE, ProductSort.PRICE_DESC),
+                by_stock=in_stock is not None,
+            ),
+            session,
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving products: {str(e)}",
+        )
+
+
+@router.get("/batch", response_model=BaseResponse)
+@single_flight
+def get_products_batch(
+    ids: List[str] = Query(
+        ...,
+        description="Product IDs, repeated or comma-separated, at most "
+        "BATCH_MAX_IDS",
+    ),
+    session: Session = Depends(get_read_session),
+) -> BaseResponse:
+    """Several products in one query, in the order their ids were given."""
+    try:
+        ids = batch_ids(ids)
+        rows = session.exec(select(Product).where(any_id(Product.id, ids)))
+        products, missing = in_request_order(ids, rows.all())
+
         return BaseResponse(
             message="Products retrieved successfully.",
             status_code=status.HTTP_200_OK,
+            detail={"products": products, "missing": missing},
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving products: {str(e)}",
+        )
+
+
+@router.get("/expiring", response_model=BaseResponse)
+def get_expiring_products(
+    session: Session = Depends(get_read_session),
+    within: int = Query(
+        7,
+        ge=0,
+        le=settings.EXPIRING_MAX_DAYS,
+        description="Days ahead to look for expiring stock",
+    ),
+    include_expired: bool = Query(
+        False,
+        description="Also list products in stock that already expired",
+    ),
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(
+        100,
+        ge=1,
+        le=settings.MAX_PAGE_SIZE,
+        description="Maximum number of records to return",
+    ),
+) -> BaseResponse:
+    """Products in stock that expire within ``within`` days, soonest first.
+
+    Read in order from the index on the generated ``effective_expiry``.
+    """
+    try:
+        now = datetime.now(timezone.utc)
+        conditions = [
+            Product.stock > 0,
+            Product.effective_expiry <= now + timedelta(days=within),
+        ]
+        if not include_expired:
+            conditions.append(Product.effective_expiry > now)
+        products = session.exec(
+            select(Product)
+            .where(*conditions)
+            .order_by(Product.effective_expiry, Product.id)
+            .offset(skip)
+            .limit(limit)
+        ).all()
+
+        return BaseResponse(
+            message="Expiring products retrieved successfully.",
+            status_code=status.HTTP_200_OK,
             detail={
-                "total": total,
-                "skip": skip,
-                "limit": limit,
-                "filters_applied": {
-                    "name": name,
-                    "category_id": category_id,
-                    "brand_id": brand_id,
-                    "min_price": min_price,
-                    "max_price": max_price,
-                    "in_stock": in_stock,
-                },
+                "within": within,
+                "include_expired": include_expired,
                 "products": products,
             },
         )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error retrieving products: {str(e)}",
+            detail=f"Error retrieving expiring products: {str(e)}",
+        )
+
+
+@router.get("/facets", response_model=BaseResponse)
+@single_flight
+def get_product_facets(
+    session: Session = Depends(get_read_session),
+    name: Optional[str] = Query(
+        None,
+        description="Filter by product name (case-insensitive partial match)",
+    ),
+    category_id: Optional[str] = Query(
+        None,
+        description="Filter by category ID",
+    ),
+    brand_id: Optional[str] = Query(
+        None,
+        description="Filter by brand ID",
+    ),
+    min_price: Optional[float] = Query(
+        None,
+        description="Filter by minimum price",
+    ),
+    max_price: Optional[float] = Query(
+        None,
+        description="Filter by maximum price",
+    ),
+    in_stock: Optional[bool] = Query(
+        None,
+        description="Filter by stock availability",
+    ),
+) -> BaseResponse:
+    """Counts per brand, category, tag, price bucket and stock state.
+
+    Every facet is counted under all the filters but its own, so picking a
+    brand still shows how many products the other brands would give. All
+    of them come from one grouping-sets query.
+    """
+    try:
+        cache_key = response_cache.key(
+            "product_facets",
+            name=name,
+            category_id=category_id,
+            brand_id=brand_id,
+            min_price=min_price,
+            max_price=max_price,
+            in_stock=in_stock,
+        )
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        conditions = _product_conditions(
+            name, category_id, brand_id, min_price, max_price, in_stock
+        )
+
+        def matching(*excluded: str):
+            """Products matching every filter except those of ``excluded``."""
+            kept = [
+                condition
+                for facet, facet_conditions in conditions.items()
+                if facet not in excluded
+                for condition in facet_conditions
+            ]
+            return func.count(Product.id.distinct()).filter(
+                and_(true(), *kept)
+            )
+
+        edges = settings.FACET_PRICE_BUCKETS
+        # 0 below the first edge, len(edges) at or above the last
+        price_bucket = func.width_bucket(
+            Product.current_price, literal(edges, ARRAY(Float))
+        ).label("price_bucket")
+        stocked = (Product.stock > 0).label("stocked")
+        grouping = func.grouping(
+            Product.brand_id,
+            Product.category_id,
+            ProductTag.tag_id,
+            price_bucket,
+            stocked,
+        )
+        # One bit per grouped column, set when the row is aggregated over
+        # it: 0b01111 is a brand row, 0b10111 a category row and so on
+        facets = {
+            0b01111: "brand",
+            0b10111: "category",
+            0b11011: "tag",
+            0b11101: "price",
+            0b11110: "in_stock",
+        }
+        count = case(
+            *(
+                (grouping == mask, matching(facet))
+                for mask, facet in facets.items()
+                if facet != "tag"
+            ),
+            # A product has many tags, and filters on none of them
+            else_=matching(),
+        )
+
+        statement = (
+            select(
+                grouping.label("grouping"),
+                Product.brand_id,
+                Brand.name.label("brand_name"),
+                Product.category_id,
+                Category.name.label("category_name"),
+                ProductTag.tag_id,
+                Tag.name.label("tag_name"),
+                price_bucket,
+                stocked,
+                count.label("count"),
+            )
+            .select_from(Product)
+            .join(Brand, Brand.id == Product.brand_id)
+            .join(Category, Category.id == Product.category_id)
+            .outerjoin(ProductTag, ProductTag.product_id == Product.id)
+            .outerjoin(Tag, Tag.id == ProductTag.tag_id)
+            .where(*conditions["name"])
+            .group_by(
+                func.grouping_sets(
+                    tuple_(Product.brand_id, Brand.name),
+                    tuple_(Product.category_id, Category.name),
+                    tuple_(ProductTag.tag_id, Tag.name),
+                    tuple_(price_bucket),
+                    tuple_(stocked),
+                    tuple_(),
+                )
+            )
+        )
+
+        total = 0
+        brands, categories, tags, price_buckets = [], [], [], []
+        in_stock_count = out_of_stock_count = 0
+        for row in session.exec(statement):
+            facet = facets.get(row.grouping)
+            if facet is None:
+                total = row.count
+            elif not row.count:
+                continue
+            elif facet == "brand":
+                brands.append(
+                    {
+                        "id": row.brand_id,
+                        "name": row.brand_name,
+                        "count": row.count,
+                    }
+                )
+            elif facet == "category":
+                categories.append(
+                    {
+                        "id": row.category_id,
+                        "name": row.category_name,
+                        "count": row.count,
+                    }
+                )
+            elif facet == "tag":
+                # Untagged products group under a null tag
+                if row.tag_id is not None:
+                    tags.append(
+                        {
+                            "id": row.tag_id,
+                            "name": row.tag_name,
+                            "count": row.count,
+                        }
+                    )
+            elif facet == "price":
+                bucket = row.price_bucket
+                price_buckets.append(
+                    {
+                        "min": edges[bucket - 1] if bucket > 0 else None,
+                        "max": edges[bucket] if bucket < len(edges) else None,
+                        "count": row.count,
+                    }
+                )
+            elif row.stocked:
+                in_stock_count = row.count
+            else:
+                out_of_stock_count = row.count
+
+        for values in (brands, categories, tags):
+            values.sort(key=lambda value: (-value["count"], value["name"]))
+        price_buckets.sort(
+            key=lambda value: value["min"] if value["min"] is not None else -1
+        )
+
+        return response_cache.store(
+            cache_key,
+            BaseResponse(
+                message="Product facets retrieved successfully.",
+                status_code=status.HTTP_200_OK,
+                detail={
+                    "total": total,
+                    "filters_applied": {
+                        "name": name,
+                        "category_id": category_id,
+                        "brand_id": brand_id,
+                        "min_price": min_price,
+                        "max_price": max_price,
+                        "in_stock": in_stock,
+                    },
+                    "brands": brands,
+                    "categories": categories,
+                    "tags": tags,
+                    "price_buckets": price_buckets,
+                    "in_stock": in_stock_count,
+                    "out_of_stock": out_of_stock_count,
+                },
+            ),
+            facet_tags(
+                [brand["id"] for brand in brands],
+                [category["id"] for category in categories],
+            ),
+            session,
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving product facets: {str(e)}",
         )
 
 
 @router.get("/{id}", response_model=BaseResponse)
-async def get_product(
-    id: str, session: Session = Depends(get_session)
+@single_flight
+def get_product(
+    id: str, session: Session = Depends(get_read_session)
 ) -> BaseResponse:
     try:
         statement = select(Product).where(Product.id == id)
@@ -136,8 +556,54 @@ async def get_product(
         )
 
 
+@router.get("/{id}/related", response_model=BaseResponse)
+@single_flight
+def get_related_products(
+    id: str,
+    session: Session = Depends(get_read_session),
+    limit: int = Query(
+        settings.RECOMMENDATION_TOP_K,
+        ge=1,
+        le=settings.RECOMMENDATION_TOP_K,
+        description="Maximum number of products to return",
+    ),
+) -> BaseResponse:
+    """Products frequently bought together with this one, best first.
+
+    Read from the precomputed recommendations in one primary key range
+    scan; a product nobody has bought yet has none.
+    """
+    try:
+        rows = session.exec(
+            select(Product, ProductRecommendation.score)
+            .join(
+                ProductRecommendation,
+                ProductRecommendation.related_product_id == Product.id,
+            )
+            .where(ProductRecommendation.product_id == id)
+            .order_by(ProductRecommendation.rank)
+            .limit(limit)
+        ).all()
+
+        return BaseResponse(
+            message="Related products retrieved successfully.",
+            status_code=status.HTTP_200_OK,
+            detail={
+                "products": [
+                    {"product": product, "score": score}
+                    for product, score in rows
+                ],
+            },
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving related products: {str(e)}",
+        )
+
+
 @router.post("/", response_model=BaseResponse)
-async def create_product(
+def create_product(
     product_create: ProductCreate, session: Session = Depends(get_session)
 ) -> BaseResponse:
     try:
@@ -175,6 +641,7 @@ async def create_product(
 
         product = Product(**product_create.model_dump())
         session.add(product)
+        invalidate_on_commit(session, product_tags(product))
         session.commit()
         session.refresh(product)
 
@@ -216,7 +683,7 @@ async def create_product(
 
 
 @router.put("/{id}", response_model=BaseResponse)
-async def update_product(
+def update_product(
     id: str,
     product_update: ProductUpdate,
     session: Session = Depends(get_session),
@@ -274,10 +741,13 @@ async def update_product(
                     detail=f"Brand with id {product_update.brand_id} not found",
                 )
 
+        # Listings of the old category and brand change as well
+        invalidate_on_commit(session, product_tags(product))
         for key, value in product_update.model_dump(
             exclude_unset=True
         ).items():
             setattr(product, key, value)
+        invalidate_on_commit(session, product_tags(product))
 
         product.updated_at = datetime.now(timezone.utc)
         session.add(product)
@@ -300,7 +770,7 @@ async def update_product(
 
 
 @router.delete("/{id}", response_model=BaseResponse)
-async def delete_product(
+def delete_product(
     id: str, session: Session = Depends(get_session)
 ) -> BaseResponse:
     try:
@@ -327,6 +797,7 @@ async def delete_product(
                 detail="Cannot delete product with associated order items. Please remove the product from orders first.",
             )
 
+        invalidate_on_commit(session, product_tags(product))
         session.delete(product)
         session.commit()
 
@@ -5,17 +5,25 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, and_, func, select
 
-from src.database.config import get_session
+from src.database.config import get_read_session, get_session
+from src.database.profiling import ProfiledRoute
 from src.models.product.promotion import Promotion
+from src.ratelimit import rate_limit
 from src.schemas.base import BaseResponse
 from src.schemas.products.promotion import PromotionCreate, PromotionUpdate
+from src.settings import settings
 
-router = APIRouter(prefix="/promotions", tags=["promotions"])
+router = APIRouter(
+    prefix="/promotions",
+    tags=["promotions"],
+    route_class=ProfiledRoute,
+    dependencies=[Depends(rate_limit("catalog"))],
+)
 
 
 @router.get("/", response_model=BaseResponse)
-async def get_promotions(
-    session: Session = Depends(get_session),
+def get_promotions(
+    session: Session = Depends(get_read_session),
     name: Optional[str] = Query(
         None,
         description="Filter by promotion name (case-insensitive partial match)",
@@ -24,8 +32,13 @@ async def get_promotions(
         None,
         description="Filter by active status (based on current date)",
     ),
-    skip: int = Query(0, description="Number of records to skip"),
-    limit: int = Query(10, description="Maximum number of records to return"),
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(
+        10,
+        ge=1,
+        le=settings.MAX_PAGE_SIZE,
+        description="Maximum number of records to return",
+    ),
 ) -> BaseResponse:
     try:
         # Start with base query
@@ -85,8 +98,8 @@ async def get_promotions(
 
 
 @router.get("/{id}", response_model=BaseResponse)
-async def get_promotion(
-    id: str, session: Session = Depends(get_session)
+def get_promotion(
+    id: str, session: Session = Depends(get_read_session)
 ) -> BaseResponse:
     try:
         statement = select(Promotion).where(Promotion.id == id)
@@ -113,7 +126,7 @@ async def get_promotion(
 
 
 @router.post("/", response_model=BaseResponse)
-async def create_promotion(
+def create_promotion(
     promotion_create: PromotionCreate, session: Session = Depends(get_session)
 ) -> BaseResponse:
     try:
@@ -166,7 +179,7 @@ async def create_promotion(
 
 
 @router.put("/{id}", response_model=BaseResponse)
-async def update_promotion(
+def update_promotion(
     id: str,
     promotion_update: PromotionUpdate,
     session: Session = Depends(get_session),
@@ -240,7 +253,7 @@ async def update_promotion(
 
 
 @router.delete("/{id}", response_model=BaseResponse)
-async def delete_promotion(
+def delete_promotion(
     id: str, session: Session = Depends(get_session)
 ) -> BaseResponse:
     try:
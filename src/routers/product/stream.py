@@ -0,0 +1,72 @@
+import json
+from typing import AsyncIterator, List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from src.database.notifications import (
+    broker,
+    category_key,
+    product_key,
+)
+from src.settings import settings
+
+router = APIRouter(prefix="/products", tags=["products"])
+
+
+async def _event_stream(keys: List[str]) -> AsyncIterator[str]:
+    with broker.subscribe(keys) as subscription:
+        # Tell EventSource clients how long to wait before reconnecting
+        yield "retry: 5000\n\n"
+        while subscription.active:
+            events = await subscription.get(
+                timeout=settings.SSE_HEARTBEAT_SECONDS
+            )
+            if not events:
+                if subscription.active:
+                    yield ": heartbeat\n\n"
+                continue
+            for channel, event in events:
+                yield f"event: {channel}\ndata: {json.dumps(event)}\n\n"
+    # Overflowed subscribers are dropped and reconnect with a clean slate,
+    # as do all subscribers of a worker that is shutting down
+
+
+@router.get("/stream")
+async def stream_product_changes(
+    ids: Optional[List[str]] = Query(
+        None,
+        description="Product IDs to watch for stock and price changes",
+    ),
+    category_id: Optional[str] = Query(
+        None,
+        description="Watch every product in this category",
+    ),
+) -> StreamingResponse:
+    ids = ids or []
+    if not ids and not category_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide at least one product id or a category id.",
+        )
+    if len(ids) > settings.SSE_MAX_PRODUCT_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                "Cannot watch more than"
+                f" {settings.SSE_MAX_PRODUCT_IDS} products at once."
+            ),
+        )
+
+    keys = [product_key(id) for id in ids]
+    if category_id:
+        keys.append(category_key(category_id))
+
+    return StreamingResponse(
+        _event_stream(keys),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
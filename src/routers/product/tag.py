@@ -5,23 +5,36 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, and_, func, select
 
-from src.database.config import get_session
+from src.database.config import get_read_session, get_session
+from src.database.profiling import ProfiledRoute
 from src.models.product.tag import Tag
+from src.ratelimit import rate_limit
 from src.schemas.base import BaseResponse
 from src.schemas.products.tag import TagCreate, TagUpdate
+from src.settings import settings
 
-router = APIRouter(prefix="/tags", tags=["tags"])
+router = APIRouter(
+    prefix="/tags",
+    tags=["tags"],
+    route_class=ProfiledRoute,
+    dependencies=[Depends(rate_limit("catalog"))],
+)
 
 
 @router.get("/", response_model=BaseResponse)
-async def get_tags(
-    session: Session = Depends(get_session),
+def get_tags(
+    session: Session = Depends(get_read_session),
     name: Optional[str] = Query(
         None,
         description="Filter by tag name (case-insensitive partial match)",
     ),
-    skip: int = Query(0, description="Number of records to skip"),
-    limit: int = Query(10, description="Maximum number of records to return"),
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(
+        10,
+        ge=1,
+        le=settings.MAX_PAGE_SIZE,
+        description="Maximum number of records to return",
+    ),
 ) -> BaseResponse:
     try:
         # Start with base query
@@ -71,8 +84,8 @@ async def get_tags(
 
 
 @router.get("/{id}", response_model=BaseResponse)
-async def get_tag(
-    id: str, session: Session = Depends(get_session)
+def get_tag(
+    id: str, session: Session = Depends(get_read_session)
 ) -> BaseResponse:
     try:
         statement = select(Tag).where(Tag.id == id)
@@ -99,7 +112,7 @@ async def get_tag(
 
 
 @router.post("/", response_model=BaseResponse)
-async def create_tag(
+def create_tag(
     tag_create: TagCreate, session: Session = Depends(get_session)
 ) -> BaseResponse:
     try:
@@ -145,7 +158,7 @@ async def create_tag(
 
 
 @router.put("/{id}", response_model=BaseResponse)
-async def update_tag(
+def update_tag(
     id: str, tag_update: TagUpdate, session: Session = Depends(get_session)
 ) -> BaseResponse:
     try:
@@ -193,7 +206,7 @@ async def update_tag(
 
 
 @router.delete("/{id}", response_model=BaseResponse)
-async def delete_tag(
+def delete_tag(
     id: str, session: Session = Depends(get_session)
 ) -> BaseResponse:
     try:
@@ -0,0 +1,208 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlmodel import Session, func, select
+
+from src.constants.sales_dimension import SalesDimension
+from src.database.config import get_read_session, get_staff_user_id
+from src.models.product.brand import Brand
+from src.models.product.category import Category
+from src.models.product.product import Product
+from src.models.reporting import (
+    BrandSalesDaily,
+    CategorySalesDaily,
+    PaymentMethodSalesDaily,
+    ProductSalesDaily,
+    ProvinceSalesDaily,
+)
+from src.ratelimit import rate_limit
+from src.schemas.base import BaseResponse
+from src.settings import settings
+
+router = APIRouter(
+    prefix="/reports",
+    tags=["reports"],
+    dependencies=[
+        Depends(rate_limit("staff")),
+        Depends(get_staff_user_id),
+    ],
+)
+
+# Rollup of each dimension, its key column and the table naming the keys
+_DIMENSIONS = {
+    SalesDimension.PRODUCT: (
+        ProductSalesDaily,
+        ProductSalesDaily.product_id,
+        Product,
+    ),
+    SalesDimension.CATEGORY: (
+        CategorySalesDaily,
+        CategorySalesDaily.category_id,
+        Category,
+    ),
+    SalesDimension.BRAND: (
+        BrandSalesDaily,
+        BrandSalesDaily.brand_id,
+        Brand,
+    ),
+    SalesDimension.PROVINCE: (
+        ProvinceSalesDaily,
+        ProvinceSalesDaily.province,
+        None,
+    ),
+    SalesDimension.PAYMENT_METHOD: (
+        PaymentMethodSalesDaily,
+        PaymentMethodSalesDaily.payment_method_type,
+        None,
+    ),
+}
+
+
+def _date_range(
+    start: Optional[date], end: Optional[date]
+) -> Tuple[date, date]:
+    """Inclusive range, the last 30 days (UTC) by default."""
+    end = end or datetime.now(timezone.utc).date()
+    start = start or end - timedelta(days=29)
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="'start' must not be after 'end'",
+        )
+    if (end - start).days >= settings.REPORT_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Reports span at most {settings.REPORT_MAX_DAYS} days",
+        )
+    return start, end
+
+
+def _measures(model):
+    return (
+        func.sum(model.orders).label("orders"),
+        func.sum(model.units).label("units"),
+        func.sum(model.revenue).label("revenue"),
+    )
+
+
+@router.get("/sales", response_model=BaseResponse)
+def get_sales(
+    session: Session = Depends(get_read_session),
+    start: Optional[date] = Query(
+        None, description="First day (UTC), 30 days before 'end' by default"
+    ),
+    end: Optional[date] = Query(
+        None, description="Last day (UTC), today by default"
+    ),
+) -> BaseResponse:
+    """Net orders, units and revenue per day."""
+    try:
+        start, end = _date_range(start, end)
+        # Every order has exactly one province, so its rollup adds up to
+        # the day's totals
+        model = ProvinceSalesDaily
+        rows = session.exec(
+            select(model.day, *_measures(model))
+            .where(model.day.between(start, end))
+            .group_by(model.day)
+            .order_by(model.day)
+        ).all()
+
+        days = [
+            {
+                "day": row.day,
+                "orders": row.orders,
+                "units": row.units,
+                "revenue": row.revenue,
+            }
+            for row in rows
+        ]
+        return BaseResponse(
+            message="Sales retrieved successfully.",
+            status_code=status.HTTP_200_OK,
+            detail={
+                "start": start,
+                "end": end,
+                "orders": sum(day["orders"] for day in days),
+                "units": sum(day["units"] for day in days),
+                "revenue": sum(day["revenue"] for day in days),
+                "days": days,
+            },
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving sales: {str(e)}",
+        )
+
+
+@router.get("/sales/{dimension}", response_model=BaseResponse)
+def get_sales_by(
+    dimension: SalesDimension,
+    session: Session = Depends(get_read_session),
+    start: Optional[date] = Query(
+        None, description="First day (UTC), 30 days before 'end' by default"
+    ),
+    end: Optional[date] = Query(
+        None, description="Last day (UTC), today by default"
+    ),
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(
+        100,
+        ge=1,
+        le=settings.MAX_PAGE_SIZE,
+        description="Maximum number of records to return",
+    ),
+) -> BaseResponse:
+    """Net sales per product, category, brand, province or payment method
+    type over a date range, highest revenue first."""
+    try:
+        start, end = _date_range(start, end)
+        model, key, names = _DIMENSIONS[dimension]
+        totals = (
+            select(key.label("key"), *_measures(model))
+            .where(model.day.between(start, end))
+            .group_by(key)
+            .subquery()
+        )
+        if names is not None:
+            query = select(*totals.c, names.name.label("name")).outerjoin(
+                names, names.id == totals.c.key
+            )
+        else:
+            query = select(*totals.c)
+        rows = session.exec(
+            query.order_by(totals.c.revenue.desc(), totals.c.key)
+            .offset(skip)
+            .limit(limit)
+        ).all()
+
+        return BaseResponse(
+            message="Sales retrieved successfully.",
+            status_code=status.HTTP_200_OK,
+            detail={
+                "start": start,
+                "end": end,
+                "dimension": dimension.value,
+                "rows": [
+                    {
+                        "key": row.key,
+                        "name": getattr(row, "name", None),
+                        "orders": row.orders,
+                        "units": row.units,
+                        "revenue": row.revenue,
+                    }
+                    for row in rows
+                ],
+            },
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving sales: {str(e)}",
+        )
@@ -0,0 +1,116 @@
+import asyncio
+from typing import Callable, Dict, Hashable, Tuple
+
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+
+from src.database.profiling import ProfiledRoute
+from src.database.replicas import current_read_consistency
+from src.database.timeouts import current_query_cancellation
+from src.metrics import COALESCED_REQUESTS
+from src.settings import settings
+
+# (status, headers, body) of a rendered response
+SharedResponse = Tuple[int, list, bytes]
+
+
+class _LeaderAbandoned(Exception):
+    """The leading request gave up; a waiting request should run instead."""
+
+
+def single_flight(endpoint: Callable) -> Callable:
+    """Mark a read-only endpoint whose concurrent identical calls coalesce.
+
+    Only effective on routers using ``SingleFlightRoute``.
+    """
+    endpoint.single_flight = True
+    return endpoint
+
+
+def request_key(request: Request) -> Hashable:
+    """Identify requests that are guaranteed the same response."""
+    consistency = current_read_consistency()
+    return (
+        request.url.path,
+        tuple(sorted(request.query_params.multi_items())),
+        # Clients reading their own writes may need a different database
+        consistency.min_lsn if consistency else None,
+    )
+
+
+class SingleFlightRoute(ProfiledRoute):
+    """Route whose ``@single_flight`` endpoints run once per burst.
+
+    While a request is being served, identical requests arriving in the
+    same worker wait for it and get a copy of its rendered response instead
+    of repeating the query. Nothing is kept once the response is ready, so
+    this never serves older data than the in-flight request reads. Waiting
+    requests skip the endpoint's dependencies, so its rate limits are
+    charged before they join.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        if not getattr(self.endpoint, "single_flight", False):
+            return handler
+        in_flight: Dict[Hashable, asyncio.Future] = {}
+        route = self.path
+        rate_limits = [
+            dependency.call
+            for dependency in self.dependant.dependencies
+            if hasattr(dependency.call, "rate_limit_policy")
+        ]
+
+        async def lead(key: Hashable, request: Request) -> Response:
+            future = asyncio.get_running_loop().create_future()
+            in_flight[key] = future
+            try:
+                response = await handler(request)
+            except BaseException as e:
+                cancellation = current_query_cancellation()
+                if isinstance(e, asyncio.CancelledError) or (
+                    cancellation is not None and cancellation.disconnected
+                ):
+                    # Its queries were cancelled with the client; that
+                    # failure is not the waiting requests' answer
+                    future.set_exception(_LeaderAbandoned())
+                else:
+                    future.set_exception(e)
+                future.exception()  # waiters may be gone, don't warn
+                raise
+            finally:
+                del in_flight[key]
+            if hasattr(response, "body"):
+                future.set_result(
+                    (response.status_code, response.raw_headers, response.body)
+                )
+            else:
+                future.set_exception(_LeaderAbandoned())
+                future.exception()
+            return response
+
+        async def coalesced_handler(request: Request) -> Response:
+            if not settings.SINGLE_FLIGHT_ENABLED:
+                return await handler(request)
+            key = request_key(request)
+            if key in in_flight:
+                # Should the leader give up and this request lead instead,
+                # the endpoint charges it once more
+                for check in rate_limits:
+                    await run_in_threadpool(check, request)
+            while key in in_flight:
+                try:
+                    # shield: one waiter going away must not cancel the rest
+                    status_code, headers, body = await asyncio.shield(
+                        in_flight[key]
+                    )
+                except _LeaderAbandoned:
+                    continue
+                COALESCED_REQUESTS.labels(route, "follower").inc()
+                response = Response(body, status_code)
+                response.raw_headers = list(headers)
+                return response
+            COALESCED_REQUESTS.labels(route, "leader").inc()
+            return await lead(key, request)
+
+        return coalesced_handler
@@ -39,3 +39,11 @@ class CartResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class CheckoutCreate(BaseModel):
+    """Schema for turning the current user's cart into an order."""
+    address_id: str = Field(..., description="ID of the delivery address")
+    payment_method_id: str = Field(
+        ..., description="ID of the payment method"
+    )
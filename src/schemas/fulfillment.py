@@ -0,0 +1,31 @@
+from typing import List
+
+from pydantic import BaseModel, Field
+
+from src.constants.order_status import OrderStatus
+from src.settings import settings
+
+
+class FulfillmentClaim(BaseModel):
+    """Schema for claiming the oldest unclaimed pending orders."""
+    count: int = Field(
+        ...,
+        ge=1,
+        le=settings.MAX_PAGE_SIZE,
+        description="Number of orders to claim",
+    )
+
+
+class FulfillmentRelease(BaseModel):
+    """Schema for handing claimed orders back to the queue."""
+    order_ids: List[str] = Field(
+        ..., min_length=1, max_length=settings.FULFILLMENT_MAX_ORDERS
+    )
+
+
+class FulfillmentTransition(BaseModel):
+    """Schema for moving many orders to a new status at once."""
+    order_ids: List[str] = Field(
+        ..., min_length=1, max_length=settings.FULFILLMENT_MAX_ORDERS
+    )
+    status: OrderStatus
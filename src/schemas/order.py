@@ -60,6 +60,7 @@ class OrderItemCreate(OrderItemBase):
 class OrderItemResponse(OrderItemBase):
     id: str
     order_id: str
+    unit_price: Optional[float] = None
 
     class Config:
         from_attributes = True
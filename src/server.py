@@ -0,0 +1,97 @@
+"""Production entry point: ``python -m src.server`` (``make prod``).
+
+Runs uvicorn with one worker per available CPU, uvloop and httptools when
+installed, and keep-alive, backlog, worker recycling and graceful shutdown
+taken from the settings. Command line options override the settings.
+"""
+
+import argparse
+import importlib.util
+import math
+import os
+import shutil
+import tempfile
+from typing import Optional
+
+import uvicorn
+
+from src.settings import settings
+
+
+def available_cpus() -> int:
+    """CPUs this process may use, honouring affinity and cgroup quotas.
+
+    ``os.cpu_count()`` reports the host's CPUs, which overcounts badly in
+    a container limited with ``--cpus``.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(cpus, 1)
+
+
+def worker_count() -> int:
+    return settings.WEB_CONCURRENCY or available_cpus()
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def _prepare_metrics_dir(workers: int) -> None:
+    """Give multi-worker runs an empty Prometheus multiprocess directory.
+
+    Samples left behind by a previous run would otherwise be merged into
+    the new one's counters.
+    """
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path is None:
+        if workers == 1:
+            return
+        path = tempfile.mkdtemp(prefix="omega-metrics-")
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = path
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default="src.main:app")
+    parser.add_argument("--host", default=settings.HOST)
+    parser.add_argument("--port", type=int, default=settings.PORT)
+    parser.add_argument("--workers", type=int, default=worker_count())
+    args = parser.parse_args(argv)
+
+    # Workers size their connection pools from this, see
+    # src.database.config.pool_limits
+    os.environ["WEB_CONCURRENCY"] = str(args.workers)
+    _prepare_metrics_dir(args.workers)
+
+    uvicorn.run(
+        args.app,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop="uvloop" if _installed("uvloop") else "asyncio",
+        http="httptools" if _installed("httptools") else "h11",
+        backlog=settings.BACKLOG,
+        timeout_keep_alive=settings.KEEP_ALIVE_SECONDS,
+        limit_max_requests=settings.MAX_REQUESTS or None,
+        limit_max_requests_jitter=settings.MAX_REQUESTS_JITTER,
+        timeout_graceful_shutdown=settings.GRACEFUL_SHUTDOWN_SECONDS,
+        access_log=settings.ACCESS_LOG,
+        proxy_headers=True,
+        forwarded_allow_ips=settings.FORWARDED_ALLOW_IPS,
+    )
+
+
+if __name__ == "__main__":
+    main()
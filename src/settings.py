@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import Dict, List, Optional, Tuple
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -24,11 +25,177 @@ class Settings(BaseSettings):
             f"/{self.POSTGRES_DB}"
         )
         
+    # Read replica, leave the host unset to send every read to the primary
+    REPLICA_POSTGRES_HOST: Optional[str] = None
+    REPLICA_POSTGRES_PORT: str = "5432"
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_LAG_CHECK_SECONDS: float = 1.0
+    READ_YOUR_WRITES_SECONDS: int = 30  # lifetime of the LSN cookie
+
+    @property
+    def REPLICA_DATABASE_URL(self) -> Optional[str]:
+        """Get read replica URL, same credentials as the primary."""
+        if not self.REPLICA_POSTGRES_HOST:
+            return None
+        return (
+            f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}"
+            f"@{self.REPLICA_POSTGRES_HOST}:{self.REPLICA_POSTGRES_PORT}"
+            f"/{self.POSTGRES_DB}"
+        )
+
     @property
     def FIREBASE_CRED(self) -> str:
         """Get firebase credentials reference."""
         return "omega-ecommerce-firebase-adminsdk-fbsvc-f77a96968c.json"
 
+    # Connections all workers of one instance may open together, including
+    # each worker's LISTEN connection. Keep the sum over instances below
+    # Postgres' max_connections.
+    DB_MAX_CONNECTIONS: int = 80
+    DB_POOL_TIMEOUT: float = 10.0
+
+    # Longest a single statement may run, per endpoint function name where
+    # the default does not fit. Overrides are applied with SET LOCAL.
+    DB_STATEMENT_TIMEOUT_MS: int = 5000
+    DB_ROUTE_STATEMENT_TIMEOUTS_MS: Dict[str, int] = {
+        "get_products": 2000,
+        "get_product_facets": 2000,
+        "get_all_orders": 10000,
+    }
+
+    # Adaptive admission control, see src/middleware/admission.py. Limits
+    # are per worker; lower priority classes may use only a share of it.
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_INITIAL_LIMIT: int = 32
+    ADMISSION_MIN_LIMIT: int = 4
+    ADMISSION_MAX_LIMIT: int = 256
+    ADMISSION_WINDOW_SECONDS: float = 1.0
+    ADMISSION_LATENCY_TOLERANCE: float = 2.0  # slowdown that cuts the limit
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+    ADMISSION_PRIORITY_SHARES: Dict[str, float] = {
+        "critical": 1.0,
+        "normal": 0.8,
+        "low": 0.6,
+    }
+    ADMISSION_ROUTE_PRIORITIES: Dict[str, str] = {
+        "POST /order": "critical",
+        "POST /cart/checkout": "critical",
+        "GET /metrics": "exempt",
+        "GET /products/stream": "exempt",  # long-lived
+    }
+
+    # Server settings, used by src/server.py
+    HOST: str = "0.0.0.0"
+    PORT: int = 8000
+    WEB_CONCURRENCY: Optional[int] = None  # defaults to the available CPUs
+    KEEP_ALIVE_SECONDS: int = 75  # above the usual 60s load balancer idle
+    BACKLOG: int = 2048
+    MAX_REQUESTS: int = 10000  # recycle workers, 0 disables
+    MAX_REQUESTS_JITTER: int = 1000  # so workers don't restart together
+    GRACEFUL_SHUTDOWN_SECONDS: int = 25
+    ACCESS_LOG: bool = False
+    FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+
+    # Initialize Firebase in the background right after startup instead
+    # of on the first protected request
+    FIREBASE_WARM_UP: bool = True
+
+    # Profiling settings
+    SQL_PROFILING_ENABLED: bool = False
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    SQL_EXPLAIN_SLOW_QUERIES: bool = False  # dev only, re-runs the query
+
+    # Let concurrent identical requests to hot read endpoints share one
+    # response, see src/routers/single_flight.py
+    SINGLE_FLIGHT_ENABLED: bool = True
+
+    # Idempotency-Key handling for order and cart POSTs
+    IDEMPOTENCY_TTL_HOURS: int = 24  # how long retries get the stored answer
+    IDEMPOTENCY_LOCK_SECONDS: int = 60  # then a stuck first attempt is retried
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0  # retries wait this long for it
+    IDEMPOTENCY_PURGE_SECONDS: float = 3600.0
+
+    # Sales rollups behind /reports are brought up to date this often, with
+    # at most this many order items per transaction
+    SALES_ROLLUP_REFRESH_SECONDS: float = 60.0
+    SALES_ROLLUP_BATCH_SIZE: int = 10_000
+    SALES_ROLLUP_STATEMENT_TIMEOUT_MS: int = 60_000  # per batch, 0 = none
+    # Longest date range a report may span
+    REPORT_MAX_DAYS: int = 366
+
+    # Products in stock that expire within EXPIRY_BADGE_DAYS get this badge
+    # unless they already carry one; checked every REFRESH_SECONDS
+    EXPIRY_BADGE_ENABLED: bool = True
+    EXPIRY_BADGE_DAYS: int = 7
+    EXPIRY_BADGE_LABEL: str = "Expiring soon"
+    EXPIRY_BADGE_COLOR: str = "orange"
+    EXPIRY_BADGE_REFRESH_SECONDS: float = 3600.0
+    EXPIRY_BADGE_BATCH_SIZE: int = 500
+    # Furthest ahead /products/expiring looks, in days
+    EXPIRING_MAX_DAYS: int = 365
+
+    # "Frequently bought together", see src/recommendations/job.py. Pairs
+    # must share at least MIN_SUPPORT orders and are scored by "cosine" or
+    # "lift"; orders with more than MAX_BASKET products are ignored.
+    RECOMMENDATION_TOP_K: int = 10
+    RECOMMENDATION_MIN_SUPPORT: int = 2
+    RECOMMENDATION_SCORE: str = "cosine"
+    RECOMMENDATION_MAX_BASKET: int = 50
+    RECOMMENDATION_CHUNK_ORDERS: int = 50_000  # orders counted per step
+    RECOMMENDATION_FETCH_SIZE: int = 10_000  # order lines per round trip
+    RECOMMENDATION_STATEMENT_TIMEOUT_MS: int = 0  # whole rebuild, 0 = none
+
+    # Token-bucket rate limits as (tokens per second, burst), by policy
+    # name. Routers pick a policy and are limited per client address;
+    # "user" also applies per Firebase uid to authenticated requests.
+    # Buckets live per worker ("memory"), in Redis ("redis") or nowhere
+    # ("none").
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_MAX_KEYS: int = 100_000  # per worker, memory backend
+    RATE_LIMITS: Dict[str, Tuple[float, int]] = {
+        "catalog": (20.0, 100),
+        "checkout": (5.0, 30),
+        "auth": (1.0, 10),
+        "user": (10.0, 50),
+        "staff": (10.0, 50),
+    }
+
+    # Largest page any list endpoint returns
+    MAX_PAGE_SIZE: int = 100
+    # Most ids a batch endpoint resolves in one request
+    BATCH_MAX_IDS: int = 100
+    # Fulfillment: a packer's claim on an order lapses after this long, and
+    # one bulk transition or release moves at most this many orders
+    FULFILLMENT_CLAIM_SECONDS: int = 900
+    FULFILLMENT_MAX_ORDERS: int = 1000
+    # Edges of the price buckets /products/facets counts, ascending
+    FACET_PRICE_BUCKETS: List[float] = [0, 25, 50, 100, 250, 500, 1000]
+
+    # Uploaded images: originals and variants are stored under
+    # IMAGE_STORAGE_DIR, named by the SHA-256 of the original
+    IMAGE_STORAGE_DIR: str = "media/images"
+    IMAGE_MAX_UPLOAD_BYTES: int = 20 * 1024 * 1024
+    IMAGE_MAX_PIXELS: int = 50_000_000  # decompression bomb guard
+    IMAGE_VARIANT_WIDTHS: List[int] = [320, 640, 1024, 1600]
+    IMAGE_VARIANT_FORMATS: List[str] = ["avif", "webp"]
+    IMAGE_VARIANT_QUALITY: int = 75
+    IMAGE_PROCESS_WORKERS: int = 2  # per server worker
+    IMAGE_TASKS_PER_PROCESS: int = 100  # then the process is replaced
+
+    # Response cache for catalog listings: "memory" (per worker), "redis"
+    # (shared, needs the redis package) or "none"
+    CACHE_BACKEND: str = "memory"
+    CACHE_TTL_SECONDS: float = 60.0  # bounds staleness if a NOTIFY is lost
+    CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # per worker, memory backend
+    REDIS_URL: str = "redis://localhost:6379/0"
+    REDIS_TIMEOUT_SECONDS: float = 0.1
+
+    # Live update settings
+    SSE_HEARTBEAT_SECONDS: float = 15.0
+    SSE_MAX_PENDING_EVENTS: int = 1000
+    SSE_MAX_PRODUCT_IDS: int = 200
+    NOTIFY_KEEPALIVE_SECONDS: float = 30.0
+
     # API settings
     API_BASE_PATH: str = f"/api/{API_VERSION.V1}"
     PROJECT_NAME: str = "API Omega"
@@ -0,0 +1,143 @@
+"""The response cache on the shared Redis backend, against fakeredis."""
+
+from types import SimpleNamespace
+
+import fakeredis
+import pytest
+from pydantic import BaseModel
+
+from src.cache import (
+    CATALOG_TAG,
+    RedisCache,
+    ResponseCache,
+    brand_tag,
+    category_tag,
+    listing_tags,
+    product_tag,
+)
+
+
+class Listing(BaseModel):
+    ids: list
+
+
+def product(id: str, category_id: str = "c1", brand_id: str = "b1"):
+    return SimpleNamespace(id=id, category_id=category_id, brand_id=brand_id)
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def worker_cache(server) -> ResponseCache:
+    """A worker's cache; workers built on one server share entries."""
+    return ResponseCache(RedisCache(fakeredis.FakeRedis(server=server)), 60)
+
+
+def primary() -> SimpleNamespace:
+    return SimpleNamespace(info={})
+
+
+def test_store_and_get(server):
+    cache = worker_cache(server)
+    key = cache.key("products", category_id="c1", limit=10)
+    assert cache.get(key) is None
+
+    response = cache.store(
+        key, Listing(ids=["a"]), listing_tags([product("a")]), primary()
+    )
+
+    assert cache.get(key).body == response.body == b'{"ids":["a"]}'
+
+
+def test_store_skips_replica_reads(server):
+    cache = worker_cache(server)
+    replica = SimpleNamespace(info={"replica": True})
+
+    response = cache.store("products:1", Listing(ids=[]), [], replica)
+
+    assert response.body == b'{"ids":[]}'
+    assert cache.get("products:1") is None
+
+
+def test_invalidate_drops_only_tagged_entries(server):
+    cache = worker_cache(server)
+    a, b = product("a", "c1", "b1"), product("b", "c2", "b2")
+    cache.store("products:a", Listing(ids=["a"]), listing_tags([a]), primary())
+    cache.store(
+        "products:b",
+        Listing(ids=["b"]),
+        listing_tags([b], category_id="c2"),
+        primary(),
+    )
+
+    cache.invalidate({product_tag("a")})
+
+    assert cache.get("products:a") is None
+    assert cache.get("products:b") is not None
+
+
+def test_tag_fans_out_to_every_entry_carrying_it(server):
+    cache = worker_cache(server)
+    for key, products in {
+        "products:1": [product("a", "c1")],
+        "products:2": [product("b", "c1"), product("c", "c2")],
+        "products:3": [product("d", "c2")],
+    }.items():
+        cache.store(
+            key,
+            Listing(ids=[p.id for p in products]),
+            listing_tags(products, category_id=products[0].category_id),
+            primary(),
+        )
+
+    cache.invalidate({category_tag("c1")})
+
+    assert cache.get("products:1") is None
+    assert cache.get("products:2") is None
+    assert cache.get("products:3") is not None
+    # The tag's set of keys goes with it
+    tag_key = cache.backend._tag_key(category_tag("c1"))
+    assert not cache.backend.client.exists(tag_key)
+
+
+def test_any_tag_of_an_entry_drops_it(server):
+    cache = worker_cache(server)
+    tags = listing_tags([product("a", "c1", "b1")])
+    for tag in (product_tag("a"), category_tag("c1"), brand_tag("b1")):
+        cache.store("products:1", Listing(ids=["a"]), tags, primary())
+
+        cache.invalidate({tag})
+
+        assert cache.get("products:1") is None
+
+
+def test_invalidation_reaches_every_worker(server):
+    writer, reader = worker_cache(server), worker_cache(server)
+    writer.store(
+        "products:1",
+        Listing(ids=["a"]),
+        listing_tags([product("a")]),
+        primary(),
+    )
+    assert reader.get("products:1") is not None
+
+    writer.invalidate({CATALOG_TAG})
+
+    assert reader.get("products:1") is None
+
+
+def test_shared_backend_ignores_invalidation_notices(server):
+    # The writer cleared the shared store before notifying the others
+    cache = worker_cache(server)
+    cache.store(
+        "products:1",
+        Listing(ids=["a"]),
+        listing_tags([product("a")]),
+        primary(),
+    )
+
+    cache.on_invalidation_notice({"tags": [CATALOG_TAG]})
+
+    assert cache.get("products:1") is not None